@@ -0,0 +1,105 @@
+"""
+비밀번호 해싱 모듈
+bcrypt 연산을 별도 프로세스 풀에서 실행하여 API 워커의 CPU/GIL을 점유하지 않도록 함
+동시 실행 수를 제한하고 대기열 길이를 지표로 노출
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from utils import BCRYPT_ROUNDS, get_password_hash, verify_and_update_password
+
+
+class HashingBusyError(Exception):
+    """대기 시간 안에 해싱 슬롯을 얻지 못함"""
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, acquire_timeout: float = 5.0):
+        """
+        Args:
+            max_workers: 해싱 전용 프로세스 수
+            max_pending: 프로세스 풀 대기열에 넣을 수 있는 최대 작업 수 (실행 중 포함 시 max_workers + max_pending)
+            acquire_timeout: 슬롯을 얻기 위해 기다리는 최대 시간 (초), 초과 시 HashingBusyError
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        self._slots = asyncio.Semaphore(max_workers + max_pending)
+        self.waiting = 0
+        self.in_pool = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def start(self) -> None:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _run(self, fn, *args):
+        if self.executor is None:
+            self.start()
+
+        self.waiting += 1
+        try:
+            # wait_for는 3.11에서 acquire가 끝난 직후 타임아웃되면 슬롯을 돌려주지 않으므로 timeout 블록 사용
+            # (취소된 acquire는 Semaphore가 직접 슬롯을 되돌림)
+            async with asyncio.timeout(self.acquire_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise HashingBusyError("Password hashing queue is full")
+        finally:
+            self.waiting -= 1
+
+        self.in_pool += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, fn, *args)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_pool -= 1
+            self._slots.release()
+
+        # 평균 시간은 성공한 해싱만으로 계산
+        self.completed += 1
+        self.total_seconds += time.perf_counter() - start
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """비밀번호 검증, 비용 설정이 바뀌었으면 새 해시도 함께 반환"""
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> Dict:
+        return {
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "waiting_for_slot": self.waiting,
+            "running": min(self.in_pool, self.max_workers),
+            "queued": max(0, self.in_pool - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "avg_seconds": round(self.total_seconds / self.completed, 4) if self.completed else 0.0
+        }
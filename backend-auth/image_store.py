@@ -0,0 +1,157 @@
+"""
+이미지 저장소 모듈
+프로필/배경 이미지를 내용 해시(SHA-256)를 키로 저장하고, DB와 API 응답에는 URL만 남긴다.
+저장 백엔드는 S3와 같은 형태(put_object / head_object / get_object)의 인터페이스를 따르며,
+기본 구현은 로컬 디렉토리를 사용한다.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, Optional
+
+ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+DATA_URL_PATTERN = re.compile(r"^data:(?P<content_type>[\w.+-]+/[\w.+-]+);base64,(?P<data>.*)$", re.DOTALL)
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ObjectNotFound(Exception):
+    """저장소에 해당 키가 없음"""
+
+
+class InvalidImage(Exception):
+    """허용되지 않는 이미지 (형식/크기)"""
+
+
+class LocalObjectStore:
+    def __init__(self, root: str):
+        """
+        S3 호환 형태의 로컬 디렉토리 저장소
+
+        Args:
+            root: 객체를 저장할 디렉토리
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # 한 디렉토리에 파일이 몰리지 않도록 키 앞 2글자로 분산
+        return os.path.join(self.root, key[:2], key)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def put_object(self, key: str, body: bytes, content_type: str) -> None:
+        path = self._path(key)
+        self._write_atomic(path, body)
+        self._write_atomic(
+            path + ".meta",
+            json.dumps({"ContentType": content_type}).encode()
+        )
+
+    def head_object(self, key: str) -> Dict:
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            with open(path + ".meta", "rb") as f:
+                meta = json.loads(f.read())
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+        return {
+            "ContentLength": size,
+            "ContentType": meta["ContentType"],
+            "ETag": f'"{key}"'
+        }
+
+    def get_object(self, key: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """
+        객체 읽기 (end 포함 범위)
+
+        Args:
+            key: 객체 키
+            start: 시작 바이트
+            end: 마지막 바이트 (None이면 끝까지)
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                f.seek(start)
+                if end is None:
+                    return f.read()
+                return f.read(end - start + 1)
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+
+class ImageStore:
+    def __init__(self, backend: LocalObjectStore, public_base_url: str, max_bytes: int = 5 * 1024 * 1024):
+        """
+        Args:
+            backend: put_object / head_object / get_object를 제공하는 저장소
+            public_base_url: 이미지 URL 앞부분 (예: http://auth.unisurveyal.com)
+            max_bytes: 허용하는 최대 이미지 크기
+        """
+        self.backend = backend
+        self.public_base_url = public_base_url.rstrip("/")
+        self.max_bytes = max_bytes
+
+    def url_for(self, digest: str) -> str:
+        return f"{self.public_base_url}/images/{digest}"
+
+    def put_image(self, data: bytes, content_type: str) -> str:
+        """
+        이미지 저장 후 내용 해시 반환 (같은 이미지는 한 번만 저장)
+
+        Raises:
+            InvalidImage: 허용되지 않는 형식이거나 크기 초과
+        """
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            raise InvalidImage(f"Unsupported image type: {content_type}")
+        if len(data) > self.max_bytes:
+            raise InvalidImage(f"Image too large (max {self.max_bytes} bytes)")
+
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            self.backend.head_object(digest)
+        except ObjectNotFound:
+            self.backend.put_object(digest, data, content_type)
+        return digest
+
+    def store_value(self, value: Optional[str]) -> Optional[str]:
+        """
+        클라이언트가 보낸 이미지 값을 DB에 저장할 값으로 변환
+        data URL이면 저장소에 넣고 URL을 반환하고, 그 외(URL, 빈 값)는 그대로 반환
+
+        Raises:
+            InvalidImage: data URL 형식이 잘못되었거나 허용되지 않는 이미지
+        """
+        if not value or not value.startswith("data:"):
+            return value
+
+        match = DATA_URL_PATTERN.match(value)
+        if not match:
+            raise InvalidImage("Invalid data URL")
+
+        try:
+            data = base64.b64decode(match.group("data"), validate=True)
+        except (binascii.Error, ValueError):
+            raise InvalidImage("Invalid base64 image data")
+
+        digest = self.put_image(data, match.group("content_type"))
+        return self.url_for(digest)
+
+    def is_valid_digest(self, digest: str) -> bool:
+        return bool(DIGEST_PATTERN.match(digest))
@@ -1,9 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from typing import Optional
-import redis
+import redis.asyncio as aioredis
+import asyncio
 import json
 import os
 from datetime import datetime
@@ -13,46 +15,139 @@ from schemas import (
     UserCreate, UserLogin, UserResponse, Token, 
     UserPreferenceCreate, UserPreferenceResponse
 )
-from utils import (
-    get_password_hash, verify_password, 
-    create_access_token, decode_access_token
-)
+from utils import create_access_token, decode_access_token
+from hashing import PasswordHasher, HashingBusyError
+from sessions import SessionStore, SESSION_TTL
+from image_store import ImageStore, LocalObjectStore, ObjectNotFound, InvalidImage
 
 # 환경 변수
 DATABASE_URL = os.getenv("DATABASE_URL")
 REDIS_URL = os.getenv("REDIS_URL")
+SESSION_REVOKE_CHANNEL = "session:revoked"
+USER_SNAPSHOT_TTL = int(os.getenv("USER_SNAPSHOT_TTL", str(60 * 60)))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))
+HASH_ACQUIRE_TIMEOUT = float(os.getenv("HASH_ACQUIRE_TIMEOUT", "5"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "200"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "/data/images")
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://auth.unisurveyal.com")
+
+def to_async_database_url(url: str) -> str:
+    """동기 드라이버 URL을 비동기 드라이버(aiomysql) URL로 변환"""
+    for prefix in ("mysql+pymysql://", "mysql://"):
+        if url.startswith(prefix):
+            return "mysql+aiomysql://" + url[len(prefix):]
+    return url
+
+# 데이터베이스 설정 (비동기 엔진)
+engine = create_async_engine(
+    to_async_database_url(DATABASE_URL),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True
+)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+# Redis 클라이언트 (비동기, 연결 수 제한 풀)
+redis_pool = aioredis.BlockingConnectionPool.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT
+)
+redis_client = aioredis.Redis(connection_pool=redis_pool)
 
-# 데이터베이스 설정
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 세션 저장소 (sid 해시 키 + 사용자별 세션 목록)
+session_store = SessionStore(redis_client, ttl=SESSION_TTL, revoke_channel=SESSION_REVOKE_CHANNEL)
 
-# Redis 클라이언트
-redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+# 비밀번호 해싱 프로세스 풀
+password_hasher = PasswordHasher(
+    max_workers=HASH_WORKERS,
+    max_pending=HASH_MAX_PENDING,
+    acquire_timeout=HASH_ACQUIRE_TIMEOUT
+)
+
+# 이미지 저장소 (내용 해시 기반)
+image_store = ImageStore(
+    LocalObjectStore(IMAGE_STORE_DIR),
+    PUBLIC_BASE_URL,
+    max_bytes=IMAGE_MAX_BYTES
+)
 
 # FastAPI 앱
 app = FastAPI(title="Auth Service", version="1.0.0")
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """데이터베이스 초기화 (재시도 로직 포함)"""
-    import time
     max_retries = 10
     retry_interval = 3
 
     for attempt in range(max_retries):
         try:
-            Base.metadata.create_all(bind=engine)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
             print("Database tables created successfully")
             break
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"Failed to create tables (attempt {attempt + 1}/{max_retries}): {e}")
                 print(f"Retrying in {retry_interval} seconds...")
-                time.sleep(retry_interval)
+                await asyncio.sleep(retry_interval)
             else:
                 print(f"Failed to create tables after {max_retries} attempts: {e}")
                 raise
 
+    password_hasher.start()
+    await migrate_inline_images()
+
+async def migrate_inline_images():
+    """users 행에 data URL로 저장된 기존 이미지를 이미지 저장소로 옮기고 URL로 교체"""
+    async with SessionLocal() as db:
+        users = (await db.execute(
+            select(User).filter(or_(
+                User.profile_image.like("data:%"),
+                User.background_image.like("data:%")
+            ))
+        )).scalars().all()
+
+        for user in users:
+            for field in ("profile_image", "background_image"):
+                try:
+                    url = await asyncio.to_thread(image_store.store_value, getattr(user, field))
+                except InvalidImage as e:
+                    print(f"Dropping invalid {field} of user {user.id}: {e}")
+                    url = None
+                setattr(user, field, url)
+
+        await db.commit()
+
+    for user in users:
+        await invalidate_user_snapshot(user.id)
+    if users:
+        print(f"Moved inline images of {len(users)} users to image store")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_hasher.shutdown()
+    await redis_client.close()
+    await redis_pool.disconnect()
+    await engine.dispose()
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -88,14 +183,12 @@ async def log_requests(request: Request, call_next):
     return response
 
 # 의존성
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)):
+async def authenticate(authorization: Optional[str]) -> dict:
+    """Authorization 헤더 검증 후 Redis 세션 정보 반환"""
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,8 +209,8 @@ def get_current_user(authorization: Optional[str] = Header(None), db: Session =
         )
     
     # Redis에서 세션 확인
-    session_data = redis_client.get(f"session:{token}")
-    if not session_data:
+    session = await session_store.get(token)
+    if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session expired or invalid"
@@ -129,8 +222,20 @@ def get_current_user(authorization: Optional[str] = Header(None), db: Session =
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+
+    if session.get("username") != username:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
     
-    user = db.query(User).filter(User.username == username).first()
+    return session
+
+async def get_current_user(authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_db)):
+    """DB의 User 객체 반환 (수정이 필요한 엔드포인트용)"""
+    session = await authenticate(authorization)
+    
+    user = await db.get(User, session["user_id"])
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,19 +244,77 @@ def get_current_user(authorization: Optional[str] = Header(None), db: Session =
     
     return user
 
+async def get_session(authorization: Optional[str] = Header(None)) -> dict:
+    """Redis 세션 정보만으로 인증 (DB 조회 없음)"""
+    return await authenticate(authorization)
+
+# 사용자 스냅샷 캐시 (UserResponse 형태로 Redis에 저장)
+def user_snapshot_key(user_id: int) -> str:
+    return f"user_snapshot:{user_id}"
+
+async def store_user_snapshot(user: User) -> dict:
+    snapshot = UserResponse.model_validate(user).model_dump(mode="json")
+    await redis_client.setex(
+        user_snapshot_key(user.id),
+        USER_SNAPSHOT_TTL,
+        json.dumps(snapshot)
+    )
+    return snapshot
+
+async def invalidate_user_snapshot(user_id: int) -> None:
+    await redis_client.delete(user_snapshot_key(user_id))
+
+async def get_current_user_snapshot(session: dict = Depends(get_session)) -> dict:
+    """Redis 스냅샷으로 사용자 정보 반환 (없을 때만 DB 조회 후 캐시)"""
+    snapshot_data = await redis_client.get(user_snapshot_key(session["user_id"]))
+    if snapshot_data:
+        return json.loads(snapshot_data)
+
+    async with SessionLocal() as db:
+        user = await db.get(User, session["user_id"])
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        return await store_user_snapshot(user)
+
 # 엔드포인트
 @app.get("/")
-def read_root():
+async def read_root():
     return {"service": "Auth Service", "status": "running"}
 
+@app.get("/metrics/hashing")
+async def get_hashing_metrics():
+    """비밀번호 해싱 프로세스 풀 상태"""
+    return password_hasher.stats()
+
+@app.get("/metrics/pools")
+async def get_pool_metrics():
+    """DB / Redis 커넥션 풀 상태"""
+    return {
+        "database": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow()
+        },
+        "redis": {
+            "max_connections": REDIS_MAX_CONNECTIONS,
+            "in_use": len(getattr(redis_pool, "_in_use_connections", ()))
+        }
+    }
+
 @app.post("/register", response_model=Token)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     print(f"📝 New user registration attempt: {user_data.username}")
 
     # 사용자 존재 확인
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    existing_user = (await db.execute(
+        select(User).filter(
+            (User.username == user_data.username) | (User.email == user_data.email)
+        )
+    )).scalars().first()
 
     if existing_user:
         print(f"❌ Registration failed: User already exists")
@@ -161,7 +324,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # 새 사용자 생성
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -171,25 +334,17 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     print(f"✅ User registered successfully: {new_user.username} (ID: {new_user.id})")
+    await store_user_snapshot(new_user)
 
     # 토큰 생성
     access_token = create_access_token(data={"sub": new_user.username})
 
     # Redis에 세션 저장 (7일)
-    session_data = {
-        "user_id": new_user.id,
-        "username": new_user.username,
-        "email": new_user.email
-    }
-    redis_client.setex(
-        f"session:{access_token}",
-        60 * 60 * 24 * 7,  # 7 days
-        json.dumps(session_data)
-    )
+    await session_store.create(access_token, new_user.id, new_user.username, new_user.email)
 
     return {
         "access_token": access_token,
@@ -198,34 +353,38 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @app.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     print(f"🔑 Login attempt: {user_data.username}")
 
-    user = db.query(User).filter(User.username == user_data.username).first()
+    user = (await db.execute(
+        select(User).filter(User.username == user_data.username)
+    )).scalars().first()
 
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(user_data.password, user.hashed_password)
+
+    if not verified:
         print(f"❌ Login failed: Invalid credentials for {user_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
 
+    # bcrypt 비용 설정이 바뀐 경우 새 비용으로 재해싱하여 저장
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        await db.refresh(user)
+
     print(f"✅ Login successful: {user.username} (ID: {user.id})")
+    await store_user_snapshot(user)
     
     # 토큰 생성
     access_token = create_access_token(data={"sub": user.username})
     
     # Redis에 세션 저장 (7일)
-    session_data = {
-        "user_id": user.id,
-        "username": user.username,
-        "email": user.email
-    }
-    redis_client.setex(
-        f"session:{access_token}",
-        60 * 60 * 24 * 7,  # 7 days
-        json.dumps(session_data)
-    )
+    await session_store.create(access_token, user.id, user.username, user.email)
     
     return {
         "access_token": access_token,
@@ -234,7 +393,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 @app.post("/logout")
-def logout(authorization: Optional[str] = Header(None)):
+async def logout(authorization: Optional[str] = Header(None)):
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -243,35 +402,43 @@ def logout(authorization: Optional[str] = Header(None)):
     
     try:
         scheme, token = authorization.split()
-        redis_client.delete(f"session:{token}")
-        return {"message": "Logged out successfully"}
-    except:
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid token"
         )
 
+    await session_store.revoke(token)
+    return {"message": "Logged out successfully"}
+
+@app.post("/logout/all")
+async def logout_all(session: dict = Depends(get_session)):
+    """모든 기기에서 로그아웃 (사용자의 세션 전체 폐기)"""
+    revoked = await session_store.revoke_all(session["user_id"])
+    return {"message": "Logged out from all sessions", "revoked_sessions": revoked}
+
 @app.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: dict = Depends(get_current_user_snapshot)):
     return current_user
 
 @app.get("/verify")
-def verify_token(current_user: User = Depends(get_current_user)):
+async def verify_token(session: dict = Depends(get_session)):
     return {
         "valid": True,
-        "user_id": current_user.id,
-        "username": current_user.username
+        "user_id": session["user_id"],
+        "username": session["username"]
     }
 
 @app.post("/preferences", response_model=UserPreferenceResponse)
-def create_or_update_preferences(
+async def create_or_update_preferences(
     pref_data: UserPreferenceCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    session: dict = Depends(get_session),
+    db: AsyncSession = Depends(get_db)
 ):
-    existing_pref = db.query(UserPreference).filter(
-        UserPreference.user_id == current_user.id
-    ).first()
+    user_id = session["user_id"]
+    existing_pref = (await db.execute(
+        select(UserPreference).filter(UserPreference.user_id == user_id)
+    )).scalars().first()
     
     if existing_pref:
         # 업데이트
@@ -284,31 +451,33 @@ def create_or_update_preferences(
         if pref_data.keywords:
             existing_pref.keywords = pref_data.keywords
         
-        db.commit()
-        db.refresh(existing_pref)
+        await db.commit()
+        await db.refresh(existing_pref)
+        await invalidate_user_snapshot(user_id)
         return existing_pref
     else:
         # 새로 생성
         new_pref = UserPreference(
-            user_id=current_user.id,
+            user_id=user_id,
             preferred_difficulty=pref_data.preferred_difficulty,
             ai_stacks=pref_data.ai_stacks,
             domains=pref_data.domains,
             keywords=pref_data.keywords
         )
         db.add(new_pref)
-        db.commit()
-        db.refresh(new_pref)
+        await db.commit()
+        await db.refresh(new_pref)
+        await invalidate_user_snapshot(user_id)
         return new_pref
 
 @app.get("/preferences", response_model=UserPreferenceResponse)
-def get_preferences(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_preferences(
+    session: dict = Depends(get_session),
+    db: AsyncSession = Depends(get_db)
 ):
-    pref = db.query(UserPreference).filter(
-        UserPreference.user_id == current_user.id
-    ).first()
+    pref = (await db.execute(
+        select(UserPreference).filter(UserPreference.user_id == session["user_id"])
+    )).scalars().first()
 
     if not pref:
         raise HTTPException(
@@ -319,9 +488,10 @@ def get_preferences(
     return pref
 
 @app.post("/verify-password")
-def verify_password_endpoint(
+async def verify_password_endpoint(
     password_data: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """비밀번호 확인"""
     password = password_data.get("password")
@@ -332,34 +502,44 @@ def verify_password_endpoint(
             detail="Password is required"
         )
 
-    if not verify_password(password, current_user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, current_user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
         )
 
+    if new_hash:
+        current_user.hashed_password = new_hash
+        await db.commit()
+
     return {"message": "Password verified successfully"}
 
 @app.get("/user/profile", response_model=UserResponse)
-def get_user_profile(current_user: User = Depends(get_current_user)):
+async def get_user_profile(current_user: dict = Depends(get_current_user_snapshot)):
     """사용자 프로필 조회"""
     return current_user
 
 @app.put("/user/profile", response_model=UserResponse)
-def update_user_profile(
+async def update_user_profile(
     profile_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """사용자 프로필 업데이트"""
+    """사용자 프로필 업데이트 (이미지는 저장소에 넣고 URL만 저장)"""
     if "nickname" in profile_data:
         current_user.nickname = profile_data["nickname"]
 
-    if "profile_image" in profile_data:
-        current_user.profile_image = profile_data["profile_image"]
-
-    if "background_image" in profile_data:
-        current_user.background_image = profile_data["background_image"]
+    try:
+        for field in ("profile_image", "background_image"):
+            if field in profile_data:
+                url = await asyncio.to_thread(image_store.store_value, profile_data[field])
+                setattr(current_user, field, url)
+    except InvalidImage as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     if "interest_fields" in profile_data:
         fields = profile_data["interest_fields"]
@@ -368,8 +548,80 @@ def update_user_profile(
         else:
             current_user.interest_fields = fields
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    await invalidate_user_snapshot(current_user.id)
 
     # 로컬 스토리지 업데이트를 위해 사용자 정보 반환
-    return current_user
\ No newline at end of file
+    return current_user
+
+def parse_range(range_header: str, size: int):
+    """단일 바이트 범위 헤더 파싱 (bytes=start-end), 만족할 수 없으면 None"""
+    if not range_header.startswith("bytes=") or "," in range_header:
+        return None
+
+    start_str, _, end_str = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_str == "":
+            # 마지막 N 바이트
+            length = int(end_str)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_str)
+        end = int(end_str) if end_str else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+@app.get("/images/{digest}")
+async def get_image(digest: str, request: Request):
+    """이미지 조회 (ETag / 영구 캐시 / Range 요청 지원)"""
+    if not image_store.is_valid_digest(digest):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    try:
+        meta = await asyncio.to_thread(image_store.backend.head_object, digest)
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    # 내용 해시가 곧 키이므로 한 번 받은 이미지는 바뀌지 않음
+    headers = {
+        "ETag": meta["ETag"],
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and meta["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = meta["ContentLength"]
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+        start, end = byte_range
+        body = await asyncio.to_thread(image_store.backend.get_object, digest, start, end)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(
+            content=body,
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=meta["ContentType"],
+            headers=headers
+        )
+
+    body = await asyncio.to_thread(image_store.backend.get_object, digest)
+    return Response(content=body, media_type=meta["ContentType"], headers=headers)
@@ -0,0 +1,89 @@
+"""
+세션 저장 형식별 Redis 메모리 사용량 비교 리포트
+
+이전 형식: session:{토큰 전체} → JSON 문자열
+새 형식:   sess:{sid} → hash {u, n, e} + user_sessions:{user_id} → set
+
+샘플 세션을 실제 Redis에 써서 MEMORY USAGE로 측정한 뒤 세션 수만큼 환산한다.
+운영 데이터와 섞이지 않도록 별도 DB 번호를 사용할 것.
+
+사용법:
+    REDIS_URL=redis://:password@redis:6379/15 python session_memory_report.py --samples 10000 --sessions 1000000
+"""
+import argparse
+import json
+import os
+import uuid
+
+import redis
+
+from sessions import SESSION_TTL, session_id, session_key, user_sessions_key, legacy_session_key
+from utils import create_access_token
+
+
+def measure(client: redis.Redis, keys) -> int:
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key, samples=0)
+    return sum(usage or 0 for usage in pipe.execute())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis 세션 형식별 메모리 사용량 비교")
+    parser.add_argument("--samples", type=int, default=10000, help="실제로 기록할 샘플 세션 수")
+    parser.add_argument("--sessions", type=int, default=1000000, help="환산할 전체 세션 수")
+    parser.add_argument("--sessions-per-user", type=int, default=2, help="사용자당 평균 세션 수")
+    args = parser.parse_args()
+
+    client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/15"), decode_responses=True)
+    prefix = f"memreport:{uuid.uuid4().hex[:8]}:"
+
+    legacy_keys, new_keys, index_keys = [], [], set()
+    pipe = client.pipeline(transaction=False)
+    for i in range(args.samples):
+        user_id = i // args.sessions_per_user
+        username = f"user{user_id:07d}"
+        email = f"{username}@example.com"
+        token = create_access_token(data={"sub": username})
+
+        legacy_key = prefix + legacy_session_key(token)
+        pipe.setex(legacy_key, SESSION_TTL, json.dumps({"user_id": user_id, "username": username, "email": email}))
+        legacy_keys.append(legacy_key)
+
+        sid = session_id(token)
+        new_key = prefix + session_key(sid)
+        pipe.hset(new_key, mapping={"u": user_id, "n": username, "e": email})
+        pipe.expire(new_key, SESSION_TTL)
+        new_keys.append(new_key)
+
+        index_key = prefix + user_sessions_key(user_id)
+        pipe.sadd(index_key, sid)
+        pipe.expire(index_key, SESSION_TTL)
+        index_keys.add(index_key)
+    pipe.execute()
+
+    try:
+        legacy_bytes = measure(client, legacy_keys)
+        session_bytes = measure(client, new_keys)
+        index_bytes = measure(client, index_keys)
+    finally:
+        for chunk_start in range(0, len(legacy_keys), 1000):
+            client.delete(*legacy_keys[chunk_start:chunk_start + 1000])
+            client.delete(*new_keys[chunk_start:chunk_start + 1000])
+        client.delete(*index_keys)
+
+    scale = args.sessions / args.samples
+    legacy_total = legacy_bytes * scale
+    new_total = (session_bytes + index_bytes) * scale
+
+    print(f"샘플 {args.samples}개 측정 → {args.sessions:,}개 세션 환산 (사용자당 {args.sessions_per_user}개)")
+    print(f"{'형식':<40}{'세션당(B)':>12}{'전체(MB)':>12}")
+    print(f"{'session:{token} JSON (이전)':<40}{legacy_bytes / args.samples:>12.1f}{legacy_total / 2**20:>12.1f}")
+    print(f"{'sess:{sid} hash':<40}{session_bytes / args.samples:>12.1f}{session_bytes * scale / 2**20:>12.1f}")
+    print(f"{'user_sessions:{user_id} set':<40}{index_bytes / args.samples:>12.1f}{index_bytes * scale / 2**20:>12.1f}")
+    print(f"{'새 형식 합계':<40}{(session_bytes + index_bytes) / args.samples:>12.1f}{new_total / 2**20:>12.1f}")
+    print(f"절감: {(1 - new_total / legacy_total) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
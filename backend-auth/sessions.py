@@ -0,0 +1,126 @@
+"""
+세션 저장 모듈
+세션 키는 토큰 전체 대신 토큰의 짧은 해시(sid)로 만들고, 값은 Redis 해시로 저장한다.
+사용자별 세션 목록(user_sessions:{user_id})을 함께 관리하여
+전체 로그아웃 등을 keyspace 스캔 없이 O(세션 수)로 처리한다.
+
+    sess:{sid}              -> hash {u: user_id, n: username, e: email}
+    user_sessions:{user_id} -> set {sid, ...}
+"""
+import base64
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+SESSION_TTL = 60 * 60 * 24 * 7  # 7 days
+
+
+def session_id(token: str) -> str:
+    """토큰 → 22자 세션 ID (SHA-256 앞 16바이트, base64url)"""
+    digest = hashlib.sha256(token.encode()).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def session_key(sid: str) -> str:
+    return f"sess:{sid}"
+
+
+def user_sessions_key(user_id: int) -> str:
+    return f"user_sessions:{user_id}"
+
+
+def legacy_session_key(token: str) -> str:
+    """이전 형식 (session:{토큰 전체} → JSON), 기존 세션이 만료될 때까지 읽기만 지원"""
+    return f"session:{token}"
+
+
+class SessionStore:
+    def __init__(self, redis_client, ttl: int = SESSION_TTL, revoke_channel: str = "session:revoked"):
+        """
+        Args:
+            redis_client: redis.asyncio 클라이언트 (decode_responses=True)
+            ttl: 세션 유지 시간 (초)
+            revoke_channel: 세션 폐기 시 sid를 발행할 pub/sub 채널
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self.revoke_channel = revoke_channel
+
+    async def create(self, token: str, user_id: int, username: str, email: str) -> str:
+        """세션 생성 후 sid 반환"""
+        sid = session_id(token)
+        index_key = user_sessions_key(user_id)
+
+        # 만료된 세션을 사용자 목록에서 정리
+        members = await self.redis.smembers(index_key)
+        stale = []
+        if members:
+            members = list(members)
+            pipe = self.redis.pipeline(transaction=False)
+            for member in members:
+                pipe.exists(session_key(member))
+            exists = await pipe.execute()
+            stale = [member for member, alive in zip(members, exists) if not alive]
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(session_key(sid), mapping={"u": user_id, "n": username, "e": email})
+        pipe.expire(session_key(sid), self.ttl)
+        if stale:
+            pipe.srem(index_key, *stale)
+        pipe.sadd(index_key, sid)
+        pipe.expire(index_key, self.ttl)
+        await pipe.execute()
+
+        return sid
+
+    async def get(self, token: str) -> Optional[Dict]:
+        """세션 조회 ({user_id, username, email}), 없으면 None"""
+        data = await self.redis.hgetall(session_key(session_id(token)))
+        if data:
+            return {
+                "user_id": int(data["u"]),
+                "username": data["n"],
+                "email": data.get("e")
+            }
+
+        legacy = await self.redis.get(legacy_session_key(token))
+        if legacy:
+            return json.loads(legacy)
+        return None
+
+    async def _delete_sessions(self, user_id: Optional[int], sids: List[str]) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        for sid in sids:
+            pipe.delete(session_key(sid))
+        if user_id is not None and sids:
+            pipe.srem(user_sessions_key(user_id), *sids)
+        for sid in sids:
+            # Survey 서비스의 토큰 검증 캐시에서도 즉시 제거되도록 알림
+            pipe.publish(self.revoke_channel, sid)
+        await pipe.execute()
+
+    async def revoke(self, token: str) -> None:
+        """세션 하나 폐기 (로그아웃)"""
+        sid = session_id(token)
+        user_id = await self.redis.hget(session_key(sid), "u")
+        await self.redis.delete(legacy_session_key(token))
+        await self._delete_sessions(int(user_id) if user_id is not None else None, [sid])
+
+    async def revoke_all(self, user_id: int) -> int:
+        """사용자의 모든 세션 폐기 (전체 로그아웃, 비밀번호 변경 등), 폐기한 세션 수 반환"""
+        sids = list(await self.redis.smembers(user_sessions_key(user_id)))
+        await self._delete_sessions(user_id, sids)
+        await self.redis.delete(user_sessions_key(user_id))
+        return len(sids)
+
+    async def list_sessions(self, user_id: int) -> List[str]:
+        """사용자의 살아 있는 세션 sid 목록"""
+        members = list(await self.redis.smembers(user_sessions_key(user_id)))
+        if not members:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for member in members:
+            pipe.exists(session_key(member))
+        exists = await pipe.execute()
+        return [member for member, alive in zip(members, exists) if alive]
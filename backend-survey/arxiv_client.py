@@ -0,0 +1,200 @@
+"""
+비동기 ArXiv API 클라이언트
+Atom 페이지를 비동기 HTTP로 가져와 파싱하고, 도착하는 대로 논문 레코드를 스트리밍한다.
+페이지 요청은 공유 rate limiter를 통해 예약되므로 이벤트 루프를 막지 않는다.
+base_url을 바꾸면 로컬 stub Atom 서버를 대상으로 실행할 수 있다.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import feedparser
+import httpx
+
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+
+
+class AsyncRateLimiter:
+    def __init__(self, min_interval: float = 3.0):
+        """
+        프로세스 내 요청 간격 제한 (ArXiv API: 3초당 1요청 권장)
+
+        Args:
+            min_interval: 요청 사이 최소 간격 (초)
+        """
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+
+    async def acquire(self, priority: str = "interactive") -> float:
+        """
+        다음 요청 슬롯을 예약하고 그 시각까지 대기, 대기한 시간(초) 반환
+        (priority는 분산 limiter와 인터페이스를 맞추기 위한 인자)
+        """
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def parse_entry(entry) -> Dict:
+    """Atom entry → 논문 정보 딕셔너리 (기존 arxiv 라이브러리 결과와 같은 형태)"""
+    pdf_url = None
+    for link in entry.get("links", []):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href")
+            break
+
+    published = entry.get("published_parsed")
+    published_date = datetime(*published[:6]).date() if published else None
+
+    return {
+        "arxiv_id": entry.id.split("/")[-1],
+        "title": entry.title,
+        "abstract": entry.summary,
+        "authors": ", ".join([author.name for author in entry.get("authors", [])]),
+        "published_date": published_date,
+        "pdf_url": pdf_url,
+        "categories": ", ".join([tag.term for tag in entry.get("tags", [])]),
+    }
+
+
+class AsyncArxivClient:
+    def __init__(
+        self,
+        base_url: str = ARXIV_API_URL,
+        page_size: int = 100,
+        rate_limiter=None,
+        num_retries: int = 3,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_pages_in_flight: int = 4
+    ):
+        """
+        Args:
+            base_url: ArXiv API 주소 (테스트 시 stub 서버 주소)
+            page_size: 페이지당 결과 수
+            rate_limiter: acquire(priority)를 제공하는 limiter (없으면 프로세스 내 limiter 생성)
+            num_retries: 페이지 요청 실패 시 재시도 횟수
+            timeout: 요청 타임아웃 (초)
+            transport: httpx 트랜스포트 (기록/재생 등)
+            max_pages_in_flight: 한 검색에서 동시에 예약해 둘 페이지 요청 수
+        """
+        self.base_url = base_url
+        self.page_size = page_size
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self.num_retries = num_retries
+        self.timeout = timeout
+        self.transport = transport
+        self.max_pages_in_flight = max(1, max_pages_in_flight)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch_page(
+        self,
+        query: str,
+        start: int,
+        max_results: int,
+        sort_by: str = "relevance",
+        sort_order: str = "descending",
+        priority: str = "interactive"
+    ) -> Tuple[List[Dict], int]:
+        """
+        Atom 페이지 하나를 가져와 파싱
+
+        Returns:
+            (논문 레코드 리스트, 전체 결과 수)
+        """
+        if self.client is None:
+            await self.start()
+
+        params = {
+            "search_query": query,
+            "start": start,
+            "max_results": max_results,
+            "sortBy": sort_by,
+            "sortOrder": sort_order,
+        }
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.num_retries + 1):
+            await self.rate_limiter.acquire(priority)
+            try:
+                response = await self.client.get(self.base_url, params=params)
+                response.raise_for_status()
+                feed = await asyncio.to_thread(feedparser.parse, response.content)
+            except httpx.HTTPError as e:
+                last_error = e
+                print(f"ArXiv page request failed (start={start}, attempt {attempt + 1}): {e}")
+                continue
+
+            total_results = int(feed.feed.get("opensearch_totalresults", 0))
+            # ArXiv API는 간헐적으로 빈 페이지를 반환하므로 결과가 남아 있으면 재시도
+            if not feed.entries and start < total_results:
+                last_error = RuntimeError(f"Empty page at start={start}")
+                continue
+
+            return [parse_entry(entry) for entry in feed.entries], total_results
+
+        raise last_error
+
+    async def results(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: str = "relevance",
+        sort_order: str = "descending",
+        priority: str = "interactive"
+    ) -> AsyncIterator[Dict]:
+        """
+        검색 결과 스트리밍
+        첫 페이지로 전체 결과 수를 확인한 뒤 나머지 페이지를 최대 max_pages_in_flight개씩 미리 예약하고,
+        페이지 순서대로 레코드를 내보낸다.
+        페이지 하나가 재시도 후에도 실패하면 남은 요청을 취소하고 예외를 올린다
+        (그때까지 받은 결과가 일부뿐이라는 것을 호출자가 알 수 있도록).
+        """
+        first_size = min(self.page_size, max_results)
+        records, total_results = await self.fetch_page(
+            query, 0, first_size, sort_by, sort_order, priority
+        )
+        for record in records:
+            yield record
+
+        total = min(max_results, total_results)
+        starts = iter(range(first_size, total, self.page_size))
+        tasks = deque()
+
+        def schedule() -> None:
+            while len(tasks) < self.max_pages_in_flight:
+                start = next(starts, None)
+                if start is None:
+                    return
+                tasks.append(asyncio.create_task(
+                    self.fetch_page(
+                        query, start, min(self.page_size, total - start), sort_by, sort_order, priority
+                    )
+                ))
+
+        try:
+            schedule()
+            while tasks:
+                records, _ = await tasks.popleft()
+                schedule()
+                for record in records:
+                    yield record
+        finally:
+            # 실패하거나 소비자가 중간에 멈추면 남은 페이지 요청 취소
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,226 @@
+"""
+ArXiv 요청용 httpx 트랜스포트
+네트워크 없이 ArXiv API를 대신하는 트랜스포트들을 제공한다.
+
+FixtureTransport: 미리 받아 둔 Atom 파일들의 entry를 모아 두고,
+    검색 쿼리의 submittedDate 구간 필터 / 정렬 / start·max_results 페이지 분할을 흉내 내어 응답
+RecordReplayTransport: 실제 응답(Atom 페이지)을 쿼리·offset 기준으로 디스크에 압축 기록하고,
+    replay 모드에서는 기록된 응답만으로 응답 (벤치마크/부하 테스트를 네트워크 없이 재현)
+"""
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+OPENSEARCH_NS = "http://a9.com/-/spec/opensearch/1.1/"
+
+SUBMITTED_DATE_PATTERN = re.compile(r"submittedDate:\[(\d{12}) TO (\d{12})\]")
+# 압축을 푼 본문으로 응답을 다시 만들 때 버려야 하는 헤더
+HOP_BY_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class FixtureTransport(httpx.AsyncBaseTransport):
+    def __init__(self, fixtures_dir: str):
+        """
+        Args:
+            fixtures_dir: ArXiv API 응답(Atom XML) 파일들이 있는 디렉토리 (*.xml, 하위 디렉토리 포함)
+        """
+        ET.register_namespace("", ATOM_NS)
+        ET.register_namespace("opensearch", OPENSEARCH_NS)
+
+        entries = {}
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "**", "*.xml"), recursive=True)):
+            root = ET.parse(path).getroot()
+            for entry in root.findall(f"{{{ATOM_NS}}}entry"):
+                entry_id = entry.findtext(f"{{{ATOM_NS}}}id")
+                published = entry.findtext(f"{{{ATOM_NS}}}published")
+                if entry_id and published:
+                    # 같은 논문이 여러 파일에 있으면 하나만 사용
+                    entries[entry_id] = (datetime.strptime(published[:19], "%Y-%m-%dT%H:%M:%S"), entry)
+
+        self.entries: List[Tuple[datetime, ET.Element]] = sorted(entries.values(), key=lambda e: e[0])
+
+    def _select(self, search_query: str) -> List[ET.Element]:
+        match = SUBMITTED_DATE_PATTERN.search(search_query)
+        if not match:
+            return [entry for _, entry in self.entries]
+
+        start = datetime.strptime(match.group(1), "%Y%m%d%H%M")
+        end = datetime.strptime(match.group(2), "%Y%m%d%H%M")
+        return [entry for published, entry in self.entries if start <= published <= end]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        selected = self._select(params.get("search_query", ""))
+        if params.get("sortOrder") == "descending":
+            selected = list(reversed(selected))
+
+        start = int(params.get("start", 0))
+        max_results = int(params.get("max_results", 10))
+
+        feed = ET.Element(f"{{{ATOM_NS}}}feed")
+        ET.SubElement(feed, f"{{{OPENSEARCH_NS}}}totalResults").text = str(len(selected))
+        ET.SubElement(feed, f"{{{OPENSEARCH_NS}}}startIndex").text = str(start)
+        ET.SubElement(feed, f"{{{OPENSEARCH_NS}}}itemsPerPage").text = str(max_results)
+        feed.extend(selected[start:start + max_results])
+
+        return httpx.Response(
+            200,
+            content=ET.tostring(feed, encoding="utf-8", xml_declaration=True),
+            headers={"Content-Type": "application/atom+xml; charset=utf-8"},
+            request=request
+        )
+
+
+class CassetteMissError(httpx.TransportError):
+    """replay 모드에서 기록되지 않은 요청"""
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    MODES = ("passthrough", "record", "replay")
+    KEY_PARAMS = ("search_query", "start", "max_results", "sortBy", "sortOrder")
+
+    def __init__(
+        self,
+        mode: str,
+        store_dir: str,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0
+    ):
+        """
+        Args:
+            mode: passthrough(그대로 전달) / record(전달 + 기록) / replay(기록만 사용, 네트워크 없음)
+            store_dir: 기록 저장 디렉토리
+            inner: 실제 요청에 사용할 트랜스포트 (없으면 기본 HTTP 트랜스포트)
+            latency: replay 시 응답마다 추가할 지연 (초)
+            jitter: replay 지연에 더할 최대 무작위 편차 (초)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown transport mode: {mode}")
+
+        self.mode = mode
+        self.store_dir = store_dir
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.latency = latency
+        self.jitter = jitter
+
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    def cassette_key(self, request: httpx.Request) -> str:
+        """쿼리 + offset 등 결과를 결정하는 파라미터로 만든 키"""
+        params = {name: request.url.params.get(name, "") for name in self.KEY_PARAMS}
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.store_dir, key[:2], f"{key}.xml.gz")
+
+    def _save(self, key: str, request: httpx.Request, content: bytes) -> None:
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(content))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        # 사람이 기록 내용을 확인할 수 있도록 파라미터를 함께 저장
+        params: Dict[str, str] = {name: request.url.params.get(name, "") for name in self.KEY_PARAMS}
+        with open(path[:-len(".xml.gz")] + ".json", "w") as f:
+            json.dump(params, f, ensure_ascii=False)
+
+    def _load(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "passthrough":
+            return await self.inner.handle_async_request(request)
+
+        key = self.cassette_key(request)
+
+        if self.mode == "replay":
+            content = await asyncio.to_thread(self._load, key)
+            if content is None:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for {request.url}", request=request)
+
+            delay = self.latency + random.uniform(0, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.replayed += 1
+            return httpx.Response(
+                200,
+                content=content,
+                headers={"Content-Type": "application/atom+xml; charset=utf-8"},
+                request=request
+            )
+
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        if response.status_code == 200:
+            await asyncio.to_thread(self._save, key, request, content)
+            self.recorded += 1
+
+        # aread()는 이미 압축을 푼 본문이므로 인코딩/길이 헤더를 그대로 두면 httpx가 다시 풀려고 함
+        headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        return httpx.Response(
+            response.status_code,
+            content=content,
+            headers=headers,
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses
+        }
+
+
+def transport_from_env() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    환경 변수로 트랜스포트 구성
+        ARXIV_TRANSPORT_MODE: passthrough(기본) / record / replay
+        ARXIV_CASSETTE_DIR: 기록 저장 디렉토리
+        ARXIV_REPLAY_LATENCY / ARXIV_REPLAY_JITTER: replay 지연 (초)
+    """
+    mode = os.getenv("ARXIV_TRANSPORT_MODE", "passthrough")
+    if mode == "passthrough":
+        return None
+
+    return RecordReplayTransport(
+        mode,
+        os.getenv("ARXIV_CASSETTE_DIR", "/data/arxiv-cassettes"),
+        latency=float(os.getenv("ARXIV_REPLAY_LATENCY", "0")),
+        jitter=float(os.getenv("ARXIV_REPLAY_JITTER", "0"))
+    )
@@ -0,0 +1,90 @@
+"""
+추천 색인 빌드 작업
+로컬 surveys 테이블 전체로 TF-IDF 색인을 만들어 RECOMMENDER_INDEX_DIR에 새 버전으로 저장한다.
+논문별 상위 k 이웃 테이블(RECOMMENDER_NEIGHBORS_K)과 LSA 임베딩(RECOMMENDER_LSA_DIMS)도 같은 버전에 함께 저장한다.
+API 워커들은 CURRENT 파일이 바뀐 것을 보고 새 버전을 불러온다.
+
+사용법:
+    python build_index.py                # 한 번 빌드
+    python build_index.py --interval 3600   # 주기적으로 다시 빌드
+"""
+import argparse
+import os
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Survey
+from recommender import RecommenderIndex, publish_index
+from lsa_index import LsaIndex
+from neighbors import NeighborTable
+
+# 환경 변수
+DATABASE_URL = os.getenv("DATABASE_URL")
+RECOMMENDER_INDEX_DIR = os.getenv("RECOMMENDER_INDEX_DIR", "/data/recommender-index")
+RECOMMENDER_INDEX_KEEP = int(os.getenv("RECOMMENDER_INDEX_KEEP", "3"))
+# mmap: 배열별 .npy 디렉토리 (워커 간 페이지 캐시 공유), joblib: 기존 피클 파일
+RECOMMENDER_INDEX_FORMAT = os.getenv("RECOMMENDER_INDEX_FORMAT", "mmap")
+# LSA 임베딩 차원 (0이면 만들지 않음, mmap 형식에만 저장), IVF 리스트 수 (-1이면 4·√N, 0이면 정확 검색만)
+RECOMMENDER_LSA_DIMS = int(os.getenv("RECOMMENDER_LSA_DIMS", "0"))
+RECOMMENDER_LSA_LISTS = int(os.getenv("RECOMMENDER_LSA_LISTS", "-1"))
+# 논문별로 미리 계산할 이웃 수 (0이면 만들지 않음, mmap 형식에만 저장)
+# 색인 전체 대 전체 유사도 계산이라 빌드가 오래 걸리므로 neighbors 엔진을 쓸 때만 설정 (예: 20)
+RECOMMENDER_NEIGHBORS_K = int(os.getenv("RECOMMENDER_NEIGHBORS_K", "0"))
+
+
+def load_corpus(session_factory) -> List[Dict]:
+    db = session_factory()
+    try:
+        rows = db.query(Survey.id, Survey.title, Survey.abstract, Survey.keywords).order_by(Survey.id).yield_per(5000)
+        return [
+            {'id': row.id, 'title': row.title, 'abstract': row.abstract or '', 'keywords': row.keywords or ''}
+            for row in rows
+        ]
+    finally:
+        db.close()
+
+
+def build_once(session_factory, directory: str = RECOMMENDER_INDEX_DIR, fmt: str = RECOMMENDER_INDEX_FORMAT) -> None:
+    started = time.perf_counter()
+    papers = load_corpus(session_factory)
+    if not papers:
+        print("⚠️  No surveys in the corpus yet, skipping index build")
+        return
+
+    index = RecommenderIndex.build(papers)
+    if RECOMMENDER_LSA_DIMS and fmt == "mmap":
+        index.lsa = LsaIndex.build(index.tfidf_matrix, dims=RECOMMENDER_LSA_DIMS, n_lists=RECOMMENDER_LSA_LISTS)
+        print(f"🧭 LSA embeddings: {index.lsa.dims} dims, {index.lsa.n_lists} IVF lists")
+    if RECOMMENDER_NEIGHBORS_K and fmt == "mmap":
+        index.neighbors = NeighborTable.build(index.tfidf_matrix, k=RECOMMENDER_NEIGHBORS_K)
+    path = publish_index(index, directory, keep=RECOMMENDER_INDEX_KEEP, fmt=fmt)
+    print(f"✅ Built recommender index {index.version}: {len(papers)} papers in {time.perf_counter() - started:.1f}s → {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 TF-IDF 색인 빌드")
+    parser.add_argument("--interval", type=int, default=0, help="다시 빌드할 주기 (초), 0이면 한 번만")
+    parser.add_argument("--index-dir", default=RECOMMENDER_INDEX_DIR, help="색인 저장 디렉토리")
+    parser.add_argument("--format", choices=["mmap", "joblib"], default=RECOMMENDER_INDEX_FORMAT, help="색인 저장 형식")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    while True:
+        try:
+            build_once(SessionLocal, args.index_dir, args.format)
+        except Exception as e:
+            if not args.interval:
+                raise
+            print(f"❌ Index build failed: {e}")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
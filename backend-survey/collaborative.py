@@ -0,0 +1,211 @@
+"""
+동시 출현(co-occurrence) 기반 협업 필터링
+user_surveys의 (사용자, 논문, 상태)를 가중치 행렬 X(사용자 x 논문)로 보고
+논문-논문 동시 출현 행렬 C = Xᵀ X 를 희소 행렬로 유지한다.
+
+    점수(u) = (x_u · D) C · D,  D = diag(1 / √C_ii)   (코사인으로 정규화한 논문 유사도)
+
+상태가 바뀌면 해당 사용자의 행 하나만큼의 변화량을 C에 더한다 (전체 재계산 없음).
+변화량은 대기 목록에 모아 두고 점수 계산 때는 C_base와 변화량 행렬을 따로 곱한다.
+대기 목록을 C_base에 합치는(fold) O(nnz(C)) 작업은 요청 경로가 아닌 백그라운드에서만 한다.
+여러 사용자 점수는 희소 행렬 곱 한 번으로 계산한다.
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+# 상태별 관심 가중치 (보관 < 읽는 중 < 완료)
+STATUS_WEIGHTS = {
+    "saved": 1.0,
+    "recommended": 1.0,
+    "reading": 2.0,
+    "completed": 3.0
+}
+
+
+def status_weight(status) -> float:
+    """SurveyStatus 또는 상태 문자열의 가중치"""
+    return STATUS_WEIGHTS.get(getattr(status, 'value', status), 0.0)
+
+
+def pad_square(matrix: sp.csr_matrix, n: int) -> sp.csr_matrix:
+    """정사각 CSR 행렬을 n x n으로 확장 (새 논문 행/열은 비어 있음, 데이터 복사 없음)"""
+    if matrix.shape[0] >= n:
+        return matrix
+    indptr = np.concatenate([matrix.indptr, np.full(n - matrix.shape[0], matrix.indptr[-1])])
+    return sp.csr_matrix((matrix.data, matrix.indices, indptr), shape=(n, n))
+
+
+def delta_matrix(rows: List[np.ndarray], cols: List[np.ndarray], vals: List[np.ndarray], n: int) -> sp.csr_matrix:
+    """대기 중인 변화량 조각들을 n x n CSR 행렬 하나로 (같은 칸은 합산)"""
+    if not rows:
+        return sp.csr_matrix((n, n), dtype=np.float64)
+    return sp.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n, n)
+    )
+
+
+class CooccurrenceModel:
+    def __init__(self, fold_threshold: int = 20000):
+        """
+        Args:
+            fold_threshold: 대기 중인 변화량이 이만큼 쌓이면 백그라운드 fold 대상 (needs_fold)
+        """
+        self.fold_threshold = fold_threshold
+        self.user_items: Dict[int, Dict[int, float]] = {}
+        self.item_col: Dict[int, int] = {}
+        self.item_ids: List[int] = []
+        self._base = sp.csr_matrix((0, 0), dtype=np.float64)
+        self._pending_rows: List[np.ndarray] = []
+        self._pending_cols: List[np.ndarray] = []
+        self._pending_vals: List[np.ndarray] = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, interactions: Iterable[Tuple[int, int, float]], **kwargs) -> "CooccurrenceModel":
+        """
+        (사용자 ID, 논문 ID, 가중치)들로 동시 출현 행렬 생성
+
+        Args:
+            interactions: 사용자-논문 상호작용 (같은 쌍이 여러 번 나오면 마지막 값 사용)
+        """
+        model = cls(**kwargs)
+        for user_id, survey_id, weight in interactions:
+            if weight > 0:
+                model.user_items.setdefault(user_id, {})[survey_id] = weight
+                model._column(survey_id)
+
+        users = model._user_matrix(list(model.user_items))
+        model._base = (users.T @ users).tocsr()
+        return model
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_ids)
+
+    @property
+    def needs_fold(self) -> bool:
+        return self._pending >= self.fold_threshold
+
+    def _column(self, survey_id: int) -> int:
+        column = self.item_col.get(survey_id)
+        if column is None:
+            column = self.item_col[survey_id] = len(self.item_ids)
+            self.item_ids.append(survey_id)
+        return column
+
+    def _user_matrix(self, user_ids: List[int]) -> sp.csr_matrix:
+        """사용자별 논문 가중치 행렬 (사용자 수 x 논문 수)"""
+        rows, cols, vals = [], [], []
+        for i, user_id in enumerate(user_ids):
+            items = self.user_items.get(user_id, {})
+            rows.extend([i] * len(items))
+            cols.extend(self.item_col[survey_id] for survey_id in items)
+            vals.extend(items.values())
+        return sp.csr_matrix((vals, (rows, cols)), shape=(len(user_ids), self.n_items))
+
+    def set_weight(self, user_id: int, survey_id: int, weight: float) -> None:
+        """
+        사용자-논문 가중치 변경 (0이면 삭제) - C에 해당 사용자 행의 변화량만 더함
+        C_ij += Δ·w_j, C_ji += Δ·w_j (j는 사용자의 다른 논문), C_ii += new² - old²
+        """
+        with self._lock:
+            items = self.user_items.setdefault(user_id, {})
+            old = items.get(survey_id, 0.0)
+            if old == weight:
+                return
+
+            column = self._column(survey_id)
+            others = [(self.item_col[other], w) for other, w in items.items() if other != survey_id]
+            delta = weight - old
+            other_cols = np.array([c for c, _ in others], dtype=np.int64)
+            other_weights = np.array([w for _, w in others], dtype=np.float64) * delta
+
+            self._pending_rows.append(np.concatenate([np.full(len(others), column), other_cols, [column]]))
+            self._pending_cols.append(np.concatenate([other_cols, np.full(len(others), column), [column]]))
+            self._pending_vals.append(np.concatenate([other_weights, other_weights, [weight ** 2 - old ** 2]]))
+            self._pending += 2 * len(others) + 1
+
+            if weight > 0:
+                items[survey_id] = weight
+            else:
+                items.pop(survey_id, None)
+
+    def _snapshot(self) -> Tuple[sp.csr_matrix, Tuple[List, List, List], int]:
+        """
+        (기준 행렬, 대기 중인 변화량 조각들, 논문 수) - 잠금 안에서 호출
+        조각 목록은 복사본이라 잠금 밖에서 delta_matrix로 합쳐도 됨
+        """
+        pending = (list(self._pending_rows), list(self._pending_cols), list(self._pending_vals))
+        return self._base, pending, self.n_items
+
+    def fold(self) -> None:
+        """
+        대기 중인 변화량을 기준 행렬에 합침 (O(nnz(C)) - 백그라운드에서 주기적으로 호출)
+        합치는 동안에는 잠그지 않으므로 그 사이 들어온 변화량은 대기 목록에 남음
+        """
+        with self._fold_lock:
+            with self._lock:
+                if not self._pending_rows and self._base.shape[0] == self.n_items:
+                    return
+                base, pending, n = self._snapshot()
+            count = len(pending[0])
+            folded = sum(len(vals) for vals in pending[2])
+
+            merged = (pad_square(base, n) + delta_matrix(*pending, n)).tocsr()
+            merged.data[np.abs(merged.data) < 1e-9] = 0
+            merged.eliminate_zeros()
+
+            with self._lock:
+                # 합치는 동안 논문이 추가됐으면 새 기준 행렬을 다시 확장
+                self._base = pad_square(merged, self.n_items)
+                del self._pending_rows[:count], self._pending_cols[:count], self._pending_vals[:count]
+                self._pending -= folded
+
+    def matrix(self) -> sp.csr_matrix:
+        """현재 동시 출현 행렬 (대기 중인 변화량 반영, 기준 행렬은 바꾸지 않음)"""
+        with self._lock:
+            base, pending, n = self._snapshot()
+        return (pad_square(base, n) + delta_matrix(*pending, n)).tocsr()
+
+    def score_users(self, user_ids: List[int]) -> Tuple[sp.csr_matrix, np.ndarray]:
+        """
+        여러 사용자의 협업 필터링 점수 (사용자마다 최댓값 1로 정규화, 이미 가진 논문은 0)
+
+        Returns:
+            (사용자 수 x 논문 수 점수 행렬, 열별 논문 ID)
+        """
+        with self._lock:
+            base, pending, n = self._snapshot()
+            users = self._user_matrix(user_ids)
+            item_ids = np.array(self.item_ids, dtype=np.int64)
+        base = pad_square(base, n)
+        delta = delta_matrix(*pending, n)
+
+        # C = C_base + Δ 를 만들지 않고 두 행렬과 각각 곱해 더함
+        diagonal = base.diagonal() + delta.diagonal()
+        inverse_norm = sp.diags(np.where(diagonal > 0, 1.0 / np.sqrt(np.maximum(diagonal, 1e-12)), 0.0))
+        weighted = users @ inverse_norm
+        scores = ((weighted @ base + weighted @ delta) @ inverse_norm).tocsr()
+
+        # 이미 보관/읽은 논문 제외
+        scores = scores - scores.multiply(users > 0)
+        scores.eliminate_zeros()
+
+        # 사용자마다 최댓값으로 나눠 내용 기반 코사인 점수(0~1)와 같은 범위로
+        row_max = scores.max(axis=1).toarray().ravel() if scores.shape[1] else np.zeros(scores.shape[0])
+        scale = sp.diags(np.where(row_max > 0, 1.0 / np.maximum(row_max, 1e-12), 0.0))
+        return (scale @ scores).tocsr(), item_ids
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self.user_items),
+            "items": self.n_items,
+            "cooccurrence_nnz": int(self._base.nnz),
+            "pending_updates": self._pending
+        }
@@ -0,0 +1,336 @@
+"""
+논문 보강(enrichment) 큐
+저장 경로(ingest.ingest_papers)는 원본 논문만 저장하고 survey id를 Redis Stream에 넣은 뒤 바로 반환한다.
+워커 풀이 스트림을 consumer group으로 나눠 읽어 keywords와 읽기 시간 컬럼을 배치로 채운다.
+
+- 처리 여부를 DB 값으로 판단하므로 같은 id가 여러 번 들어와도 결과는 같다 (멱등)
+- 처리 도중 죽은 워커의 메시지는 XAUTOCLAIM으로 다른 워커가 가져가 다시 처리
+- 일정 횟수 이상 실패한 메시지는 dead-letter 스트림으로 옮김
+- 큐에 넣지 못한 논문(Redis 장애 등)은 주기적인 sweep으로 다시 넣음 (dead-letter 스트림에 있는 논문은 제외,
+  스트림에서 지우면 다음 sweep에서 다시 처리)
+
+사용법:
+    python enrichment.py                 # ENRICH_WORKERS 개의 워커 프로세스 실행
+    python enrichment.py --workers 2     # 워커마다 키워드 추출은 KEYWORD_WORKERS 개 프로세스로 나눔
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import redis
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+from models import Survey
+
+# 환경 변수
+DATABASE_URL = os.getenv("DATABASE_URL")
+REDIS_URL = os.getenv("REDIS_URL")
+ENRICH_STREAM = os.getenv("ENRICH_STREAM", "survey:enrich")
+ENRICH_GROUP = os.getenv("ENRICH_GROUP", "enrichers")
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "1"))
+ENRICH_BATCH_SIZE = int(os.getenv("ENRICH_BATCH_SIZE", "50"))
+ENRICH_KEYWORD_TOP_N = int(os.getenv("ENRICH_KEYWORD_TOP_N", "5"))
+ENRICH_CLAIM_IDLE_MS = int(os.getenv("ENRICH_CLAIM_IDLE_MS", str(5 * 60 * 1000)))
+ENRICH_MAX_DELIVERIES = int(os.getenv("ENRICH_MAX_DELIVERIES", "5"))
+ENRICH_SWEEP_INTERVAL = int(os.getenv("ENRICH_SWEEP_INTERVAL", str(10 * 60)))
+
+
+def needs_enrichment():
+    """보강이 필요한 논문 조건 (키워드가 없으면 빈 문자열로 저장하므로 NULL만 미처리)"""
+    return or_(Survey.keywords.is_(None), Survey.estimated_reading_time_beginner.is_(None))
+
+
+class EnrichmentQueue:
+    def __init__(self, redis_url: str, stream: str = ENRICH_STREAM, group: str = ENRICH_GROUP):
+        """
+        Args:
+            redis_url: Redis 주소
+            stream: 보강 요청 스트림 키
+            group: 워커 consumer group 이름
+        """
+        self.redis = redis.from_url(redis_url, decode_responses=True)
+        self.stream = stream
+        self.group = group
+        self.dead_letter_stream = f"{stream}:dead"
+        self.worker_stats_key = f"{stream}:workers"
+
+    def ensure_group(self) -> None:
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def enqueue(self, survey_ids: List[int], keyword_top_n: Optional[int] = None) -> None:
+        """
+        보강할 survey id들을 스트림에 추가
+
+        Args:
+            survey_ids: 보강할 논문 ID
+            keyword_top_n: 저장할 키워드 수 (없으면 워커 기본값)
+        """
+        if not survey_ids:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for survey_id in survey_ids:
+            fields = {"id": survey_id}
+            if keyword_top_n is not None:
+                fields["top_n"] = keyword_top_n
+            pipe.xadd(self.stream, fields)
+        pipe.execute()
+
+    def report_worker_stats(self, consumer: str, stats: Dict) -> None:
+        """워커별 지표(키워드 캐시 적중률 등)를 저장해 /metrics/enrichment에서 볼 수 있게 함"""
+        self.redis.hset(self.worker_stats_key, consumer, json.dumps(stats))
+
+    def dead_lettered_ids(self, chunk_size: int = 1000) -> Set[int]:
+        """dead-letter 스트림에 있는 survey id"""
+        survey_ids = set()
+        start = "-"
+        while True:
+            messages = self.redis.xrange(self.dead_letter_stream, min=start, count=chunk_size)
+            survey_ids.update(int(fields["id"]) for _, fields in messages)
+            if len(messages) < chunk_size:
+                return survey_ids
+            start = f"({messages[-1][0]}"
+
+    def stats(self) -> Dict:
+        """backlog 지표: 아직 읽지 않은 메시지(lag), 처리 중 메시지(pending), dead-letter 수"""
+        try:
+            groups = {g["name"]: g for g in self.redis.xinfo_groups(self.stream)}
+        except redis.exceptions.ResponseError:
+            groups = {}
+        group = groups.get(self.group, {})
+
+        return {
+            "stream_length": self.redis.xlen(self.stream),
+            "lag": group.get("lag"),
+            "pending": group.get("pending", 0),
+            "consumers": group.get("consumers", 0),
+            "dead_letters": self.redis.xlen(self.dead_letter_stream),
+            "workers": {
+                consumer: json.loads(value)
+                for consumer, value in self.redis.hgetall(self.worker_stats_key).items()
+            }
+        }
+
+
+class EnrichmentWorker:
+    def __init__(
+        self,
+        queue: EnrichmentQueue,
+        session_factory,
+        keyword_extractor,
+        estimate_reading_time: Callable[[str], Dict[str, int]],
+        consumer: Optional[str] = None,
+        batch_size: int = ENRICH_BATCH_SIZE,
+        keyword_top_n: int = ENRICH_KEYWORD_TOP_N,
+        claim_idle_ms: int = ENRICH_CLAIM_IDLE_MS,
+        max_deliveries: int = ENRICH_MAX_DELIVERIES
+    ):
+        """
+        Args:
+            queue: 보강 큐
+            session_factory: DB 세션 팩토리
+            keyword_extractor: 키워드 추출기
+            estimate_reading_time: 초록으로 읽기 시간을 추정하는 함수
+            consumer: consumer group 안에서의 워커 이름 (기본: 호스트명-pid)
+            batch_size: 한 번에 처리할 메시지 수
+            keyword_top_n: 메시지에 키워드 수가 없을 때 저장할 키워드 수
+            claim_idle_ms: 이 시간 이상 ack되지 않은 메시지는 다른 워커가 가져감
+            max_deliveries: 이 횟수 이상 전달된 메시지는 dead-letter로 이동
+        """
+        self.queue = queue
+        self.session_factory = session_factory
+        self.keyword_extractor = keyword_extractor
+        self.estimate_reading_time = estimate_reading_time
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.keyword_top_n = keyword_top_n
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+
+    def enrich(self, survey_ids: List[int], keyword_top_n: Optional[int] = None) -> int:
+        """
+        아직 보강되지 않은 논문만 채워 한 번에 커밋, 보강한 수 반환
+
+        Args:
+            survey_ids: 보강할 논문 ID
+            keyword_top_n: 저장할 키워드 수 (없으면 self.keyword_top_n)
+        """
+        db = self.session_factory()
+        try:
+            surveys = db.query(Survey).filter(Survey.id.in_(survey_ids), needs_enrichment()).all()
+
+            # 키워드는 배치 전체를 여러 코어에 나눠 추출
+            missing = [survey for survey in surveys if survey.keywords is None]
+            keywords_list = self.keyword_extractor.extract_batch(
+                [(survey.title, survey.abstract or "") for survey in missing],
+                top_n=keyword_top_n or self.keyword_top_n
+            )
+            for survey, keywords in zip(missing, keywords_list):
+                survey.keywords = ", ".join(keywords)
+
+            for survey in surveys:
+                if survey.estimated_reading_time_beginner is None:
+                    reading_times = self.estimate_reading_time(survey.abstract or "")
+                    survey.estimated_reading_time_beginner = reading_times["beginner"]
+                    survey.estimated_reading_time_intermediate = reading_times["intermediate"]
+                    survey.estimated_reading_time_advanced = reading_times["advanced"]
+            db.commit()
+            return len(surveys)
+        finally:
+            db.close()
+
+    def _dead_letter(self, message_ids: List[str]) -> None:
+        """전달 횟수를 넘긴 메시지를 dead-letter 스트림으로 옮기고 ack"""
+        redis_client = self.queue.redis
+        for message_id, fields in redis_client.xrange(self.queue.stream, min=message_ids[0], max=message_ids[-1]):
+            if message_id in message_ids:
+                redis_client.xadd(self.queue.dead_letter_stream, {**fields, "source_id": message_id})
+        redis_client.xack(self.queue.stream, self.queue.group, *message_ids)
+        redis_client.xdel(self.queue.stream, *message_ids)
+        print(f"⚠️  Moved {len(message_ids)} enrichment messages to {self.queue.dead_letter_stream}")
+
+    def _claim_stale(self) -> List:
+        """처리 도중 멈춘 워커의 메시지 가져오기"""
+        redis_client = self.queue.redis
+        result = redis_client.xautoclaim(
+            self.queue.stream,
+            self.queue.group,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=self.batch_size
+        )
+        messages = [m for m in result[1] if m[1]]
+        if not messages:
+            return []
+
+        # 너무 여러 번 실패한 메시지는 다시 처리하지 않음
+        pending = redis_client.xpending_range(
+            self.queue.stream,
+            self.queue.group,
+            min=messages[0][0],
+            max=messages[-1][0],
+            count=len(messages),
+            consumername=self.consumer
+        )
+        exhausted = [p["message_id"] for p in pending if p["times_delivered"] > self.max_deliveries]
+        if exhausted:
+            self._dead_letter(exhausted)
+        return [m for m in messages if m[0] not in exhausted]
+
+    def process_batch(self, block_ms: int = 5000) -> int:
+        """메시지 한 배치 처리, 처리한 메시지 수 반환"""
+        messages = self._claim_stale()
+        if not messages:
+            response = self.queue.redis.xreadgroup(
+                self.queue.group,
+                self.consumer,
+                {self.queue.stream: ">"},
+                count=self.batch_size,
+                block=block_ms
+            )
+            messages = response[0][1] if response else []
+        if not messages:
+            return 0
+
+        message_ids = [message_id for message_id, _ in messages]
+        # 저장 경로마다 키워드 수가 다르므로 키워드 수별로 나눠 보강 (같은 id는 먼저 들어온 요청 기준)
+        by_top_n: Dict[int, List[int]] = {}
+        seen = set()
+        for _, fields in messages:
+            survey_id = int(fields["id"])
+            if survey_id not in seen:
+                seen.add(survey_id)
+                by_top_n.setdefault(int(fields.get("top_n") or self.keyword_top_n), []).append(survey_id)
+
+        # 실패하면 ack하지 않으므로 claim_idle_ms 후 다시 처리됨
+        enriched = sum(self.enrich(sorted(ids), top_n) for top_n, ids in by_top_n.items())
+
+        self.queue.redis.xack(self.queue.stream, self.queue.group, *message_ids)
+        self.queue.redis.xdel(self.queue.stream, *message_ids)
+        if enriched:
+            print(f"🏷️  Enriched {enriched} papers ({len(message_ids)} messages)")
+            cache = getattr(self.keyword_extractor, "cache", None)
+            if cache is not None:
+                self.queue.report_worker_stats(self.consumer, {"keyword_cache": cache.stats()})
+        return len(message_ids)
+
+    def sweep(self, limit: int = 1000) -> int:
+        """큐에 들어가지 못한 미처리 논문을 다시 넣음 (dead-letter로 옮긴 논문은 다시 넣지 않음)"""
+        dead_letters = self.queue.dead_lettered_ids()
+        db = self.session_factory()
+        try:
+            query = db.query(Survey.id).filter(needs_enrichment())
+            if dead_letters:
+                query = query.filter(Survey.id.notin_(dead_letters))
+            survey_ids = [row.id for row in query.limit(limit).all()]
+        finally:
+            db.close()
+
+        self.queue.enqueue(survey_ids)
+        return len(survey_ids)
+
+    def run_forever(self, sweep_interval: int = ENRICH_SWEEP_INTERVAL) -> None:
+        self.queue.ensure_group()
+        print(f"🚀 Enrichment worker {self.consumer} started")
+
+        next_sweep = 0.0
+        while True:
+            try:
+                if sweep_interval and time.monotonic() >= next_sweep:
+                    swept = self.sweep()
+                    if swept:
+                        print(f"🧹 Re-queued {swept} papers waiting for enrichment")
+                    next_sweep = time.monotonic() + sweep_interval
+                self.process_batch()
+            except Exception as e:
+                print(f"❌ Enrichment batch failed (will be retried): {e}")
+                time.sleep(1)
+
+
+def run_worker(index: int, sweep: bool) -> None:
+    from keyword_extractor import KeywordExtractor, KeywordCache
+    from scraper import ArxivScraper
+
+    engine = create_engine(DATABASE_URL)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    worker = EnrichmentWorker(
+        EnrichmentQueue(REDIS_URL),
+        SessionLocal,
+        KeywordExtractor(cache=KeywordCache(REDIS_URL)),
+        ArxivScraper().estimate_reading_time,
+        consumer=f"{socket.gethostname()}-{index}"
+    )
+    # sweep은 첫 번째 워커만
+    worker.run_forever(sweep_interval=ENRICH_SWEEP_INTERVAL if sweep else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="논문 키워드/읽기 시간 보강 워커")
+    parser.add_argument("--workers", type=int, default=ENRICH_WORKERS, help="워커 프로세스 수")
+    args = parser.parse_args()
+
+    EnrichmentQueue(REDIS_URL).ensure_group()
+
+    processes = [
+        # 워커가 키워드 추출용 프로세스 풀을 만들 수 있도록 daemon으로 실행하지 않음
+        multiprocessing.Process(target=run_worker, args=(i, i == 0))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+ArXiv 수집 워커
+제출일(submittedDate) 구간 단위로 survey 논문을 가져와 surveys 테이블에 저장한다.
+구간을 저장할 때마다 워터마크를 DB(harvest_state)에 기록하므로, 중단되어도 마지막 구간부터 이어서 수집한다.
+API 요청 경로는 이 워커가 채운 로컬 코퍼스만 읽는다.
+
+사용법:
+    python harvester.py                      # 계속 실행 (HARVEST_INTERVAL 주기)
+    python harvester.py --once               # 현재 시각까지 한 번만 수집
+    python harvester.py --once --fixtures ./atom-fixtures   # 네트워크 없이 Atom fixture 디렉토리로 실행
+    ARXIV_TRANSPORT_MODE=record python harvester.py --once  # 실제 응답을 ARXIV_CASSETTE_DIR에 기록
+    ARXIV_TRANSPORT_MODE=replay python harvester.py --once  # 기록된 응답으로 재실행 (네트워크 없음)
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, HarvestState
+from scraper import ArxivScraper
+from keyword_extractor import KeywordExtractor, KeywordCache
+from arxiv_client import AsyncRateLimiter
+from ingest import ingest_papers
+from enrichment import EnrichmentQueue
+
+# 환경 변수
+DATABASE_URL = os.getenv("DATABASE_URL")
+REDIS_URL = os.getenv("REDIS_URL")
+HARVEST_QUERY = os.getenv(
+    "HARVEST_QUERY",
+    '(cat:cs.AI OR cat:cs.LG OR cat:cs.CV OR cat:cs.CL OR cat:cs.NE OR cat:stat.ML OR cat:cs.IR OR cat:cs.RO) '
+    'AND (ti:survey OR ti:comprehensive OR ti:"a review")'
+)
+HARVEST_START = os.getenv("HARVEST_START", "2018-01-01")
+HARVEST_WINDOW_DAYS = int(os.getenv("HARVEST_WINDOW_DAYS", "7"))
+HARVEST_OVERLAP_HOURS = int(os.getenv("HARVEST_OVERLAP_HOURS", "48"))
+HARVEST_INTERVAL = int(os.getenv("HARVEST_INTERVAL", str(60 * 60)))
+HARVEST_WINDOW_MAX_RESULTS = int(os.getenv("HARVEST_WINDOW_MAX_RESULTS", "1000"))
+HARVEST_STATE_NAME = "arxiv_surveys"
+
+
+class Harvester:
+    def __init__(
+        self,
+        scraper: ArxivScraper,
+        session_factory,
+        keyword_extractor: KeywordExtractor,
+        query: str = HARVEST_QUERY,
+        start: datetime = datetime.fromisoformat(HARVEST_START),
+        window: timedelta = timedelta(days=HARVEST_WINDOW_DAYS),
+        overlap: timedelta = timedelta(hours=HARVEST_OVERLAP_HOURS),
+        window_max_results: int = HARVEST_WINDOW_MAX_RESULTS,
+        enrichment_queue: Optional[EnrichmentQueue] = None
+    ):
+        """
+        Args:
+            scraper: ArXiv 검색기
+            session_factory: DB 세션 팩토리
+            keyword_extractor: 키워드 추출기
+            query: 수집 대상 검색 쿼리
+            start: 워터마크가 없을 때 수집 시작 시각
+            window: 한 번에 가져올 제출일 구간 길이
+            overlap: 실행마다 워터마크보다 이만큼 앞에서 시작 (늦게 색인된 논문 보정)
+            window_max_results: 구간당 최대 결과 수 (넘으면 구간을 반으로 나눔, 1시간 이하 구간은 모든 페이지 수집)
+            enrichment_queue: 보강 큐, 있으면 키워드/읽기 시간은 enrichment 워커가 채움
+        """
+        self.scraper = scraper
+        self.session_factory = session_factory
+        self.keyword_extractor = keyword_extractor
+        self.query = query
+        self.start = start
+        self.window = window
+        self.overlap = overlap
+        self.window_max_results = window_max_results
+        self.enrichment_queue = enrichment_queue
+
+    def load_watermark(self) -> Optional[datetime]:
+        db = self.session_factory()
+        try:
+            state = db.query(HarvestState).filter(HarvestState.name == HARVEST_STATE_NAME).first()
+            return state.watermark if state else None
+        finally:
+            db.close()
+
+    def save_watermark(self, watermark: datetime) -> None:
+        db = self.session_factory()
+        try:
+            state = db.query(HarvestState).filter(HarvestState.name == HARVEST_STATE_NAME).first()
+            if state:
+                state.watermark = watermark
+            else:
+                db.add(HarvestState(name=HARVEST_STATE_NAME, watermark=watermark))
+            db.commit()
+        finally:
+            db.close()
+
+    def store(self, records: List[Dict]) -> int:
+        """DB에 없는 논문만 일괄 저장, 새로 저장한 수 반환"""
+        db = self.session_factory()
+        try:
+            _, new_count = ingest_papers(
+                db,
+                records,
+                self.keyword_extractor,
+                self.scraper.estimate_reading_time,
+                keyword_top_n=5,
+                enrichment_queue=self.enrichment_queue
+            )
+            return new_count
+        finally:
+            db.close()
+
+    async def harvest_window(self, start: datetime, end: datetime) -> int:
+        """
+        구간 하나 수집
+        결과 수를 먼저 확인해 상한을 넘으면 구간을 나눠서 수집하고,
+        더 나눌 수 없는 구간(1시간 이하)은 상한을 넘더라도 모든 페이지를 가져옴 (잘린 채 워터마크를 넘기지 않도록)
+        """
+        total = await self.scraper.count_submitted_between(self.query, start, end)
+        if total == 0:
+            return 0
+
+        if total > self.window_max_results:
+            if end - start > timedelta(hours=1):
+                middle = start + (end - start) / 2
+                return await self.harvest_window(start, middle) + await self.harvest_window(middle, end)
+            print(
+                f"⚠️  {start:%Y-%m-%d %H:%M} ~ {end:%Y-%m-%d %H:%M} has {total} results "
+                f"(over {self.window_max_results}), fetching all pages"
+            )
+
+        records = await self.scraper.search_submitted_between(
+            self.query, start, end, max_results=max(total, self.window_max_results)
+        )
+        return self.store(records)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """워터마크부터 현재 시각까지 수집, 새로 저장한 논문 수 반환"""
+        now = now or datetime.utcnow()
+        watermark = self.load_watermark()
+        cursor = max(self.start, watermark - self.overlap) if watermark else self.start
+
+        total = 0
+        while cursor < now:
+            end = min(cursor + self.window, now)
+            new_count = await self.harvest_window(cursor, end)
+            total += new_count
+            # 구간 저장이 끝난 뒤에만 워터마크 전진
+            self.save_watermark(end)
+            print(f"📥 Harvested {cursor:%Y-%m-%d %H:%M} ~ {end:%Y-%m-%d %H:%M}: {new_count} new papers")
+            cursor = end
+
+        return total
+
+    async def run_forever(self, interval: int = HARVEST_INTERVAL) -> None:
+        while True:
+            try:
+                total = await self.run_once()
+                print(f"✅ Harvest cycle finished: {total} new papers")
+            except Exception as e:
+                print(f"❌ Harvest cycle failed (will resume from watermark): {e}")
+            await asyncio.sleep(interval)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ArXiv survey 논문 수집 워커")
+    parser.add_argument("--once", action="store_true", help="현재 시각까지 한 번만 수집하고 종료")
+    parser.add_argument("--fixtures", help="네트워크 대신 사용할 Atom fixture 디렉토리")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    if args.fixtures:
+        from arxiv_transport import FixtureTransport
+        scraper = ArxivScraper(rate_limiter=AsyncRateLimiter(min_interval=0), transport=FixtureTransport(args.fixtures))
+        rate_limiter = None
+        # fixture 실행은 Redis 없이 키워드/읽기 시간까지 바로 저장
+        enrichment_queue = None
+    else:
+        from rate_limiter import RedisTokenBucket
+        rate_limiter = RedisTokenBucket(REDIS_URL, key="arxiv:ratelimit")
+        scraper = ArxivScraper(rate_limiter=rate_limiter)
+        enrichment_queue = EnrichmentQueue(REDIS_URL)
+
+    # fixture 실행은 프로세스 내 캐시만 사용
+    keyword_cache = KeywordCache(None if args.fixtures else REDIS_URL)
+    harvester = Harvester(
+        scraper, SessionLocal, KeywordExtractor(cache=keyword_cache), enrichment_queue=enrichment_queue
+    )
+    try:
+        if args.once:
+            total = await harvester.run_once()
+            print(f"✅ Harvest finished: {total} new papers")
+        else:
+            await harvester.run_forever()
+    finally:
+        await scraper.close()
+        if rate_limiter is not None:
+            await rate_limiter.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+"""
+외부 서비스 호출용 HTTP 클라이언트
+애플리케이션 수명 동안 하나의 커넥션 풀(keep-alive)을 공유하고,
+호출 실패가 이어지면 서킷 브레이커가 요청을 즉시 거부한다.
+"""
+import time
+from typing import Dict, Optional
+
+import httpx
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 요청을 보내지 않음"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        """
+        Args:
+            failure_threshold: 서킷을 여는 연속 실패 횟수
+            reset_timeout: 서킷이 열린 뒤 시험 요청을 허용하기까지 대기 시간 (초)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.total_rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+
+        # half-open: 시험 요청은 한 번에 하나만 허용
+        if self._probe_in_flight:
+            self.total_rejected += 1
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """결과를 판단할 수 없이 끝난 요청(취소 등) - 상태는 그대로 두고 다음 시험 요청을 허용"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected
+        }
+
+
+class ServiceClient:
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 1.0,
+        read_timeout: float = 2.0,
+        pool_timeout: float = 1.0,
+        http2: bool = False,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            base_url: 대상 서비스 주소
+            max_connections: 커넥션 풀 최대 연결 수
+            max_keepalive_connections: 유지할 유휴 연결 수
+            keepalive_expiry: 유휴 연결 유지 시간 (초)
+            connect_timeout / read_timeout / pool_timeout: 호출별 타임아웃 (초)
+            http2: HTTP/2 사용 여부 (h2 패키지 필요)
+            breaker: 서킷 브레이커 (없으면 기본값으로 생성)
+        """
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=read_timeout,
+            pool=pool_timeout
+        )
+        self.http2 = http2
+        self.breaker = breaker or CircuitBreaker()
+        self.client: Optional[httpx.AsyncClient] = None
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+
+    async def start(self) -> None:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        """
+        GET 요청
+
+        Raises:
+            CircuitOpenError: 서킷이 열려 있을 때 (요청을 보내지 않음)
+            httpx.RequestError: 연결 실패/타임아웃
+        """
+        if self.client is None:
+            await self.start()
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.total_requests += 1
+        try:
+            response = await self.client.get(path, **kwargs)
+        except httpx.RequestError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # 취소(CancelledError) 등은 대상 서비스 장애가 아니지만 시험 요청 표시는 풀어야 함
+            self.breaker.release_probe()
+            raise
+        finally:
+            self.in_flight -= 1
+
+        # 5xx는 대상 서비스 장애로 간주 (401 등 4xx는 정상 응답)
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        return response
+
+    def stats(self) -> Dict:
+        pool = {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "total_requests": self.total_requests,
+            "http2": self.http2
+        }
+
+        # httpcore 커넥션 풀 상태 (내부 구현이므로 없으면 생략)
+        connections = getattr(getattr(getattr(self.client, "_transport", None), "_pool", None), "connections", None)
+        if connections is not None:
+            pool["open_connections"] = len(connections)
+            pool["idle_connections"] = sum(1 for c in connections if c.is_idle())
+
+        return {
+            "base_url": self.base_url,
+            "pool": pool,
+            "circuit_breaker": self.breaker.stats()
+        }
@@ -0,0 +1,111 @@
+"""
+추천 색인 불러오기 벤치마크 (joblib vs mmap)
+
+합성 코퍼스로 색인을 만들어 두 형식으로 저장한 뒤, 워커 수만큼 프로세스를 동시에 띄워
+각 워커가 색인을 불러오고 추천을 한 번 계산(모든 페이지를 건드림)한 상태에서
+불러오기 시간과 메모리(RSS, PSS, private)를 비교한다.
+mmap 색인의 페이지는 워커끼리 공유되므로 RSS에는 잡히지만 PSS/private는 워커 수만큼 나뉜다.
+(PSS/private는 리눅스 /proc/self/smaps_rollup 기준)
+
+사용법:
+    python index_load_benchmark.py --papers 50000 --workers 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from typing import Dict
+
+from keyword_benchmark import make_synthetic_corpus
+from recommender import RecommenderIndex, SurveyRecommender, publish_index, load_index
+
+
+def memory_usage() -> Dict[str, float]:
+    """현재 프로세스 메모리 (MB)"""
+    usage = {'rss': 0.0, 'pss': 0.0, 'private': 0.0}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                kb = float(value.split()[0]) if value.strip() else 0.0
+                if name == "Rss":
+                    usage['rss'] = kb / 1024
+                elif name == "Pss":
+                    usage['pss'] = kb / 1024
+                elif name in ("Private_Clean", "Private_Dirty"):
+                    usage['private'] += kb / 1024
+    except FileNotFoundError:
+        import resource
+        usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+
+def worker(directory: str, version: str, query: Dict, ready, done, results) -> None:
+    baseline = memory_usage()
+    started = time.perf_counter()
+    index = load_index(directory, version)
+    load_seconds = time.perf_counter() - started
+
+    recommender = SurveyRecommender()
+    recommender.index = index
+    recommender.recommend_indexed([query], top_n=10)
+
+    # 모든 워커가 색인을 들고 있는 상태에서 측정해야 공유 페이지가 PSS에 나뉘어 반영됨
+    ready.wait()
+    usage = memory_usage()
+    results.put({
+        'load': load_seconds,
+        **{key: usage[key] - baseline[key] for key in usage}
+    })
+    done.wait()
+
+
+def measure(directory: str, version: str, query: Dict, workers: int) -> Dict[str, float]:
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(workers + 1)
+    done = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(directory, version, query, ready, done, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    samples = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+
+    return {key: sum(sample[key] for sample in samples) / len(samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 색인 형식별 불러오기 시간/메모리 비교")
+    parser.add_argument("--papers", type=int, default=50000, help="코퍼스 논문 수")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 색인을 여는 워커 수")
+    args = parser.parse_args()
+
+    docs = make_synthetic_corpus(args.papers)
+    papers = [
+        {'id': i + 1, 'title': title, 'abstract': abstract, 'keywords': ''}
+        for i, (title, abstract) in enumerate(docs)
+    ]
+    index = RecommenderIndex.build(papers)
+    print(f"📊 {args.papers} papers, {index.tfidf_matrix.nnz} non-zeros, {args.workers} workers")
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{'format':<8}{'load ms':>10}{'RSS MB':>10}{'PSS MB':>10}{'private MB':>12}  (per worker)")
+        for fmt in ("joblib", "mmap"):
+            directory = os.path.join(root, fmt)
+            publish_index(index, directory, fmt=fmt)
+            stats = measure(directory, index.version, papers[0], args.workers)
+            print(
+                f"{fmt:<8}{stats['load'] * 1000:>10.1f}{stats['rss']:>10.1f}"
+                f"{stats['pss']:>10.1f}{stats['private']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+ArXiv 검색 결과 일괄 저장
+검색/추천/수집 경로가 공유하는 저장 함수.
+
+1. 들어온 arxiv_id 전체를 IN 쿼리 한 번으로 조회
+2. DB에 없는 논문만 multi-row INSERT ... ON DUPLICATE KEY UPDATE 로 한 트랜잭션에 저장
+3. 입력 순서대로 Survey 행 반환
+
+보강 큐(enrichment.EnrichmentQueue)를 넘기면 키워드 추출/읽기 시간 추정 없이 원본만 저장하고
+새 논문 id를 큐에 넣은 뒤 바로 반환한다 (보강은 enrichment 워커가 처리).
+
+논문마다 SELECT / commit / refresh 를 반복하던 방식(요청당 최대 1,500 왕복, 500 커밋)을
+요청당 쿼리 3번(조회, 저장, 재조회)과 커밋 1번으로 줄인다.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from models import Survey
+
+# 한 INSERT 문에 넣을 최대 행 수 (max_allowed_packet 보호)
+INSERT_CHUNK_SIZE = 500
+
+
+def _insert_ignoring_duplicates(dialect_name: str, rows: List[Dict]):
+    """이미 있는 arxiv_id(동시에 다른 요청이 저장한 경우)는 건너뛰는 INSERT 문"""
+    if dialect_name == "mysql":
+        stmt = mysql.insert(Survey).values(rows)
+        # 중복 시 아무 것도 바꾸지 않음 (기존 키워드/조회수 유지)
+        return stmt.on_duplicate_key_update(arxiv_id=stmt.inserted.arxiv_id)
+    if dialect_name == "postgresql":
+        return postgresql.insert(Survey).values(rows).on_conflict_do_nothing(index_elements=["arxiv_id"])
+    if dialect_name == "sqlite":
+        return sqlite.insert(Survey).values(rows).on_conflict_do_nothing(index_elements=["arxiv_id"])
+    raise ValueError(f"Unsupported database dialect: {dialect_name}")
+
+
+def ingest_papers(
+    db: Session,
+    records: List[Dict],
+    keyword_extractor,
+    estimate_reading_time: Callable[[str], Dict[str, int]],
+    keyword_top_n: int = 5,
+    tags: Optional[str] = None,
+    backfill_keywords: bool = False,
+    enrichment_queue=None
+) -> Tuple[List[Survey], int]:
+    """
+    ArXiv 레코드를 surveys 테이블에 일괄 저장
+
+    Args:
+        db: DB 세션
+        records: ArXiv 검색 결과 (arxiv_client.parse_entry 형식)
+        keyword_extractor: 키워드 추출기 (새 논문에만 사용)
+        estimate_reading_time: 초록으로 읽기 시간을 추정하는 함수
+        keyword_top_n: 새 논문에 저장할 키워드 수
+        tags: 새 논문에 붙일 태그
+        backfill_keywords: 기존 논문에 키워드가 없으면 함께 채움
+        enrichment_queue: 보강 큐, 있으면 키워드/읽기 시간을 요청 안에서 계산하지 않고 큐에 넣음
+
+    Returns:
+        (입력 순서대로의 Survey 리스트 (중복 제거), 새로 저장한 논문 수)
+    """
+    # 입력 순서를 유지하며 중복 제거
+    unique: Dict[str, Dict] = {}
+    for record in records:
+        unique.setdefault(record["arxiv_id"], record)
+    if not unique:
+        return [], 0
+
+    arxiv_ids = list(unique)
+    surveys = {
+        survey.arxiv_id: survey
+        for survey in db.query(Survey).filter(Survey.arxiv_id.in_(arxiv_ids)).all()
+    }
+
+    if backfill_keywords and enrichment_queue is None:
+        for survey in surveys.values():
+            if not survey.keywords:
+                keywords = keyword_extractor.extract_from_title_and_abstract(
+                    survey.title, survey.abstract, top_n=keyword_top_n
+                )
+                survey.keywords = ", ".join(keywords)
+
+    rows = []
+    for arxiv_id, record in unique.items():
+        if arxiv_id in surveys:
+            continue
+
+        row = {
+            "arxiv_id": arxiv_id,
+            "title": record["title"],
+            "abstract": record["abstract"],
+            "keywords": None,
+            "authors": record["authors"],
+            "published_date": record["published_date"],
+            "pdf_url": record["pdf_url"],
+            "categories": record["categories"],
+            "estimated_reading_time_beginner": None,
+            "estimated_reading_time_intermediate": None,
+            "estimated_reading_time_advanced": None,
+            "tags": tags,
+            "view_count": 0
+        }
+        if enrichment_queue is None:
+            keywords = keyword_extractor.extract_from_title_and_abstract(
+                record["title"],
+                record["abstract"],
+                top_n=keyword_top_n
+            )
+            reading_times = estimate_reading_time(record["abstract"])
+            row["keywords"] = ", ".join(keywords)
+            row["estimated_reading_time_beginner"] = reading_times["beginner"]
+            row["estimated_reading_time_intermediate"] = reading_times["intermediate"]
+            row["estimated_reading_time_advanced"] = reading_times["advanced"]
+        rows.append(row)
+
+    try:
+        dialect_name = db.get_bind().dialect.name
+        for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.execute(_insert_ignoring_duplicates(dialect_name, rows[i:i + INSERT_CHUNK_SIZE]))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # 커밋으로 만료된 기존 행과 새로 저장한 행(동시에 다른 요청이 저장한 행 포함)을 한 번에 다시 조회
+    surveys = {
+        survey.arxiv_id: survey
+        for survey in db.query(Survey).filter(Survey.arxiv_id.in_(arxiv_ids)).all()
+    }
+
+    if enrichment_queue is not None:
+        new_ids = {row["arxiv_id"] for row in rows}
+        pending = [
+            survey.id for survey in surveys.values()
+            if survey.arxiv_id in new_ids or (backfill_keywords and not survey.keywords)
+        ]
+        try:
+            enrichment_queue.enqueue(pending, keyword_top_n)
+        except RedisError as e:
+            # 큐에 못 넣은 논문은 enrichment 워커의 sweep이 다시 넣음
+            print(f"Enrichment enqueue failed: {e}")
+
+    return [surveys[arxiv_id] for arxiv_id in arxiv_ids if arxiv_id in surveys], len(rows)
@@ -0,0 +1,91 @@
+"""
+KeywordExtractor.extract_batch 처리량 벤치마크
+
+워커 수(기본 1, 2, 4, 8)별로 같은 코퍼스의 키워드를 추출해 초당 문서 수를 비교하고,
+모든 결과가 순차 처리(extract_from_title_and_abstract) 결과와 같은지 확인한다.
+워커 풀 생성 비용은 한 번 예열한 뒤 측정에서 제외한다.
+
+사용법:
+    python keyword_benchmark.py --fixtures ./atom-fixtures   # ArXiv Atom 응답 파일들의 논문 사용
+    python keyword_benchmark.py --docs 500                   # fixture가 없으면 합성 코퍼스 사용
+    python keyword_benchmark.py --workers 1 2 4 8 --top-n 5
+"""
+import argparse
+import glob
+import os
+import random
+import time
+from typing import List, Tuple
+
+import feedparser
+
+from arxiv_client import parse_entry
+from keyword_extractor import KeywordExtractor
+
+
+def load_fixture_corpus(fixtures_dir: str) -> List[Tuple[str, str]]:
+    docs = {}
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "**", "*.xml"), recursive=True)):
+        for entry in feedparser.parse(path).entries:
+            record = parse_entry(entry)
+            docs[record["arxiv_id"]] = (record["title"], record["abstract"])
+    return list(docs.values())
+
+
+def make_synthetic_corpus(count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    vocabulary = (
+        "survey review deep learning neural network graph transformer attention language model "
+        "reinforcement policy vision image segmentation detection diffusion generative adversarial "
+        "federated privacy optimization gradient convergence benchmark dataset evaluation robustness "
+        "explainability interpretability retrieval recommendation knowledge representation multimodal "
+        "speech audio time series forecasting anomaly medical clinical autonomous driving robotics"
+    ).split()
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(count):
+        title = "A Survey of " + " ".join(rng.choice(vocabulary) for _ in range(5)).title()
+        sentences = [
+            " ".join(rng.choice(vocabulary) for _ in range(rng.randint(8, 20))).capitalize() + "."
+            for _ in range(rng.randint(8, 14))
+        ]
+        docs.append((title, " ".join(sentences)))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키워드 일괄 추출 처리량 비교")
+    parser.add_argument("--fixtures", help="ArXiv Atom 응답(*.xml) 디렉토리")
+    parser.add_argument("--docs", type=int, default=500, help="합성 코퍼스 문서 수 (fixture가 없을 때)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="비교할 워커 수")
+    parser.add_argument("--top-n", type=int, default=5, help="문서당 키워드 수")
+    args = parser.parse_args()
+
+    docs = load_fixture_corpus(args.fixtures) if args.fixtures else make_synthetic_corpus(args.docs)
+    print(f"📊 {len(docs)} documents, top {args.top_n} keywords, {os.cpu_count()} CPUs")
+
+    serial = KeywordExtractor(workers=1)
+    expected = [serial.extract_from_title_and_abstract(title, abstract, args.top_n) for title, abstract in docs]
+
+    print(f"{'workers':>8}{'seconds':>10}{'docs/s':>10}{'speedup':>9}  matches serial")
+    baseline = None
+    for workers in args.workers:
+        extractor = KeywordExtractor(workers=workers)
+        try:
+            # 워커 프로세스 생성과 YAKE 초기화는 측정에서 제외
+            extractor.extract_batch(docs[:workers * 2], top_n=args.top_n)
+
+            started = time.perf_counter()
+            results = extractor.extract_batch(docs, top_n=args.top_n)
+            elapsed = time.perf_counter() - started
+        finally:
+            extractor.close()
+
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>8}{elapsed:>10.2f}{len(docs) / elapsed:>10.1f}{baseline / elapsed:>8.2f}x"
+            f"  {'✅' if results == expected else '❌'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
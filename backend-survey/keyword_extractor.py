@@ -1,27 +1,178 @@
 """
 키워드 추출 모듈
 YAKE(Yet Another Keyword Extractor)를 사용하여 논문 초록에서 핵심 키워드 추출
+YAKE는 순수 Python이라 여러 논문을 한 번에 처리할 때는 extract_batch로 여러 코어에 나눠 실행한다.
+같은 텍스트(버전만 다른 논문, 겹치는 검색 결과)는 KeywordCache로 YAKE를 다시 돌리지 않는다.
 """
+import hashlib
+import json
+import math
+import os
 import yake
-from typing import List
+import redis
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# 문서: 텍스트 하나 또는 (제목, 초록)
+Document = Union[str, Tuple[str, str]]
+
+KEYWORD_WORKERS = int(os.getenv("KEYWORD_WORKERS", str(os.cpu_count() or 1)))
+KEYWORD_CACHE_MAX_ENTRIES = int(os.getenv("KEYWORD_CACHE_MAX_ENTRIES", "20000"))
+KEYWORD_CACHE_TTL = int(os.getenv("KEYWORD_CACHE_TTL", str(60 * 60 * 24 * 30)))
+
+# 워커 프로세스마다 하나씩 유지하는 추출기 (YAKE 초기화 비용을 청크마다 반복하지 않음)
+_worker_extractor: Optional["KeywordExtractor"] = None
+
+
+def _init_worker() -> None:
+    global _worker_extractor
+    _worker_extractor = KeywordExtractor(workers=1)
+
+
+def _extract_chunk(texts: List[str]) -> List[Optional[List[str]]]:
+    return [_worker_extractor._run_yake(text) for text in texts]
+
+
+def normalize_text(text: str) -> str:
+    """공백/줄바꿈 차이를 무시한 텍스트 (ArXiv 초록은 줄바꿈 위치가 버전마다 다름)"""
+    return " ".join(text.split()) if text else ""
+
+
+class KeywordCache:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        prefix: str = "kw",
+        max_entries: int = KEYWORD_CACHE_MAX_ENTRIES,
+        ttl: int = KEYWORD_CACHE_TTL
+    ):
+        """
+        키워드 추출 결과 캐시 (프로세스 내 LRU → Redis 순서로 조회)
+
+        Args:
+            redis_url: Redis 주소 (없으면 프로세스 내 LRU만 사용)
+            prefix: Redis 키 접두사
+            max_entries: 프로세스 내 LRU 최대 항목 수
+            ttl: Redis 항목 유지 시간 (초)
+        """
+        self.redis = redis.from_url(redis_url, decode_responses=True) if redis_url else None
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local: "OrderedDict[str, List[str]]" = OrderedDict()
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def make_key(self, text: str, settings: str) -> str:
+        """정규화한 텍스트와 YAKE 설정(언어, n-gram, 중복 임계값, 최대 키워드 수)의 해시"""
+        digest = hashlib.sha1(f"{settings}\n{text}".encode()).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def _remember(self, key: str, keywords: List[str]) -> None:
+        self._local[key] = keywords
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[str]]:
+        found: Dict[str, List[str]] = {}
+        remote_keys = []
+        for key in keys:
+            keywords = self._local.get(key)
+            if keywords is not None:
+                self._local.move_to_end(key)
+                found[key] = keywords
+                self.local_hits += 1
+            else:
+                remote_keys.append(key)
+
+        if remote_keys and self.redis is not None:
+            try:
+                values = self.redis.mget(remote_keys)
+            except redis.exceptions.RedisError as e:
+                self.errors += 1
+                print(f"Keyword cache read failed: {e}")
+                values = [None] * len(remote_keys)
+            for key, value in zip(remote_keys, values):
+                if value is not None:
+                    keywords = json.loads(value)
+                    self._remember(key, keywords)
+                    found[key] = keywords
+                    self.redis_hits += 1
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, List[str]]) -> None:
+        for key, keywords in items.items():
+            self._remember(key, keywords)
+
+        if items and self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, keywords in items.items():
+                    pipe.set(key, json.dumps(keywords, ensure_ascii=False), ex=self.ttl)
+                pipe.execute()
+            except redis.exceptions.RedisError as e:
+                self.errors += 1
+                print(f"Keyword cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else None,
+            "local_entries": len(self._local),
+            "errors": self.errors
+        }
 
 
 class KeywordExtractor:
-    def __init__(self):
+    def __init__(self, workers: int = KEYWORD_WORKERS, cache: Optional[KeywordCache] = None):
         """
         YAKE 키워드 추출기 초기화
         - language: 언어 설정 (en = 영어)
         - max_ngram_size: 최대 n-gram 크기
         - deduplication_threshold: 중복 제거 임계값
         - numOfKeywords: 추출할 키워드 수
+
+        Args:
+            workers: extract_batch에서 사용할 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
+            cache: 추출 결과 캐시 (없으면 매번 YAKE 실행)
         """
-        self.extractor = yake.KeywordExtractor(
-            lan="en",
-            n=3,  # unigram, bigram, trigram
-            dedupLim=0.9,
-            top=10,
-            features=None
-        )
+        params = {
+            "lan": "en",
+            "n": 3,  # unigram, bigram, trigram
+            "dedupLim": 0.9,
+            "top": 10
+        }
+        self.extractor = yake.KeywordExtractor(**params, features=None)
+        # 캐시에는 최대 키워드 수(top)만큼 저장하고 top_n은 잘라서 반환
+        # 캐시 키에 추출 설정을 넣어 설정이 바뀌면 이전 결과를 쓰지 않음
+        self.settings = "|".join(str(value) for value in params.values())
+        self.cache = cache
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _run_yake(self, text: str) -> Optional[List[str]]:
+        """정규화된 텍스트에서 YAKE 키워드 전체(최대 top개) 추출, 실패 시 None"""
+        try:
+            # YAKE로 키워드 추출
+            keywords = self.extractor.extract_keywords(text)
+
+            # 점수가 낮을수록 좋은 키워드 (YAKE 특성)
+            # (keyword, score) 형태로 반환되므로 keyword만 추출
+            return [kw[0] for kw in keywords]
+
+        except Exception as e:
+            print(f"키워드 추출 오류: {e}")
+            return None
 
     def extract_keywords(self, text: str, top_n: int = 3) -> List[str]:
         """
@@ -34,22 +185,23 @@ class KeywordExtractor:
         Returns:
             추출된 키워드 리스트
         """
-        if not text or not text.strip():
+        text = normalize_text(text)
+        if not text:
             return []
 
-        try:
-            # YAKE로 키워드 추출
-            keywords = self.extractor.extract_keywords(text)
-
-            # 점수가 낮을수록 좋은 키워드 (YAKE 특성)
-            # (keyword, score) 형태로 반환되므로 keyword만 추출
-            top_keywords = [kw[0] for kw in keywords[:top_n]]
-
-            return top_keywords
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(text, self.settings)
+            cached = self.cache.get_many([key]).get(key)
+            if cached is not None:
+                return cached[:top_n]
 
-        except Exception as e:
-            print(f"키워드 추출 오류: {e}")
+        keywords = self._run_yake(text)
+        if keywords is None:
             return []
+        if key is not None:
+            self.cache.set_many({key: keywords})
+        return keywords[:top_n]
 
     def extract_from_title_and_abstract(
         self, title: str, abstract: str, top_n: int = 3
@@ -69,3 +221,82 @@ class KeywordExtractor:
         # 제목에 가중치 부여 (제목을 2번 반복)
         combined_text = f"{title} {title} {abstract}"
         return self.extract_keywords(combined_text, top_n)
+
+    def extract_document(self, doc: Document, top_n: int = 3) -> List[str]:
+        """텍스트 또는 (제목, 초록) 문서 하나에서 키워드 추출"""
+        if isinstance(doc, str):
+            return self.extract_keywords(doc, top_n)
+        title, abstract = doc
+        return self.extract_from_title_and_abstract(title, abstract, top_n)
+
+    @staticmethod
+    def _document_text(doc: Document) -> str:
+        if isinstance(doc, str):
+            return normalize_text(doc)
+        title, abstract = doc
+        return normalize_text(f"{title} {title} {abstract}")
+
+    def extract_batch(
+        self, docs: Sequence[Document], top_n: int = 3, chunk_size: Optional[int] = None
+    ) -> List[List[str]]:
+        """
+        여러 문서의 키워드를 프로세스 풀로 나눠 추출
+
+        Args:
+            docs: 텍스트 또는 (제목, 초록) 리스트
+            top_n: 문서당 추출할 키워드 수
+            chunk_size: 워커에 한 번에 넘길 문서 수 (기본: 워커당 4청크가 되도록)
+
+        Returns:
+            입력 순서대로의 키워드 리스트 (순차 처리 결과와 동일)
+        """
+        texts = [self._document_text(doc) for doc in docs]
+        results: List[Optional[List[str]]] = [[] if not text else None for text in texts]
+
+        # 캐시에 있는 문서는 YAKE를 다시 돌리지 않음
+        keys: List[Optional[str]] = [None] * len(texts)
+        if self.cache is not None:
+            keys = [self.cache.make_key(text, self.settings) if text else None for text in texts]
+            cached = self.cache.get_many(sorted({key for key in keys if key}))
+            for i, key in enumerate(keys):
+                if key in cached:
+                    results[i] = cached[key]
+
+        # 같은 텍스트가 배치 안에 여러 번 있으면 한 번만 추출
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                pending.setdefault(text, []).append(i)
+        pending_texts = list(pending)
+
+        if self.workers == 1 or len(pending_texts) < 2 * self.workers:
+            extracted = [self._run_yake(text) for text in pending_texts]
+        else:
+            if chunk_size is None:
+                chunk_size = max(1, math.ceil(len(pending_texts) / (self.workers * 4)))
+            chunks = [pending_texts[i:i + chunk_size] for i in range(0, len(pending_texts), chunk_size)]
+
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+            # map은 제출 순서대로 결과를 돌려줌
+            extracted = []
+            for chunk_result in self._pool.map(_extract_chunk, chunks):
+                extracted.extend(chunk_result)
+
+        new_entries: Dict[str, List[str]] = {}
+        for text, keywords in zip(pending_texts, extracted):
+            indices = pending[text]
+            for i in indices:
+                results[i] = keywords or []
+            if keywords is not None and keys[indices[0]] is not None:
+                new_entries[keys[indices[0]]] = keywords
+        if self.cache is not None:
+            self.cache.set_many(new_entries)
+
+        return [keywords[:top_n] for keywords in results]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,119 @@
+"""
+LSA 임베딩 검색 recall/지연 시간 벤치마크
+
+코퍼스 크기별로 TF-IDF 색인과 LSA 색인(정확 검색 + IVF)을 만든 뒤,
+무작위 사용자 프로필(읽은 논문 평균)마다 상위 k개를 구해
+1. 희소 TF-IDF 정확 검색 (현재 경로, 기준 정답)
+2. LSA 정확 검색 (블록 행렬곱)
+3. LSA IVF 근사 검색 (nprobe별)
+의 질의당 지연 시간과 recall@k(희소 정답 대비, LSA 정확 검색 대비)를 비교한다.
+
+주제가 있는 코퍼스가 필요하므로 주제별 단어 분포에서 뽑은 합성 문서를 사용한다.
+
+사용법:
+    python lsa_benchmark.py --sizes 10000 100000 1000000 --dims 128
+    python lsa_benchmark.py --sizes 10000 --nprobe 1 4 16 --queries 100
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from lsa_index import LsaIndex
+from recommender import RecommenderIndex, mean_profile, score_blocks, top_k
+
+
+def make_topic_corpus(count: int, topics: int = 100, vocabulary: int = 5000, seed: int = 42) -> List[Dict]:
+    """주제마다 선호 단어 묶음이 있는 합성 논문 (단어 70%는 주제에서, 30%는 전체 어휘에서)"""
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocabulary)]
+    topic_words = [rng.sample(words, 40) for _ in range(topics)]
+    papers = []
+    for i in range(count):
+        preferred = topic_words[rng.randrange(topics)]
+        tokens = [
+            rng.choice(preferred) if rng.random() < 0.7 else rng.choice(words)
+            for _ in range(rng.randint(60, 120))
+        ]
+        papers.append({
+            'id': i + 1,
+            'title': " ".join(tokens[:8]),
+            'abstract': " ".join(tokens[8:]),
+            'keywords': ''
+        })
+    return papers
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    return len(set(found.tolist()) & set(expected.tolist())) / max(len(expected), 1)
+
+
+def run(size: int, args) -> None:
+    started = time.perf_counter()
+    papers = make_topic_corpus(size)
+    index = RecommenderIndex.build(papers)
+    build_tfidf = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lsa = LsaIndex.build(index.tfidf_matrix, dims=args.dims, n_lists=args.lists)
+    build_lsa = time.perf_counter() - started
+    print(
+        f"\n📊 {size} papers: TF-IDF {build_tfidf:.1f}s, LSA {lsa.dims} dims + {lsa.n_lists} IVF lists {build_lsa:.1f}s"
+    )
+
+    rng = np.random.default_rng(7)
+    blocks, _ = index.snapshot()
+    queries = []
+    for _ in range(args.queries):
+        read_rows = rng.choice(size, 10, replace=False)
+        queries.append((read_rows, mean_profile(index.tfidf_matrix[read_rows])))
+
+    # 1. 희소 TF-IDF 정확 검색 (기준 정답)
+    expected, started = [], time.perf_counter()
+    for read_rows, profile in queries:
+        scores = score_blocks(blocks, profile)[0]
+        scores[read_rows] = -np.inf
+        expected.append(top_k(scores, args.top_n))
+    sparse_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    def measure(nprobe: int):
+        found, started = [], time.perf_counter()
+        for read_rows, profile in queries:
+            rows, _ = lsa.search(lsa.embed(profile), args.top_n, [read_rows], nprobe=nprobe)
+            found.append(rows[0])
+        return found, (time.perf_counter() - started) * 1000 / len(queries)
+
+    exact, exact_ms = measure(0)
+
+    print(f"{'method':<16}{'ms/query':>10}{'recall@' + str(args.top_n):>12}{'vs LSA exact':>14}")
+    print(f"{'sparse exact':<16}{sparse_ms:>10.2f}{1.0:>12.3f}{'':>14}")
+    print(f"{'lsa exact':<16}{exact_ms:>10.2f}{np.mean([recall(f, e) for f, e in zip(exact, expected)]):>12.3f}{1.0:>14.3f}")
+    for nprobe in args.nprobe:
+        if nprobe > lsa.n_lists:
+            continue
+        found, ms = measure(nprobe)
+        print(
+            f"{'ivf nprobe=' + str(nprobe):<16}{ms:>10.2f}"
+            f"{np.mean([recall(f, e) for f, e in zip(found, expected)]):>12.3f}"
+            f"{np.mean([recall(f, e) for f, e in zip(found, exact)]):>14.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSA 임베딩 검색 recall/지연 시간 비교")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="코퍼스 크기")
+    parser.add_argument("--dims", type=int, default=128, help="LSA 차원")
+    parser.add_argument("--lists", type=int, default=-1, help="IVF 리스트 수 (-1이면 4·√N)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64], help="비교할 nprobe")
+    parser.add_argument("--queries", type=int, default=200, help="측정할 사용자 프로필 수")
+    parser.add_argument("--top-n", type=int, default=20, help="질의당 결과 수")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args)
+
+
+if __name__ == "__main__":
+    main()
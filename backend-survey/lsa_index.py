@@ -0,0 +1,269 @@
+"""
+LSA(잠재 의미 분석) 임베딩 색인
+TF-IDF 행렬을 TruncatedSVD로 128~256차원 float32 밀집 벡터로 줄여 두고,
+프로필(TF-IDF 희소 벡터)도 같은 공간으로 사영해 내적(코사인)으로 비교한다.
+
+- 정확 검색: 임베딩을 행 블록으로 나눠 행렬곱하고 블록마다 상위 k개를 병합
+- IVF 근사 검색: 구면 k-means로 임베딩을 리스트로 나눠 두고,
+  질의와 중심이 가까운 nprobe개 리스트만 검사 (임베딩은 리스트 순서로 저장)
+
+색인 디렉토리(mmap 형식) 안의 lsa/ 아래에 .npy 파일로 저장하며 np.load(mmap_mode='r')로 연다.
+"""
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+
+from recommender import top_k_rows
+
+# TF-IDF 색인 디렉토리 안의 LSA 하위 디렉토리
+LSA_DIR = "lsa"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def spherical_kmeans(
+    points: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 42, block_rows: int = 65536
+) -> np.ndarray:
+    """
+    정규화된 점들을 내적 기준으로 군집화한 중심 (n_lists x d, 정규화됨)
+
+    Args:
+        points: 학습 표본 (행마다 L2 정규화), float32
+        n_lists: 군집 수
+        iterations: 반복 횟수
+        seed: 초기 중심 선택 시드
+    """
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = assign_lists(points, centroids, block_rows)
+        # 군집별 합을 희소 행렬 곱 한 번으로 계산
+        membership = sp.csr_matrix(
+            (np.ones(len(points), dtype=np.float32), (assign, np.arange(len(points)))),
+            shape=(n_lists, len(points))
+        )
+        sums = np.asarray(membership @ points)
+        # 빈 군집은 무작위 점으로 다시 시작
+        empty = np.asarray(membership.sum(axis=1)).ravel() == 0
+        if empty.any():
+            sums[empty] = points[rng.choice(len(points), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+def assign_lists(points: np.ndarray, centroids: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+    """점마다 내적이 가장 큰 중심 번호 (블록 단위로 계산해 메모리 제한)"""
+    assign = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), block_rows):
+        end = min(start + block_rows, len(points))
+        assign[start:end] = np.argmax(points[start:end] @ centroids.T, axis=1)
+    return assign
+
+
+class LsaIndex:
+    def __init__(
+        self,
+        components: np.ndarray,
+        embeddings: np.ndarray,
+        row_ids: Optional[np.ndarray] = None,
+        centroids: Optional[np.ndarray] = None,
+        list_offsets: Optional[np.ndarray] = None,
+        positions: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            components: SVD 사영 행렬 (d x F, float32)
+            embeddings: 논문 임베딩 (N x d, 행마다 L2 정규화, float32)
+            row_ids: embeddings 위치 → TF-IDF 색인 행 번호 (IVF 순서로 재배열한 경우)
+            centroids: IVF 리스트 중심 (L x d)
+            list_offsets: 리스트별 embeddings 시작 위치 (L + 1)
+            positions: TF-IDF 색인 행 번호 → embeddings 위치 (row_ids의 역순열)
+        """
+        self.components = components
+        self.embeddings = embeddings
+        self.row_ids = row_ids
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.positions = positions
+
+    @property
+    def dims(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def n_lists(self) -> int:
+        return 0 if self.centroids is None else self.centroids.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        tfidf_matrix: sp.csr_matrix,
+        dims: int = 128,
+        n_lists: int = 0,
+        iterations: int = 10,
+        seed: int = 42,
+        train_size: int = 100000
+    ) -> "LsaIndex":
+        """
+        TF-IDF 행렬로 LSA 임베딩과 (n_lists > 0이면) IVF 리스트 생성
+
+        Args:
+            tfidf_matrix: 논문별 TF-IDF 행렬 (N x F)
+            dims: 임베딩 차원 (어휘 수보다 작아야 함)
+            n_lists: IVF 리스트 수, 0이면 정확 검색만, -1이면 4·√N
+            iterations: k-means 반복 횟수
+            seed: SVD/k-means 시드
+            train_size: k-means 학습에 쓸 최대 표본 수
+        """
+        dims = min(dims, tfidf_matrix.shape[1] - 1)
+        svd = TruncatedSVD(n_components=dims, algorithm="randomized", random_state=seed)
+        embeddings = normalize_rows(svd.fit_transform(tfidf_matrix.astype(np.float32)))
+        index = cls(svd.components_.astype(np.float32), embeddings)
+
+        if n_lists < 0:
+            n_lists = int(4 * np.sqrt(len(embeddings)))
+        if n_lists > 0:
+            index.train_ivf(min(n_lists, len(embeddings)), iterations, seed, train_size)
+        return index
+
+    def train_ivf(self, n_lists: int, iterations: int = 10, seed: int = 42, train_size: int = 100000) -> None:
+        """임베딩을 IVF 리스트 순서로 재배열 (리스트 하나가 연속된 행 구간이 되도록)"""
+        embeddings = self.embeddings if self.row_ids is None else self.embeddings[self.positions]
+        rng = np.random.default_rng(seed)
+        sample = embeddings
+        if len(embeddings) > train_size:
+            sample = embeddings[np.sort(rng.choice(len(embeddings), train_size, replace=False))]
+
+        centroids = spherical_kmeans(sample, n_lists, iterations, seed)
+        assign = assign_lists(embeddings, centroids)
+        order = np.argsort(assign, kind='stable')
+
+        self.embeddings = np.ascontiguousarray(embeddings[order])
+        self.row_ids = order.astype(np.int64)
+        self.positions = np.argsort(order).astype(np.int64)
+        self.centroids = centroids
+        self.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).astype(np.int64)
+
+    def embed(self, vectors: sp.csr_matrix) -> np.ndarray:
+        """TF-IDF 희소 벡터(들)를 LSA 공간으로 사영 (Q x d, 정규화)"""
+        return normalize_rows(np.asarray(vectors @ self.components.T, dtype=np.float32))
+
+    def _rows(self, positions: np.ndarray) -> np.ndarray:
+        return positions if self.row_ids is None else np.asarray(self.row_ids[positions])
+
+    def _positions(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows if self.positions is None else np.asarray(self.positions[rows])
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exclude: Optional[List[np.ndarray]] = None,
+        nprobe: int = 0,
+        block_rows: int = 65536
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의마다 내적 상위 k개 논문
+
+        Args:
+            queries: LSA 질의 벡터 (Q x d)
+            k: 질의당 결과 수
+            exclude: 질의별 제외할 TF-IDF 색인 행 번호
+            nprobe: 검사할 IVF 리스트 수, 0이거나 IVF가 없으면 정확 검색
+            block_rows: 정확 검색 시 한 번에 곱할 논문 수
+
+        Returns:
+            (행 번호 Q x k, 점수 Q x k) - 결과가 k개보다 적으면 점수가 -inf인 칸이 남음
+        """
+        if nprobe > 0 and self.n_lists > 0:
+            return self._search_ivf(queries, k, exclude, min(nprobe, self.n_lists))
+        return self._search_exact(queries, k, exclude, block_rows)
+
+    def _search_exact(
+        self, queries: np.ndarray, k: int, exclude: Optional[List[np.ndarray]], block_rows: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_queries = queries.shape[0]
+        best_positions = np.full((n_queries, k), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        # 제외할 행은 embeddings 위치로 한 번만 바꿔 두고 블록마다 해당 구간만 마스킹
+        excluded = [self._positions(rows) for rows in exclude] if exclude is not None else []
+
+        for start in range(0, len(self.embeddings), block_rows):
+            end = min(start + block_rows, len(self.embeddings))
+            scores = queries @ self.embeddings[start:end].T
+            for q, skip in enumerate(excluded):
+                skip = skip[(skip >= start) & (skip < end)]
+                scores[q, skip - start] = -np.inf
+
+            # 지금까지의 상위 k개와 이 블록의 상위 k개를 합쳐 다시 상위 k개
+            top = top_k_rows(scores, k)
+            merged_scores = np.hstack([best_scores, np.take_along_axis(scores, top, axis=1)])
+            merged_positions = np.hstack([best_positions, top + start])
+            keep = top_k_rows(merged_scores, k)
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_positions = np.take_along_axis(merged_positions, keep, axis=1)
+
+        best_rows = np.where(best_positions >= 0, self._rows(np.maximum(best_positions, 0)), -1)
+        return best_rows, best_scores
+
+    def _search_ivf(
+        self, queries: np.ndarray, k: int, exclude: Optional[List[np.ndarray]], nprobe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_queries = queries.shape[0]
+        best_rows = np.full((n_queries, k), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        probes = top_k_rows(queries @ self.centroids.T, nprobe)
+
+        for q in range(n_queries):
+            positions = np.concatenate([
+                np.arange(self.list_offsets[lst], self.list_offsets[lst + 1]) for lst in probes[q]
+            ])
+            if len(positions) == 0:
+                continue
+            scores = self.embeddings[positions] @ queries[q]
+            if exclude is not None and len(exclude[q]):
+                scores[np.isin(positions, self._positions(exclude[q]))] = -np.inf
+
+            top = top_k_rows(scores[np.newaxis, :], k)[0]
+            best_rows[q, :len(top)] = self._rows(positions[top])
+            best_scores[q, :len(top)] = scores[top]
+
+        return best_rows, best_scores
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        arrays = {'components': self.components, 'embeddings': self.embeddings}
+        if self.n_lists:
+            arrays.update(
+                row_ids=self.row_ids,
+                positions=self.positions,
+                centroids=self.centroids,
+                list_offsets=self.list_offsets
+            )
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+    @classmethod
+    def load(cls, directory: str) -> "LsaIndex":
+        """save로 저장한 LSA 색인을 읽기 전용 mmap으로 열기"""
+        def mapped(name: str) -> Optional[np.ndarray]:
+            path = os.path.join(directory, f"{name}.npy")
+            return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+        return cls(
+            mapped('components'),
+            mapped('embeddings'),
+            row_ids=mapped('row_ids'),
+            centroids=mapped('centroids'),
+            list_offsets=mapped('list_offsets'),
+            positions=mapped('positions')
+        )
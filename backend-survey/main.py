@@ -1,12 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Header, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, and_
+from sqlalchemy import create_engine, and_, or_
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Optional, List
 import redis
 import os
 import httpx
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timezone
 
 from models import Base, Survey, UserSurvey, SurveyStatus as DBSurveyStatus, UserActivity
 from schemas import (
@@ -14,13 +16,56 @@ from schemas import (
     InterestFieldsRequest, RecommendationResponse
 )
 from scraper import ArxivScraper
-from keyword_extractor import KeywordExtractor
-from recommender import SurveyRecommender
+from keyword_extractor import KeywordExtractor, KeywordCache
+from recommender import SurveyRecommender, IncrementalIndex
+from token_verifier import TokenVerifier
+from http_client import ServiceClient, CircuitBreaker, CircuitOpenError
+from rate_limiter import RedisTokenBucket
+from search_cache import SearchResultCache
+from ingest import ingest_papers
+from enrichment import EnrichmentQueue
+from profiles import UserProfileStore
+from collaborative import CooccurrenceModel, status_weight
 
 # 환경 변수
 DATABASE_URL = os.getenv("DATABASE_URL")
 REDIS_URL = os.getenv("REDIS_URL")
 AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://backend-auth:8000")
+SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key")
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_HTTP_MAX_CONNECTIONS = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+AUTH_HTTP_MAX_KEEPALIVE = int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE", "20"))
+AUTH_HTTP_TIMEOUT = float(os.getenv("AUTH_HTTP_TIMEOUT", "2.0"))
+AUTH_HTTP2 = os.getenv("AUTH_HTTP2", "false").lower() == "true"
+AUTH_BREAKER_THRESHOLD = int(os.getenv("AUTH_BREAKER_THRESHOLD", "5"))
+AUTH_BREAKER_RESET = float(os.getenv("AUTH_BREAKER_RESET", "10"))
+ARXIV_MIN_INTERVAL = float(os.getenv("ARXIV_MIN_INTERVAL", "3.0"))
+SEARCH_CACHE_FRESH_TTL = int(os.getenv("SEARCH_CACHE_FRESH_TTL", str(60 * 60)))
+SEARCH_CACHE_STALE_TTL = int(os.getenv("SEARCH_CACHE_STALE_TTL", str(60 * 60 * 24)))
+# true면 검색/추천은 수집 워커(harvester.py)가 채운 로컬 코퍼스만 조회 (요청 경로에서 ArXiv 호출 없음)
+LOCAL_CORPUS_ONLY = os.getenv("LOCAL_CORPUS_ONLY", "true").lower() == "true"
+RECOMMEND_CANDIDATE_LIMIT = int(os.getenv("RECOMMEND_CANDIDATE_LIMIT", "5000"))
+# build_index.py가 만든 추천 색인 위치와 새 버전 확인 주기 (초)
+RECOMMENDER_INDEX_DIR = os.getenv("RECOMMENDER_INDEX_DIR", "/data/recommender-index")
+RECOMMENDER_RELOAD_INTERVAL = int(os.getenv("RECOMMENDER_RELOAD_INTERVAL", "60"))
+# prebuilt: build_index.py가 만든 색인 사용 / incremental: API가 새 논문을 직접 색인에 추가
+RECOMMENDER_MODE = os.getenv("RECOMMENDER_MODE", "prebuilt")
+RECOMMENDER_COMPACT_RATIO = float(os.getenv("RECOMMENDER_COMPACT_RATIO", "0.1"))
+# 증분 색인이 키워드 보강을 기다리는 최대 시간 (초, 넘으면 키워드 없이 색인 - dead-letter 등으로 보강되지 않는 논문)
+RECOMMENDER_DEFER_SECONDS = int(os.getenv("RECOMMENDER_DEFER_SECONDS", str(30 * 60)))
+# tfidf: 희소 코사인, lsa: 색인에 함께 저장된 LSA 임베딩으로 검색 (build_index.py RECOMMENDER_LSA_DIMS)
+# neighbors: 색인에 함께 저장된 논문별 이웃 목록 병합 (build_index.py RECOMMENDER_NEIGHBORS_K)
+RECOMMENDER_ENGINE = os.getenv("RECOMMENDER_ENGINE", "tfidf")
+# LSA 엔진에서 검사할 IVF 리스트 수 (0이면 정확 검색)
+RECOMMENDER_LSA_NPROBE = int(os.getenv("RECOMMENDER_LSA_NPROBE", "0"))
+# 협업 필터링 점수 비율 (0이면 사용 안 함), 워커 간 차이를 맞추기 위한 전체 재구축 주기 (초)
+RECOMMENDER_CF_WEIGHT = float(os.getenv("RECOMMENDER_CF_WEIGHT", "0"))
+RECOMMENDER_CF_REBUILD_INTERVAL = int(os.getenv("RECOMMENDER_CF_REBUILD_INTERVAL", "600"))
+# 재생성 사이에 쌓인 변화량이 fold_threshold를 넘었는지 확인하는 주기 (초, 넘으면 백그라운드에서 합침)
+RECOMMENDER_CF_FOLD_INTERVAL = int(os.getenv("RECOMMENDER_CF_FOLD_INTERVAL", "30"))
+# 사용자 프로필 벡터 반감기 (일), 0이면 오래 전에 읽은 논문도 같은 가중치
+USER_PROFILE_HALF_LIFE_DAYS = float(os.getenv("USER_PROFILE_HALF_LIFE_DAYS", "0"))
 
 # 데이터베이스 설정
 engine = create_engine(DATABASE_URL)
@@ -29,18 +74,67 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Redis 클라이언트
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
+# 토큰 검증기 (JWT 로컬 검증 + Redis 세션 확인 + TTL 캐시)
+token_verifier = TokenVerifier(
+    REDIS_URL,
+    SECRET_KEY,
+    cache_ttl=AUTH_CACHE_TTL,
+    max_entries=AUTH_CACHE_MAX_ENTRIES
+)
+
+# Auth 서비스 HTTP 클라이언트 (커넥션 풀 공유 + 서킷 브레이커)
+auth_client = ServiceClient(
+    AUTH_SERVICE_URL,
+    max_connections=AUTH_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=AUTH_HTTP_MAX_KEEPALIVE,
+    read_timeout=AUTH_HTTP_TIMEOUT,
+    http2=AUTH_HTTP2,
+    breaker=CircuitBreaker(
+        failure_threshold=AUTH_BREAKER_THRESHOLD,
+        reset_timeout=AUTH_BREAKER_RESET
+    )
+)
+
+# ArXiv 요청 한도 (모든 워커/레플리카가 Redis 토큰 버킷 공유)
+arxiv_rate_limiter = RedisTokenBucket(REDIS_URL, key="arxiv:ratelimit", rate=1 / ARXIV_MIN_INTERVAL)
+
+# ArXiv 검색 결과 캐시 (stale-while-revalidate)
+search_cache = SearchResultCache(
+    REDIS_URL,
+    fresh_ttl=SEARCH_CACHE_FRESH_TTL,
+    stale_ttl=SEARCH_CACHE_STALE_TTL
+)
+
 # ArXiv Scraper
-scraper = ArxivScraper()
+scraper = ArxivScraper(rate_limiter=arxiv_rate_limiter, cache=search_cache)
 
 # 키워드 추출기
-keyword_extractor = KeywordExtractor()
+keyword_extractor = KeywordExtractor(cache=KeywordCache(REDIS_URL))
+
+# 키워드/읽기 시간 보강 큐 (enrichment.py 워커가 처리)
+enrichment_queue = EnrichmentQueue(REDIS_URL)
 
 # 추천 시스템
-recommender = SurveyRecommender()
+recommender = SurveyRecommender(
+    engine=RECOMMENDER_ENGINE,
+    nprobe=RECOMMENDER_LSA_NPROBE,
+    cf_weight=RECOMMENDER_CF_WEIGHT
+)
+if RECOMMENDER_MODE == "incremental":
+    recommender.index = IncrementalIndex(compact_ratio=RECOMMENDER_COMPACT_RATIO)
+# 증분 색인에 반영한 마지막 논문 ID와, 키워드 보강을 기다리느라 미뤄 둔 논문 ID → 미룬 시각 (monotonic)
+incremental_last_id = 0
+incremental_deferred_ids = {}
+
+# 사용자 프로필 벡터 (논문 완료/삭제 시 증분 갱신)
+profile_store = UserProfileStore(REDIS_URL, half_life_days=USER_PROFILE_HALF_LIFE_DAYS)
 
 # FastAPI 앱
 app = FastAPI(title="Survey Service", version="2.0.0")
 
+recommender_reload_task: Optional[asyncio.Task] = None
+collaborative_rebuild_task: Optional[asyncio.Task] = None
+
 @app.on_event("startup")
 def startup_event():
     """데이터베이스 초기화 (재시도 로직 포함)"""
@@ -62,6 +156,147 @@ def startup_event():
                 print(f"Failed to create tables after {max_retries} attempts: {e}")
                 raise
 
+@app.on_event("startup")
+async def start_clients():
+    """Auth/ArXiv 클라이언트 생성 및 로그아웃 알림 구독 시작"""
+    await auth_client.start()
+    await scraper.start()
+    await token_verifier.start()
+
+def sync_incremental_index(batch_size: int = 5000) -> int:
+    """
+    증분 색인에 아직 없는 논문(마지막으로 확인한 ID 이후)을 추가
+    키워드가 아직 보강되지 않은(NULL) 논문은 미뤄 두었다가 보강된 뒤에 추가
+    (증분 색인은 이미 추가한 논문을 다시 색인하지 않으므로)
+    RECOMMENDER_DEFER_SECONDS가 지나도 보강되지 않으면 키워드 없이 추가
+    """
+    global incremental_last_id
+    index = recommender.index
+    columns = (Survey.id, Survey.title, Survey.abstract, Survey.keywords)
+
+    def add_rows(rows) -> int:
+        return index.add([
+            {'id': row.id, 'title': row.title, 'abstract': row.abstract or '', 'keywords': row.keywords or ''}
+            for row in rows
+        ])
+
+    added = 0
+    db = SessionLocal()
+    try:
+        # 미뤄 둔 논문 중 보강이 끝났거나 더 기다리지 않을 것
+        expired_before = time.monotonic() - RECOMMENDER_DEFER_SECONDS
+        deferred = sorted(incremental_deferred_ids)
+        for start in range(0, len(deferred), batch_size):
+            chunk = deferred[start:start + batch_size]
+            expired = [survey_id for survey_id in chunk if incremental_deferred_ids[survey_id] < expired_before]
+            rows = db.query(*columns).filter(
+                Survey.id.in_(chunk),
+                or_(Survey.keywords.isnot(None), Survey.id.in_(expired))
+            ).order_by(Survey.id).all()
+            added += add_rows(rows)
+            # 지워진 논문은 다시 조회하지 않음
+            for survey_id in expired:
+                incremental_deferred_ids.pop(survey_id, None)
+            for row in rows:
+                incremental_deferred_ids.pop(row.id, None)
+
+        while True:
+            rows = db.query(*columns).filter(
+                Survey.id > incremental_last_id
+            ).order_by(Survey.id).limit(batch_size).all()
+            if not rows:
+                return added
+            added += add_rows([row for row in rows if row.keywords is not None])
+            now = time.monotonic()
+            incremental_deferred_ids.update((row.id, now) for row in rows if row.keywords is None)
+            incremental_last_id = rows[-1].id
+    finally:
+        db.close()
+
+async def reload_recommender_index() -> None:
+    """새 추천 색인 버전을 스레드에서 불러와 교체 (증분 모드는 새 논문 추가)"""
+    try:
+        if RECOMMENDER_MODE == "incremental":
+            added = await asyncio.to_thread(sync_incremental_index)
+            if added:
+                print(f"🔄 Added {added} papers to the incremental recommender index ({recommender.index.n_docs} total)")
+        elif await asyncio.to_thread(recommender.reload_index, RECOMMENDER_INDEX_DIR):
+            print(f"🔄 Recommender index {recommender.index.version} loaded ({len(recommender.index.paper_ids)} papers)")
+    except Exception as e:
+        print(f"❌ Failed to load recommender index: {e}")
+
+async def watch_recommender_index() -> None:
+    while True:
+        await asyncio.sleep(RECOMMENDER_RELOAD_INTERVAL)
+        await reload_recommender_index()
+
+def build_collaborative_model() -> CooccurrenceModel:
+    """user_surveys 전체로 동시 출현 행렬 생성"""
+    db = SessionLocal()
+    try:
+        rows = db.query(UserSurvey.user_id, UserSurvey.survey_id, UserSurvey.status).yield_per(10000)
+        return CooccurrenceModel.build(
+            (row.user_id, row.survey_id, status_weight(row.status)) for row in rows
+        )
+    finally:
+        db.close()
+
+async def rebuild_collaborative_model() -> None:
+    """스레드에서 새로 만든 뒤 참조만 교체 (다른 워커에서 바뀐 상태도 반영)"""
+    try:
+        model = await asyncio.to_thread(build_collaborative_model)
+        recommender.collaborative = model
+        stats = model.stats()
+        print(f"🤝 Collaborative model rebuilt ({stats['users']} users, {stats['items']} surveys)")
+    except Exception as e:
+        print(f"❌ Failed to build collaborative model: {e}")
+
+async def watch_collaborative_model() -> None:
+    """주기적으로 전체 재생성, 그 사이에는 쌓인 변화량을 스레드에서 기준 행렬에 합침 (요청 경로에서는 합치지 않음)"""
+    loop = asyncio.get_running_loop()
+    next_rebuild = loop.time() + RECOMMENDER_CF_REBUILD_INTERVAL
+    while True:
+        await asyncio.sleep(min(RECOMMENDER_CF_FOLD_INTERVAL, RECOMMENDER_CF_REBUILD_INTERVAL))
+        if loop.time() >= next_rebuild:
+            await rebuild_collaborative_model()
+            next_rebuild = loop.time() + RECOMMENDER_CF_REBUILD_INTERVAL
+            continue
+
+        model = recommender.collaborative
+        if model is not None and model.needs_fold:
+            try:
+                await asyncio.to_thread(model.fold)
+            except Exception as e:
+                print(f"❌ Failed to fold collaborative updates: {e}")
+
+def update_collaborative(user_id: int, survey_id: int, survey_status) -> None:
+    """상태 변경을 협업 필터링 모델에 바로 반영 (None이면 보관함에서 삭제)"""
+    model = recommender.collaborative
+    if model is not None:
+        model.set_weight(user_id, survey_id, status_weight(survey_status) if survey_status is not None else 0.0)
+
+@app.on_event("startup")
+async def start_recommender():
+    """추천 색인 로드 및 새 버전 감시 시작"""
+    global recommender_reload_task, collaborative_rebuild_task
+    await reload_recommender_index()
+    recommender_reload_task = asyncio.create_task(watch_recommender_index())
+    if RECOMMENDER_CF_WEIGHT > 0:
+        await rebuild_collaborative_model()
+        collaborative_rebuild_task = asyncio.create_task(watch_collaborative_model())
+
+@app.on_event("shutdown")
+async def stop_clients():
+    if recommender_reload_task is not None:
+        recommender_reload_task.cancel()
+    if collaborative_rebuild_task is not None:
+        collaborative_rebuild_task.cancel()
+    await token_verifier.close()
+    await scraper.close()
+    await search_cache.close()
+    await arxiv_rate_limiter.close()
+    await auth_client.close()
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -108,8 +343,33 @@ def get_db():
     finally:
         db.close()
 
-async def verify_token(authorization: Optional[str] = Header(None)):
+async def verify_token_remote(authorization: str):
     """Auth 서비스를 통해 토큰 검증"""
+    try:
+        response = await auth_client.get(
+            "/verify",
+            headers={"Authorization": authorization}
+        )
+    except (httpx.RequestError, CircuitOpenError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Auth service unavailable"
+        )
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    return response.json()
+
+async def verify_token(authorization: Optional[str] = Header(None)):
+    """
+    토큰 검증
+    JWT를 로컬에서 검증하고 Redis 세션을 확인 (결과는 짧은 TTL로 캐시)
+    Redis에 접근할 수 없을 때만 Auth 서비스로 검증 요청
+    """
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -117,30 +377,166 @@ async def verify_token(authorization: Optional[str] = Header(None)):
         )
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{AUTH_SERVICE_URL}/verify",
-                headers={"Authorization": authorization}
-            )
+        scheme, token = authorization.split()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
+    if scheme.lower() != "bearer":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication scheme"
+        )
+
+    try:
+        user_data = await token_verifier.verify(token)
+    except redis.exceptions.RedisError as e:
+        print(f"Local token verification unavailable, falling back to auth service: {e}")
+        return await verify_token_remote(authorization)
 
-            return response.json()
-    except httpx.RequestError:
+    if user_data is None:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Auth service unavailable"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    return user_data
+
+# 로컬 코퍼스 조회
+def like_pattern(term: str) -> str:
+    """LIKE 검색용 패턴 (사용자 입력의 와일드카드 문자 이스케이프)"""
+    escaped = term.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def search_local_titles(db: Session, query: str, limit: int) -> List[Survey]:
+    """제목에 검색어와 survey/comprehensive/a review가 포함된 논문 (ArXiv search_surveys와 같은 조건)"""
+    return db.query(Survey).filter(
+        Survey.title.ilike(like_pattern(query), escape="\\"),
+        or_(
+            Survey.title.ilike("%survey%"),
+            Survey.title.ilike("%comprehensive%"),
+            Survey.title.ilike("%a review%")
+        )
+    ).order_by(Survey.published_date.desc()).limit(limit).all()
+
+def search_local_fields(db: Session, fields: List[str], limit: int) -> List[Survey]:
+    """모든 관심 분야가 제목/초록/키워드 중 하나에 포함된 논문 (ArXiv search_ai_ml_surveys와 같은 AND 조건)"""
+    conditions = [
+        or_(
+            Survey.title.ilike(like_pattern(field), escape="\\"),
+            Survey.abstract.ilike(like_pattern(field), escape="\\"),
+            Survey.keywords.ilike(like_pattern(field), escape="\\")
         )
+        for field in fields
+    ]
+    return db.query(Survey).filter(and_(*conditions)).order_by(
+        Survey.published_date.desc()
+    ).limit(limit).all()
+
+def survey_to_paper(survey: Survey) -> dict:
+    return {
+        'id': survey.id,
+        'title': survey.title,
+        'abstract': survey.abstract,
+        'keywords': survey.keywords or ''
+    }
+
+def to_epoch(value: Optional[datetime]) -> float:
+    """DB의 naive UTC 시각을 epoch 초로 (완료 시각이 없던 기존 데이터는 지금)"""
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+def update_user_profile(db: Session, user_id: int, survey_id: int, completed_at: Optional[datetime], sign: int) -> None:
+    """완료한 논문 벡터를 사용자 프로필에 더하거나 뺌 (실패해도 다음 추천 요청에서 다시 만듦)"""
+    index = recommender.index
+    if index is None:
+        return
+
+    survey = db.query(Survey).filter(Survey.id == survey_id).first()
+    if not survey:
+        return
+
+    try:
+        vector = index.transform([survey_to_paper(survey)])
+        profile_store.update(user_id, vector, index.version, to_epoch(completed_at), sign=sign)
+    except redis.exceptions.RedisError as e:
+        print(f"⚠️  Failed to update profile of user {user_id}: {e}")
+
+def load_user_profile(db: Session, user_id: int, index, user_surveys: List[UserSurvey]):
+    """
+    저장된 프로필을 불러오고, 없거나 색인 버전/논문 수가 맞지 않으면 완료한 논문으로 다시 만듦
+
+    Returns:
+        L2 정규화된 프로필 벡터
+    """
+    try:
+        profile = profile_store.get(user_id)
+    except redis.exceptions.RedisError as e:
+        print(f"⚠️  Failed to load profile of user {user_id}: {e}")
+        profile = None
+
+    if profile is not None and profile.version == index.version and profile.papers == len(user_surveys):
+        print(f"👤 Using stored profile ({profile.papers} papers)")
+        return profile.vector()
+
+    completed_at = {us.survey_id: to_epoch(us.completed_at) for us in user_surveys}
+    read_papers = db.query(Survey).filter(Survey.id.in_(list(completed_at))).all()
+    vectors = index.transform([survey_to_paper(p) for p in read_papers])
+    try:
+        profile = profile_store.build(user_id, vectors, [completed_at[p.id] for p in read_papers], index.version)
+    except redis.exceptions.RedisError as e:
+        print(f"⚠️  Failed to store profile of user {user_id}: {e}")
+        profile = profile_store.compute(vectors, [completed_at[p.id] for p in read_papers], index.version)
+    print(f"👤 Rebuilt profile from {len(read_papers)} completed papers")
+    return profile.vector()
 
 # 엔드포인트
 @app.get("/")
 def read_root():
     return {"service": "Survey Service", "status": "running", "version": "2.0.0"}
 
+@app.get("/metrics/auth")
+def get_auth_metrics():
+    """Auth 연동 상태 (HTTP 커넥션 풀, 서킷 브레이커, 토큰 캐시)"""
+    return {
+        "http_client": auth_client.stats(),
+        "token_cache": token_verifier.stats()
+    }
+
+@app.get("/metrics/arxiv")
+def get_arxiv_metrics():
+    """ArXiv rate limiter 상태 (우선순위별 대기 시간 히스토그램), 검색 캐시 적중률, 기록/재생 트랜스포트 상태"""
+    transport = scraper.client.transport
+    return {
+        "rate_limiter": arxiv_rate_limiter.stats(),
+        "search_cache": search_cache.stats(),
+        "transport": transport.stats() if hasattr(transport, "stats") else {"mode": "passthrough"}
+    }
+
+@app.get("/metrics/recommender")
+def get_recommender_metrics():
+    """현재 사용 중인 추천 색인 버전"""
+    index = recommender.index
+    return {
+        "index_version": index.version if index else None,
+        "indexed_papers": len(index.paper_ids) if index else 0,
+        "collaborative": recommender.collaborative.stats() if recommender.collaborative else None
+    }
+
+@app.get("/metrics/enrichment")
+def get_enrichment_metrics():
+    """키워드/읽기 시간 보강 큐 backlog (lag: 아직 읽지 않은 수, pending: 처리 중 수)와 워커별 키워드 캐시 지표"""
+    try:
+        return enrichment_queue.stats()
+    except redis.exceptions.RedisError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Enrichment queue unavailable: {e}"
+        )
+
 @app.get("/surveys/user", response_model=List[UserSurveyResponse])
 async def get_user_surveys(
     status_filter: Optional[str] = None,
@@ -219,6 +615,38 @@ async def get_survey(
         } if user_survey else None
     }
 
+@app.get("/surveys/{survey_id}/similar", response_model=List[RecommendationResponse])
+async def get_similar_surveys(
+    survey_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    user_data: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """비슷한 논문 (미리 계산된 이웃 테이블에서 조회)"""
+    if recommender.index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommender index is not loaded yet"
+        )
+
+    if not db.query(Survey.id).filter(Survey.id == survey_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Survey not found"
+        )
+
+    similar = recommender.similar(survey_id, top_n=limit)
+    surveys_by_id = {
+        survey.id: survey
+        for survey in db.query(Survey).filter(Survey.id.in_([pid for pid, _ in similar])).all()
+    } if similar else {}
+
+    return [
+        {"survey": surveys_by_id[paper_id], "similarity_score": round(score * 100, 2)}
+        for paper_id, score in similar
+        if paper_id in surveys_by_id
+    ]
+
 @app.post("/surveys/add", response_model=UserSurveyResponse)
 async def add_survey_to_user(
     user_survey: UserSurveyCreate,
@@ -260,6 +688,7 @@ async def add_survey_to_user(
     db.add(new_user_survey)
     db.commit()
     db.refresh(new_user_survey)
+    update_collaborative(user_id, new_user_survey.survey_id, new_user_survey.status)
 
     return {
         "id": new_user_survey.id,
@@ -295,10 +724,12 @@ async def update_survey_status(
             detail="User survey not found"
         )
 
+    was_completed = user_survey.status == DBSurveyStatus.completed
+    previous_completed_at = user_survey.completed_at
     user_survey.status = DBSurveyStatus[new_status]
 
     if new_status == "completed":
-        from datetime import datetime, date
+        from datetime import date
         user_survey.completed_at = datetime.utcnow()
 
         # 스트릭 기록 (completed 상태로 변경될 때만)
@@ -322,6 +753,14 @@ async def update_survey_status(
 
     db.commit()
 
+    update_collaborative(user_id, user_survey.survey_id, user_survey.status)
+
+    # 완료 상태가 바뀐 경우에만 프로필 벡터 갱신
+    if new_status == "completed" and not was_completed:
+        update_user_profile(db, user_id, user_survey.survey_id, user_survey.completed_at, sign=1)
+    elif was_completed and new_status != "completed":
+        update_user_profile(db, user_id, user_survey.survey_id, previous_completed_at, sign=-1)
+
     return {"message": "Status updated successfully"}
 
 @app.put("/surveys/{user_survey_id}/star")
@@ -378,9 +817,15 @@ async def delete_user_survey(
             detail="Survey not found in user's collection"
         )
 
+    was_completed = user_survey.status == DBSurveyStatus.completed
+    completed_at = user_survey.completed_at
     db.delete(user_survey)
     db.commit()
 
+    update_collaborative(user_id, survey_id, None)
+    if was_completed:
+        update_user_profile(db, user_id, survey_id, completed_at, sign=-1)
+
     return {"message": "Survey removed successfully"}
 
 @app.post("/recommend/initial", response_model=List[SurveyResponse])
@@ -401,53 +846,22 @@ async def initial_recommend(
             detail="At least one interest field is required"
         )
 
-    # ArXiv에서 관심 분야 논문 검색
-    arxiv_results = scraper.search_ai_ml_surveys(request.fields, max_results=500)
-
-    # DB에 저장 및 반환
-    survey_responses = []
-    for result in arxiv_results:
-        # 이미 DB에 있는지 확인
-        existing_survey = db.query(Survey).filter(
-            Survey.arxiv_id == result["arxiv_id"]
-        ).first()
-
-        if existing_survey:
-            survey_responses.append(existing_survey)
-        else:
-            # 키워드 추출
-            keywords = keyword_extractor.extract_from_title_and_abstract(
-                result["title"],
-                result["abstract"],
-                top_n=3
-            )
-            keywords_str = ", ".join(keywords)
-
-            # 읽기 시간 추정
-            reading_times = scraper.estimate_reading_time(result["abstract"])
-
-            # 새 Survey 생성
-            new_survey = Survey(
-                arxiv_id=result["arxiv_id"],
-                title=result["title"],
-                abstract=result["abstract"],
-                keywords=keywords_str,
-                authors=result["authors"],
-                published_date=result["published_date"],
-                pdf_url=result["pdf_url"],
-                categories=result["categories"],
-                estimated_reading_time_beginner=reading_times["beginner"],
-                estimated_reading_time_intermediate=reading_times["intermediate"],
-                estimated_reading_time_advanced=reading_times["advanced"],
-                tags=", ".join(request.fields),
-                view_count=0
-            )
+    if LOCAL_CORPUS_ONLY:
+        return search_local_fields(db, request.fields, limit=500)
 
-            db.add(new_survey)
-            db.commit()
-            db.refresh(new_survey)
-
-            survey_responses.append(new_survey)
+    # ArXiv에서 관심 분야 논문 검색
+    arxiv_results = await scraper.search_ai_ml_surveys(request.fields, max_results=500)
+
+    # DB에 없는 논문만 일괄 저장 후 검색 순서대로 반환
+    survey_responses, _ = ingest_papers(
+        db,
+        arxiv_results,
+        keyword_extractor,
+        scraper.estimate_reading_time,
+        keyword_top_n=3,
+        enrichment_queue=enrichment_queue,
+        tags=", ".join(request.fields)
+    )
 
     return survey_responses
 
@@ -484,94 +898,74 @@ async def personalized_recommend(
             detail="최소 5개 이상의 논문을 읽어야 개인화 추천을 받을 수 있습니다."
         )
 
-    # 1. ArXiv에서 ML/DL Survey 논문 500개 검색
-    print(f"🔍 Fetching 500 ML/DL survey papers from ArXiv...")
-    scraper = ArxivScraper()
-    arxiv_papers = scraper.search_ml_surveys_for_recommendation(max_results=500)
-    print(f"✅ Found {len(arxiv_papers)} papers from ArXiv")
+    # 사전 구축 색인이 있으면 로컬 코퍼스 전체가 후보 (요청마다 학습하지 않음)
+    use_index = LOCAL_CORPUS_ONLY and recommender.index is not None
 
-    # 2. DB에 없는 논문 저장 (키워드 자동 추출)
     saved_surveys = []
-    for paper_data in arxiv_papers:
-        existing = db.query(Survey).filter(Survey.arxiv_id == paper_data["arxiv_id"]).first()
-        if not existing:
-            # 키워드 자동 추출
-            keywords_list = keyword_extractor.extract_from_title_and_abstract(
-                paper_data["title"],
-                paper_data["abstract"],
-                top_n=5
-            )
-            # 리스트를 콤마로 구분된 문자열로 변환
-            keywords_str = ", ".join(keywords_list) if keywords_list else None
-
-            new_survey = Survey(
-                arxiv_id=paper_data["arxiv_id"],
-                title=paper_data["title"],
-                abstract=paper_data["abstract"],
-                authors=paper_data["authors"],
-                published_date=paper_data["published_date"],
-                pdf_url=paper_data["pdf_url"],
-                categories=paper_data["categories"],
-                keywords=keywords_str
-            )
-            db.add(new_survey)
-            db.commit()
-            db.refresh(new_survey)
-            saved_surveys.append(new_survey)
-        else:
-            # 기존 논문에 키워드가 없으면 추출
-            if not existing.keywords:
-                keywords_list = keyword_extractor.extract_from_title_and_abstract(
-                    existing.title,
-                    existing.abstract,
-                    top_n=5
-                )
-                existing.keywords = ", ".join(keywords_list) if keywords_list else None
-                db.commit()
-            saved_surveys.append(existing)
-
-    print(f"💾 Saved/Retrieved {len(saved_surveys)} papers")
-
-    # 3. 읽은 논문 정보 가져오기
-    read_paper_ids = [us.survey_id for us in user_surveys]
-    read_papers = db.query(Survey).filter(Survey.id.in_(read_paper_ids)).all()
+    if use_index:
+        print(f"📦 Scoring against recommender index {recommender.index.version}")
+    elif LOCAL_CORPUS_ONLY:
+        # 1. 색인이 아직 없으면 로컬 코퍼스에서 후보 논문 조회 (최신순)
+        saved_surveys = db.query(Survey).order_by(
+            Survey.published_date.desc()
+        ).limit(RECOMMEND_CANDIDATE_LIMIT).all()
+    else:
+        # 1. ArXiv에서 ML/DL Survey 논문 500개 검색
+        print(f"🔍 Fetching 500 ML/DL survey papers from ArXiv...")
+        arxiv_papers = await scraper.search_ml_surveys_for_recommendation(max_results=500)
+        print(f"✅ Found {len(arxiv_papers)} papers from ArXiv")
+
+        # 2. DB에 없는 논문 일괄 저장 (키워드 자동 추출, 키워드 없는 기존 논문도 채움)
+        saved_surveys, _ = ingest_papers(
+            db,
+            arxiv_papers,
+            keyword_extractor,
+            scraper.estimate_reading_time,
+            keyword_top_n=5,
+            backfill_keywords=True,
+            enrichment_queue=enrichment_queue
+        )
 
-    print(f"🤖 Computing TF-IDF + Cosine Similarity...")
+    if not use_index:
+        print(f"💾 Saved/Retrieved {len(saved_surveys)} papers")
 
-    # 논문 딕셔너리로 변환
-    read_papers_dict = [
-        {
-            'id': p.id,
-            'title': p.title,
-            'abstract': p.abstract,
-            'keywords': p.keywords or ''
-        }
-        for p in read_papers
-    ]
+    read_paper_ids = [us.survey_id for us in user_surveys]
 
-    candidate_papers_dict = [
-        {
-            'id': p.id,
-            'title': p.title,
-            'abstract': p.abstract,
-            'keywords': p.keywords or ''
-        }
-        for p in saved_surveys
-    ]
+    print(f"🤖 Computing TF-IDF + Cosine Similarity...")
 
-    # TF-IDF + Cosine Similarity 추천
-    recommendations = recommender.recommend(
-        user_read_papers=read_papers_dict,
-        all_papers=candidate_papers_dict,
-        top_n=top_n
-    )
+    if use_index and recommender.engine == "neighbors" and getattr(recommender.index, 'neighbors', None) is not None:
+        # 완료한 논문들의 미리 계산된 이웃 목록 병합 (색인 전체 점수 계산 없음)
+        recommendations = recommender.recommend_neighbors(recommender.index, read_paper_ids, top_n=top_n)
+    elif use_index:
+        # 저장된 프로필 벡터를 사전 구축 색인과 비교 (읽은 논문을 매번 변환하지 않음)
+        index = recommender.index
+        user_profile = load_user_profile(db, user_id, index, user_surveys)
+        recommendations = recommender.recommend_profile(
+            index, user_profile, read_paper_ids, top_n=top_n, user_id=user_id
+        )
+    else:
+        # 3. 읽은 논문 정보 가져오기
+        read_papers = db.query(Survey).filter(Survey.id.in_(read_paper_ids)).all()
+        read_papers_dict = [survey_to_paper(p) for p in read_papers]
+        candidate_papers_dict = [survey_to_paper(p) for p in saved_surveys]
+
+        # TF-IDF + Cosine Similarity 추천
+        recommendations = recommender.recommend(
+            user_read_papers=read_papers_dict,
+            all_papers=candidate_papers_dict,
+            top_n=top_n
+        )
 
     print(f"✅ Generated {len(recommendations)} recommendations")
 
-    # 결과 생성
+    # 결과 생성 (추천 논문을 한 번에 조회)
+    surveys_by_id = {
+        survey.id: survey
+        for survey in db.query(Survey).filter(Survey.id.in_([pid for pid, _ in recommendations])).all()
+    } if recommendations else {}
     result = []
     for paper_id, similarity_score in recommendations:
-        survey = db.query(Survey).filter(Survey.id == paper_id).first()
+        survey = surveys_by_id.get(paper_id)
         if survey:
             result.append({
                 "survey": survey,
@@ -681,54 +1075,23 @@ async def search_surveys(
             detail="Search query is required"
         )
 
+    if LOCAL_CORPUS_ONLY:
+        return search_local_titles(db, q, limit=max_results)
+
     # ArXiv에서 검색
     print(f"📡 Fetching from ArXiv...")
-    arxiv_results = scraper.search_surveys(q, max_results=max_results)
+    arxiv_results = await scraper.search_surveys(q, max_results=max_results)
     print(f"✅ Found {len(arxiv_results)} papers from ArXiv")
 
-    # DB에 저장 및 반환
-    survey_responses = []
-    for result in arxiv_results:
-        # 이미 DB에 있는지 확인
-        existing_survey = db.query(Survey).filter(
-            Survey.arxiv_id == result["arxiv_id"]
-        ).first()
-
-        if existing_survey:
-            survey_responses.append(existing_survey)
-        else:
-            # 키워드 추출
-            keywords = keyword_extractor.extract_from_title_and_abstract(
-                result["title"],
-                result["abstract"],
-                top_n=3
-            )
-            keywords_str = ", ".join(keywords)
-
-            # 읽기 시간 추정
-            reading_times = scraper.estimate_reading_time(result["abstract"])
-
-            # 새 Survey 생성
-            new_survey = Survey(
-                arxiv_id=result["arxiv_id"],
-                title=result["title"],
-                abstract=result["abstract"],
-                keywords=keywords_str,
-                authors=result["authors"],
-                published_date=result["published_date"],
-                pdf_url=result["pdf_url"],
-                categories=result["categories"],
-                estimated_reading_time_beginner=reading_times["beginner"],
-                estimated_reading_time_intermediate=reading_times["intermediate"],
-                estimated_reading_time_advanced=reading_times["advanced"],
-                tags=q,
-                view_count=0
-            )
-
-            db.add(new_survey)
-            db.commit()
-            db.refresh(new_survey)
-
-            survey_responses.append(new_survey)
+    # DB에 없는 논문만 일괄 저장 후 검색 순서대로 반환
+    survey_responses, _ = ingest_papers(
+        db,
+        arxiv_results,
+        keyword_extractor,
+        scraper.estimate_reading_time,
+        keyword_top_n=3,
+        enrichment_queue=enrichment_queue,
+        tags=q
+    )
 
     return survey_responses
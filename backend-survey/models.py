@@ -51,4 +51,13 @@ class UserActivity(Base):
     user_id = Column(Integer, nullable=False, index=True)
     activity_date = Column(Date, nullable=False, index=True)
     survey_views = Column(Integer, default=0)  # 해당 날짜에 조회한 논문 수
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+class HarvestState(Base):
+    """ArXiv 수집 작업 진행 상태 (재시작 시 이어서 수집)"""
+    __tablename__ = "harvest_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, nullable=False)
+    watermark = Column(DateTime, nullable=False)  # 이 시각(submitted date)까지 수집 완료
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,118 @@
+"""
+논문별 유사 논문(이웃) 테이블
+TF-IDF 색인의 모든 논문에 대해 코사인 유사도 상위 k개 이웃을 오프라인으로 미리 계산해
+행 번호(int32)와 점수(float32) 배열 두 개로 저장한다. 조회는 행 하나를 읽는 O(k).
+
+- "비슷한 논문" (GET /surveys/{survey_id}/similar)
+- 개인화 추천: 완료한 논문들의 이웃 목록을 합쳐(점수 합) 상위 N개
+
+계산은 논문을 행 블록으로 나눠 (블록 x 전체) 유사도를 구하고 블록마다 상위 k개만 남긴다.
+색인 디렉토리(mmap 형식) 안의 neighbors/ 아래에 .npy 파일로 저장하며 np.load(mmap_mode='r')로 연다.
+"""
+import os
+import time
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from recommender import score_blocks, top_k, top_k_rows
+
+# TF-IDF 색인 디렉토리 안의 이웃 테이블 하위 디렉토리
+NEIGHBORS_DIR = "neighbors"
+
+
+class NeighborTable:
+    def __init__(self, rows: np.ndarray, scores: np.ndarray):
+        """
+        Args:
+            rows: 논문 행마다 이웃 행 번호 (N x k, int32, 이웃이 k개보다 적으면 -1)
+            scores: 이웃별 코사인 유사도 (N x k, float32, 내림차순)
+        """
+        self.rows = rows
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        return self.rows.shape[1]
+
+    @classmethod
+    def build(
+        cls,
+        tfidf_matrix: sp.csr_matrix,
+        k: int = 20,
+        block_rows: Optional[int] = None,
+        max_block_cells: int = 2 ** 24
+    ) -> "NeighborTable":
+        """
+        TF-IDF 행렬(행마다 L2 정규화)로 모든 논문의 상위 k개 이웃 계산
+
+        Args:
+            tfidf_matrix: 논문별 TF-IDF 행렬 (N x F)
+            k: 논문당 이웃 수
+            block_rows: 한 번에 계산할 논문 수 (기본: 유사도 배열이 max_block_cells 이하가 되도록)
+            max_block_cells: 자동 블록 크기 계산 시 블록당 최대 배열 원소 수
+        """
+        matrix = tfidf_matrix.tocsr()
+        n_papers = matrix.shape[0]
+        k = min(k, max(n_papers - 1, 0))
+        if block_rows is None:
+            block_rows = max(1, max_block_cells // max(n_papers, 1))
+
+        rows = np.full((n_papers, k), -1, dtype=np.int32)
+        scores = np.zeros((n_papers, k), dtype=np.float32)
+        started = time.perf_counter()
+        for start in range(0, n_papers, block_rows):
+            end = min(start + block_rows, n_papers)
+            similarities = score_blocks((matrix,), matrix[start:end])
+            # 자기 자신 제외
+            similarities[np.arange(end - start), np.arange(start, end)] = -np.inf
+
+            top = top_k_rows(similarities, k)
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            valid = np.isfinite(top_scores) & (top_scores > 0)
+            rows[start:end] = np.where(valid, top, -1)
+            scores[start:end] = np.where(valid, top_scores, 0)
+
+        print(f"🧮 Computed {k} neighbors for {n_papers} papers in {time.perf_counter() - started:.1f}s")
+        return cls(rows, scores)
+
+    def neighbors_of(self, row: int, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """논문 행 하나의 (이웃 행, 점수), 유사도 내림차순"""
+        rows = np.asarray(self.rows[row, :limit])
+        scores = np.asarray(self.scores[row, :limit])
+        valid = rows >= 0
+        return rows[valid], scores[valid]
+
+    def merge(self, read_rows: Iterable[int], top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        여러 논문의 이웃 목록을 합쳐 상위 N개 (같은 이웃은 점수 합, 입력 논문은 제외)
+
+        Returns:
+            (행 번호, 합친 점수 / 입력 논문 수) - 점수 내림차순
+        """
+        read_rows = np.asarray(list(read_rows), dtype=np.int64)
+        if len(read_rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows = np.asarray(self.rows[read_rows]).ravel()
+        scores = np.asarray(self.scores[read_rows]).ravel()
+        valid = (rows >= 0) & ~np.isin(rows, read_rows)
+        candidates, inverse = np.unique(rows[valid], return_inverse=True)
+        totals = np.bincount(inverse, weights=scores[valid], minlength=len(candidates)) / len(read_rows)
+
+        best = top_k(totals, top_n)
+        return candidates[best], totals[best]
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "rows.npy"), np.ascontiguousarray(self.rows))
+        np.save(os.path.join(directory, "scores.npy"), np.ascontiguousarray(self.scores))
+
+    @classmethod
+    def load(cls, directory: str) -> "NeighborTable":
+        """save로 저장한 이웃 테이블을 읽기 전용 mmap으로 열기"""
+        return cls(
+            np.load(os.path.join(directory, "rows.npy"), mmap_mode='r'),
+            np.load(os.path.join(directory, "scores.npy"), mmap_mode='r')
+        )
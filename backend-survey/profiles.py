@@ -0,0 +1,172 @@
+"""
+사용자 프로필 벡터 저장소
+사용자가 완료한 논문 벡터의 합(희소)과 개수를 Redis에 저장해 두고,
+논문을 완료/삭제할 때마다 해당 논문 벡터만 더하거나 빼서 갱신한다.
+추천 요청은 읽은 논문을 다시 불러오거나 변환하지 않고 저장된 프로필에서 바로 시작한다.
+
+반감기(half_life_days)를 주면 오래전에 읽은 논문일수록 가중치가 지수적으로 줄어든다.
+    S(t) = Σ v_i · exp(-λ(t - t_i)),  λ = ln2 / 반감기
+저장된 S(t_u)는 조회/갱신 시점 t까지 exp(-λ(t - t_u))를 곱해 옮긴다.
+
+키 형식: user_profile:{user_id} → hash
+    v: 색인 버전 (버전이 바뀌면 벡터 공간이 달라지므로 다시 만듦)
+    f: 벡터 차원, n: 논문 수, w: 가중치 합, t: 마지막 갱신 시각 (epoch)
+    d: 희소 벡터 (int32 인덱스 + float32 값)
+"""
+import math
+import time
+from typing import List, Optional
+
+import numpy as np
+import redis
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+# 빼기 연산 후 남는 부동소수점 잔여값 제거 기준
+PRUNE_EPSILON = 1e-7
+
+
+def encode_vector(vector: sp.csr_matrix) -> bytes:
+    vector = vector.tocsr()
+    return vector.indices.astype("<i4").tobytes() + vector.data.astype("<f4").tobytes()
+
+
+def decode_vector(raw: bytes, n_features: int) -> sp.csr_matrix:
+    nnz = len(raw) // 8
+    indices = np.frombuffer(raw[:nnz * 4], dtype="<i4")
+    data = np.frombuffer(raw[nnz * 4:], dtype="<f4").astype(np.float64)
+    return sp.csr_matrix((data, indices, np.array([0, nnz])), shape=(1, n_features))
+
+
+class UserProfile:
+    def __init__(self, vector_sum: sp.csr_matrix, weight: float, papers: int, version: str, updated_at: float):
+        """
+        Args:
+            vector_sum: (감쇠 적용된) 완료 논문 벡터 합, 1 x F
+            weight: (감쇠 적용된) 가중치 합
+            papers: 프로필에 반영된 논문 수
+            version: 벡터를 만든 추천 색인 버전
+            updated_at: vector_sum/weight 기준 시각 (epoch)
+        """
+        self.vector_sum = vector_sum
+        self.weight = weight
+        self.papers = papers
+        self.version = version
+        self.updated_at = updated_at
+
+    def vector(self) -> sp.csr_matrix:
+        """코사인 유사도 계산용 L2 정규화 프로필 (평균과 방향이 같음)"""
+        return normalize(self.vector_sum, norm="l2")
+
+
+class UserProfileStore:
+    def __init__(self, redis_url: str, prefix: str = "user_profile", half_life_days: float = 0.0):
+        """
+        Args:
+            redis_url: Redis 주소
+            prefix: 키 접두사
+            half_life_days: 가중치가 절반이 되는 기간 (일), 0이면 감쇠 없음
+        """
+        self.redis = redis.from_url(redis_url)
+        self.prefix = prefix
+        self.decay_rate = math.log(2) / (half_life_days * 86400) if half_life_days > 0 else 0.0
+
+    def key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def decay(self, elapsed_seconds: float) -> float:
+        return math.exp(-self.decay_rate * max(elapsed_seconds, 0.0)) if self.decay_rate else 1.0
+
+    @staticmethod
+    def _parse(fields: dict) -> Optional[UserProfile]:
+        if not fields:
+            return None
+        return UserProfile(
+            decode_vector(fields[b"d"], int(fields[b"f"])),
+            float(fields[b"w"]),
+            int(fields[b"n"]),
+            fields[b"v"].decode(),
+            float(fields[b"t"])
+        )
+
+    def _mapping(self, profile: UserProfile) -> dict:
+        return {
+            "v": profile.version,
+            "f": profile.vector_sum.shape[1],
+            "n": profile.papers,
+            "w": profile.weight,
+            "t": profile.updated_at,
+            "d": encode_vector(profile.vector_sum)
+        }
+
+    def get(self, user_id: int) -> Optional[UserProfile]:
+        return self._parse(self.redis.hgetall(self.key(user_id)))
+
+    def compute(self, vectors: sp.csr_matrix, completed_at: List[float], version: str) -> UserProfile:
+        """
+        완료한 논문 벡터들로 프로필 계산 (저장하지 않음)
+
+        Args:
+            vectors: 완료한 논문 벡터 (행마다 L2 정규화), n x F
+            completed_at: 논문별 완료 시각 (epoch)
+            version: 벡터를 만든 추천 색인 버전
+        """
+        now = time.time()
+        weights = np.array([self.decay(now - t) for t in completed_at])
+        vector_sum = sp.csr_matrix(weights.reshape(1, -1)) @ vectors
+        return UserProfile(vector_sum.tocsr(), float(weights.sum()), vectors.shape[0], version, now)
+
+    def build(
+        self, user_id: int, vectors: sp.csr_matrix, completed_at: List[float], version: str
+    ) -> UserProfile:
+        """완료한 논문 벡터들로 프로필을 새로 만들어 저장 (인자는 compute와 같음)"""
+        profile = self.compute(vectors, completed_at, version)
+
+        key = self.key(user_id)
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=self._mapping(profile))
+        pipe.execute()
+        return profile
+
+    def update(self, user_id: int, vector: sp.csr_matrix, version: str, completed_at: float, sign: int = 1) -> bool:
+        """
+        논문 하나를 프로필에 더하거나(sign=1, 완료) 뺌(sign=-1, 완료 취소/삭제)
+
+        Returns:
+            갱신했으면 True, 저장된 프로필이 없거나 색인 버전이 달라 지웠으면 False
+            (다음 추천 요청에서 완료 목록으로 다시 만듦)
+        """
+        key = self.key(user_id)
+
+        def apply(pipe) -> bool:
+            profile = self._parse(pipe.hgetall(key))
+            if profile is None or profile.version != version:
+                pipe.multi()
+                pipe.delete(key)
+                return False
+
+            now = time.time()
+            carried = self.decay(now - profile.updated_at)
+            contribution = self.decay(now - completed_at) * sign
+
+            vector_sum = profile.vector_sum * carried + vector * contribution
+            vector_sum.data[np.abs(vector_sum.data) < PRUNE_EPSILON] = 0
+            vector_sum.eliminate_zeros()
+            profile = UserProfile(
+                vector_sum.tocsr(),
+                max(profile.weight * carried + contribution, 0.0),
+                max(profile.papers + sign, 0),
+                version,
+                now
+            )
+
+            pipe.multi()
+            pipe.hset(key, mapping=self._mapping(profile))
+            return True
+
+        # 동시에 같은 사용자를 갱신하면 WATCH 충돌 시 다시 시도
+        return self.redis.transaction(apply, key, value_from_callable=True)
+
+    def delete(self, user_id: int) -> None:
+        self.redis.delete(self.key(user_id))
@@ -0,0 +1,171 @@
+"""
+분산 Rate Limiter
+모든 워커/레플리카가 Redis의 토큰 버킷 하나를 공유하여 ArXiv API 요청 간격(3초당 1요청)을 지킨다.
+interactive 요청(/search 등)이 기다리는 동안에는 background 요청(수집 작업)이 토큰을 가져가지 못한다.
+"""
+import asyncio
+import random
+import time
+import uuid
+from typing import Dict, List
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from arxiv_client import AsyncRateLimiter
+
+# KEYS[1]: 버킷 해시, KEYS[2]: interactive 대기자 zset (score = lease 만료 시각)
+# ARGV: rate(초당 토큰), capacity, priority, waiter id, lease(ms)
+# 반환: 0이면 토큰 획득, 아니면 다시 시도할 때까지 기다릴 시간(ms)
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local waiting = KEYS[2]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local priority = ARGV[3]
+local waiter = ARGV[4]
+local lease_ms = tonumber(ARGV[5])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', waiting, '-inf', now)
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local function save()
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 60000)
+end
+
+local wait_ms = math.max(1, math.ceil((1 - tokens) * 1000 / rate))
+
+if priority == 'interactive' then
+    redis.call('ZADD', waiting, now + lease_ms, waiter)
+    redis.call('PEXPIRE', waiting, lease_ms)
+elseif redis.call('ZCARD', waiting) > 0 then
+    save()
+    return math.max(wait_ms, 100)
+end
+
+if tokens >= 1 then
+    tokens = tokens - 1
+    save()
+    if priority == 'interactive' then
+        redis.call('ZREM', waiting, waiter)
+    end
+    return 0
+end
+
+save()
+return wait_ms
+"""
+
+
+class WaitHistogram:
+    BUCKETS = [0.0, 0.1, 0.5, 1.0, 3.0, 5.0, 10.0, 30.0, 60.0]
+
+    def __init__(self):
+        """대기 시간 히스토그램 (초, 누적 버킷)"""
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(self.BUCKETS + [float("inf")], self.counts):
+            cumulative += n
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 3),
+            "avg_seconds": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": buckets
+        }
+
+
+class RedisTokenBucket:
+    PRIORITIES: List[str] = ["interactive", "background"]
+
+    def __init__(
+        self,
+        redis_url: str,
+        key: str = "arxiv:ratelimit",
+        rate: float = 1 / 3.0,
+        capacity: int = 1,
+        lease_ms: int = 10000
+    ):
+        """
+        Args:
+            redis_url: 공유 Redis 주소
+            key: 버킷 키 (같은 키를 쓰는 모든 프로세스가 한도를 공유)
+            rate: 초당 토큰 수 (ArXiv 권장: 1/3)
+            capacity: 버킷 크기 (1이면 버스트 없이 일정 간격)
+            lease_ms: interactive 대기 등록 유지 시간 (프로세스가 죽어도 background가 영구히 막히지 않도록)
+        """
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.key = key
+        self.waiting_key = f"{key}:interactive_waiting"
+        self.rate = rate
+        self.capacity = capacity
+        self.lease_ms = lease_ms
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+        # Redis 장애 시 프로세스 내 limiter로 대체 (한도는 프로세스 단위로만 지켜짐)
+        self._fallback = AsyncRateLimiter(min_interval=1 / rate)
+        self.fallback_count = 0
+
+        self.histograms = {priority: WaitHistogram() for priority in self.PRIORITIES}
+
+    async def acquire(self, priority: str = "interactive") -> float:
+        """토큰을 얻을 때까지 대기, 대기한 시간(초) 반환"""
+        if priority not in self.histograms:
+            priority = "background"
+
+        start = time.monotonic()
+        waiter = uuid.uuid4().hex
+        try:
+            while True:
+                wait_ms = await self._script(
+                    keys=[self.key, self.waiting_key],
+                    args=[self.rate, self.capacity, priority, waiter, self.lease_ms]
+                )
+                if wait_ms == 0:
+                    break
+                # 여러 프로세스가 동시에 깨어나지 않도록 약간의 지터 추가
+                await asyncio.sleep(wait_ms / 1000 + random.uniform(0, 0.05))
+        except RedisError as e:
+            print(f"Redis rate limiter unavailable, using local limiter: {e}")
+            self.fallback_count += 1
+            await self._fallback.acquire(priority)
+
+        waited = time.monotonic() - start
+        self.histograms[priority].observe(waited)
+        return waited
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+    def stats(self) -> Dict:
+        return {
+            "key": self.key,
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "fallback_count": self.fallback_count,
+            "wait_seconds": {
+                priority: histogram.snapshot()
+                for priority, histogram in self.histograms.items()
+            }
+        }
@@ -0,0 +1,74 @@
+"""
+일괄 추천(recommend_many) 처리량 벤치마크
+
+합성 코퍼스로 색인을 만들고, 사용자마다 읽은 논문을 무작위로 골라
+1. 사용자별 recommend_indexed 호출 (읽은 논문 텍스트 변환 + 점수 계산)
+2. recommend_many 한 번 호출 (프로필 행렬 x 색인 행렬 청크 곱)
+의 초당 사용자 수를 비교하고, 두 결과의 상위 논문이 같은지 확인한다.
+
+사용법:
+    python recommend_benchmark.py --papers 20000 --users 2000
+    python recommend_benchmark.py --mode incremental --top-n 50
+"""
+import argparse
+import random
+import time
+
+from keyword_benchmark import make_synthetic_corpus
+from recommender import SurveyRecommender, RecommenderIndex, IncrementalIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일괄 추천 처리량 비교")
+    parser.add_argument("--papers", type=int, default=20000, help="코퍼스 논문 수")
+    parser.add_argument("--users", type=int, default=2000, help="추천할 사용자 수")
+    parser.add_argument("--single-users", type=int, default=200, help="사용자별 호출로 측정할 사용자 수")
+    parser.add_argument("--top-n", type=int, default=20, help="사용자별 추천 개수")
+    parser.add_argument("--mode", choices=["prebuilt", "incremental"], default="prebuilt", help="색인 종류")
+    args = parser.parse_args()
+
+    docs = make_synthetic_corpus(args.papers)
+    papers = [
+        {'id': i + 1, 'title': title, 'abstract': abstract, 'keywords': ''}
+        for i, (title, abstract) in enumerate(docs)
+    ]
+
+    started = time.perf_counter()
+    recommender = SurveyRecommender()
+    if args.mode == "prebuilt":
+        recommender.index = RecommenderIndex.build(papers)
+    else:
+        recommender.index = IncrementalIndex()
+        recommender.index.add(papers)
+    print(f"📊 {args.papers} papers ({args.mode} index built in {time.perf_counter() - started:.1f}s), top {args.top_n}")
+
+    rng = random.Random(7)
+    user_profiles = {
+        user_id: rng.sample(range(1, args.papers + 1), rng.randint(5, 30))
+        for user_id in range(args.users)
+    }
+
+    single_users = list(user_profiles)[:args.single_users]
+    started = time.perf_counter()
+    single = {
+        user_id: recommender.recommend_indexed([papers[pid - 1] for pid in user_profiles[user_id]], args.top_n)
+        for user_id in single_users
+    }
+    single_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = recommender.recommend_many(user_profiles, args.top_n)
+    batch_elapsed = time.perf_counter() - started
+
+    matches = sum(
+        [pid for pid, _ in single[user_id]] == [pid for pid, _ in batch[user_id]]
+        for user_id in single_users
+    )
+    print(f"{'':<18}{'users':>8}{'seconds':>10}{'users/s':>12}")
+    print(f"{'recommend_indexed':<18}{len(single_users):>8}{single_elapsed:>10.2f}{len(single_users) / single_elapsed:>12.1f}")
+    print(f"{'recommend_many':<18}{args.users:>8}{batch_elapsed:>10.2f}{args.users / batch_elapsed:>12.1f}")
+    print(f"same top-{args.top_n} for {matches}/{len(single_users)} users")
+
+
+if __name__ == "__main__":
+    main()
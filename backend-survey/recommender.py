@@ -1,75 +1,749 @@
 """
 TF-IDF 및 Cosine Similarity 기반 논문 추천 시스템
+
+로컬 코퍼스 전체에 대한 TF-IDF 색인(RecommenderIndex)은 build_index.py가 오프라인으로 만들어
+버전별 파일로 저장하고, API는 시작 시 최신 버전을 불러와 요청마다 읽은 논문만 변환해 점수를 계산한다.
+새 버전은 백그라운드에서 불러온 뒤 참조만 바꿔 끼우므로 처리 중인 요청은 기존 색인을 끝까지 사용한다.
+색인에 LSA 임베딩(lsa_index.py)이 함께 있으면 engine="lsa"로 밀집 벡터 공간에서 검색할 수 있다.
+미리 계산한 이웃 테이블(neighbors.py)이 있으면 "비슷한 논문"을 O(k)로 조회하고,
+engine="neighbors"로 완료한 논문들의 이웃 목록을 합쳐 개인화 추천을 만든다.
+협업 필터링 모델(collaborative.py)을 붙이면 TF-IDF 점수와 cf_weight 비율로 섞는다.
+
+색인 파일은 기본적으로 배열별 .npy 디렉토리(mmap 형식)로 저장한다. 워커들은 np.load(mmap_mode='r')로
+열기만 하므로 역직렬화 없이 바로 시작하고, 같은 노드의 워커들이 페이지 캐시 한 벌을 공유한다.
+
+증분 모드(IncrementalIndex)는 해시 어휘(HashingVectorizer)와 문서 빈도를 온라인으로 유지하며
+새 논문을 행 블록으로 덧붙이고, IDF 재계산은 코퍼스가 일정 비율 이상 커졌을 때 compaction에서 한 번에 한다.
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, CountVectorizer
+from sklearn.preprocessing import normalize
 import numpy as np
-from typing import List, Dict, Tuple
+import scipy.sparse as sp
+from datetime import datetime
+from typing import Any, List, Dict, Tuple, Optional
+import glob
 import joblib
+import json
 import os
+import secrets
+import shutil
+import tempfile
+import threading
+
+# 색인 디렉토리 안에서 현재 버전을 가리키는 파일
+INDEX_POINTER = "CURRENT"
+# mmap 형식 색인 디렉토리의 메타데이터 파일 (버전, 행렬 크기, 어휘, 토큰화 설정)
+INDEX_META = "meta.json"
+
+
+def make_vectorizer() -> TfidfVectorizer:
+    return TfidfVectorizer(
+        max_features=1000,  # 최대 feature 수
+        stop_words='english',  # 영어 불용어 제거
+        ngram_range=(1, 2),  # unigram + bigram
+        min_df=1,  # 최소 문서 빈도
+        max_df=0.8  # 최대 문서 빈도 (너무 흔한 단어 제거)
+    )
+
+
+def prepare_text(title: str, abstract: str, keywords: str = "") -> str:
+    """
+    논문의 제목, 초록, 키워드를 결합하여 하나의 텍스트로 만듦
+    제목과 키워드에 가중치 부여 (반복)
+
+    Args:
+        title: 논문 제목
+        abstract: 논문 초록
+        keywords: 논문 키워드 (콤마로 구분된 문자열)
+
+    Returns:
+        결합된 텍스트
+    """
+    # 제목과 키워드에 가중치 부여 (3번 반복)
+    weighted_title = " ".join([title or ""] * 3)
+    weighted_keywords = " ".join([keywords] * 2) if keywords else ""
+
+    combined = f"{weighted_title} {abstract or ''} {weighted_keywords}"
+    return combined.strip()
+
+
+class VocabularyVectorizer:
+    def __init__(self, vocabulary: List[str], idf: np.ndarray, ngram_range: Tuple[int, int], stop_words: Optional[str]):
+        """
+        어휘와 IDF 배열만으로 학습된 TfidfVectorizer와 같은 변환 수행
+        (단어 빈도 x IDF → L2 정규화, 피클 없이 mmap 색인에서 불러오기 위함)
 
+        Args:
+            vocabulary: 열 순서대로의 어휘
+            idf: 열별 IDF 값
+            ngram_range: 학습 때 사용한 n-gram 범위
+            stop_words: 학습 때 사용한 불용어 설정
+        """
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = stop_words
+        self.counter = CountVectorizer(
+            vocabulary={term: column for column, term in enumerate(self.vocabulary)},
+            ngram_range=self.ngram_range,
+            stop_words=stop_words,
+            dtype=np.float32
+        )
+        self.idf_diag = sp.diags(self.idf, format='csr')
 
-class SurveyRecommender:
-    def __init__(self):
+    @classmethod
+    def from_tfidf(cls, vectorizer: TfidfVectorizer) -> "VocabularyVectorizer":
+        vocabulary = [None] * len(vectorizer.vocabulary_)
+        for term, column in vectorizer.vocabulary_.items():
+            vocabulary[column] = term
+        return cls(vocabulary, vectorizer.idf_, vectorizer.ngram_range, vectorizer.stop_words)
+
+    def transform(self, texts: List[str]) -> sp.csr_matrix:
+        return normalize(self.counter.transform(texts) @ self.idf_diag, norm='l2')
+
+
+class RowLookup:
+    def __init__(self, paper_ids: np.ndarray, order: Optional[np.ndarray] = None):
         """
-        TF-IDF 기반 추천 시스템 초기화
+        논문 ID → 행 번호 (dict 대신 ID 배열과 정렬 순서 배열을 이진 탐색, mmap 배열을 그대로 사용)
+
+        Args:
+            paper_ids: 행 순서대로의 논문 ID 배열
+            order: paper_ids를 정렬하는 인덱스 배열 (없으면 계산)
+        """
+        self.paper_ids = paper_ids
+        self.order = np.argsort(paper_ids, kind='stable') if order is None else order
+
+    def find(self, paper_id: int) -> int:
+        """행 번호, 없으면 -1"""
+        pos = int(np.searchsorted(self.paper_ids, paper_id, sorter=self.order))
+        if pos < len(self.order) and self.paper_ids[self.order[pos]] == paper_id:
+            return int(self.order[pos])
+        return -1
+
+    def find_many(self, paper_ids: np.ndarray) -> np.ndarray:
+        """여러 ID의 행 번호를 한 번에 (없으면 -1)"""
+        paper_ids = np.asarray(paper_ids, dtype=np.int64)
+        if len(self.order) == 0:
+            return np.full(len(paper_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.paper_ids, paper_ids, sorter=self.order), len(self.order) - 1)
+        rows = np.asarray(self.order[pos], dtype=np.int64)
+        return np.where(np.asarray(self.paper_ids[rows]) == paper_ids, rows, -1)
+
+    def __contains__(self, paper_id: int) -> bool:
+        return self.find(paper_id) >= 0
+
+    def __getitem__(self, paper_id: int) -> int:
+        row = self.find(paper_id)
+        if row < 0:
+            raise KeyError(paper_id)
+        return row
+
+    def __len__(self) -> int:
+        return len(self.paper_ids)
+
+
+class RecommenderIndex:
+    def __init__(self, vectorizer, tfidf_matrix, paper_ids, version: str, id_order: Optional[np.ndarray] = None):
+        """
+        학습된 TF-IDF 색인 (만든 뒤에는 변경하지 않으므로 여러 요청이 동시에 읽어도 안전)
+
+        Args:
+            vectorizer: 코퍼스로 학습된 TfidfVectorizer 또는 VocabularyVectorizer
+            tfidf_matrix: 논문별 TF-IDF 행렬 (행 순서 = paper_ids 순서)
+            paper_ids: 논문 ID 리스트 또는 배열
+            version: 색인 버전
+            id_order: paper_ids 정렬 인덱스 (mmap 색인에 저장된 것을 재사용)
+        """
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = tfidf_matrix
+        self.paper_ids = np.asarray(paper_ids, dtype=np.int64)
+        self.version = version
+        self.row_of = RowLookup(self.paper_ids, id_order)
+        # 선택: LSA 임베딩 색인 (lsa_index.LsaIndex, 행 순서는 tfidf_matrix와 같음)
+        self.lsa = None
+        # 선택: 논문별 상위 k 이웃 테이블 (neighbors.NeighborTable, 행 순서는 tfidf_matrix와 같음)
+        self.neighbors = None
+
+    @classmethod
+    def build(cls, papers: List[Dict], version: Optional[str] = None) -> "RecommenderIndex":
         """
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,  # 최대 feature 수
-            stop_words='english',  # 영어 불용어 제거
-            ngram_range=(1, 2),  # unigram + bigram
-            min_df=1,  # 최소 문서 빈도
-            max_df=0.8  # 최대 문서 빈도 (너무 흔한 단어 제거)
+        논문 데이터로 TF-IDF 색인 생성
+
+        Args:
+            papers: 'id', 'title', 'abstract', 'keywords' 키를 포함한 논문 딕셔너리 리스트
+            version: 색인 버전 (기본: 생성 시각)
+        """
+        if not papers:
+            raise ValueError("논문 데이터가 비어있습니다")
+
+        vectorizer = make_vectorizer()
+        texts = [
+            prepare_text(p.get('title', ''), p.get('abstract', ''), p.get('keywords', ''))
+            for p in papers
+        ]
+        tfidf_matrix = vectorizer.fit_transform(texts)
+        return cls(
+            vectorizer,
+            tfidf_matrix,
+            [p['id'] for p in papers],
+            version or new_index_version()
         )
-        self.tfidf_matrix = None
-        self.paper_ids = []
 
-    def prepare_text(self, title: str, abstract: str, keywords: str = "") -> str:
+    def transform(self, papers: List[Dict]):
+        return self.vectorizer.transform([
+            prepare_text(p.get('title', ''), p.get('abstract', ''), p.get('keywords', ''))
+            for p in papers
+        ])
+
+    def snapshot(self) -> Tuple[Tuple, List[int]]:
+        """(행렬 블록들, 논문 ID) - 블록을 순서대로 이으면 paper_ids와 행이 맞음"""
+        return (self.tfidf_matrix,), self.paper_ids
+
+    def save(self, filepath: str) -> None:
+        model_data = {
+            'version': self.version,
+            'vectorizer': self.vectorizer,
+            'tfidf_matrix': self.tfidf_matrix,
+            'paper_ids': self.paper_ids
+        }
+        joblib.dump(model_data, filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> "RecommenderIndex":
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"모델 파일을 찾을 수 없습니다: {filepath}")
+
+        model_data = joblib.load(filepath)
+        return cls(
+            model_data['vectorizer'],
+            model_data['tfidf_matrix'],
+            model_data['paper_ids'],
+            model_data.get('version', os.path.basename(filepath))
+        )
+
+    def save_mapped(self, directory: str) -> None:
+        """
+        mmap으로 열 수 있도록 배열별 .npy 파일로 저장
+        (CSR data는 float32, 인덱스는 int32 - nnz가 2^31 이상이면 int64)
         """
-        논문의 제목, 초록, 키워드를 결합하여 하나의 텍스트로 만듦
-        제목과 키워드에 가중치 부여 (반복)
+        os.makedirs(directory, exist_ok=True)
+        matrix = self.tfidf_matrix.tocsr()
+        vectorizer = self.vectorizer
+        if not isinstance(vectorizer, VocabularyVectorizer):
+            vectorizer = VocabularyVectorizer.from_tfidf(vectorizer)
+
+        index_dtype = np.int32 if matrix.nnz < 2 ** 31 else np.int64
+        arrays = {
+            'data': matrix.data.astype(np.float32),
+            'indices': matrix.indices.astype(index_dtype),
+            'indptr': matrix.indptr.astype(index_dtype),
+            'paper_ids': self.paper_ids,
+            'id_order': self.row_of.order.astype(np.int64),
+            'idf': vectorizer.idf
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+        meta = {
+            'version': self.version,
+            'shape': list(matrix.shape),
+            'vocabulary': vectorizer.vocabulary,
+            'ngram_range': list(vectorizer.ngram_range),
+            'stop_words': vectorizer.stop_words
+        }
+        with open(os.path.join(directory, INDEX_META), "w") as f:
+            json.dump(meta, f)
+
+        if self.lsa is not None:
+            from lsa_index import LSA_DIR
+            self.lsa.save(os.path.join(directory, LSA_DIR))
+        if self.neighbors is not None:
+            from neighbors import NEIGHBORS_DIR
+            self.neighbors.save(os.path.join(directory, NEIGHBORS_DIR))
+
+    @classmethod
+    def load_mapped(cls, directory: str) -> "RecommenderIndex":
+        """save_mapped로 저장한 색인을 읽기 전용 mmap으로 열기 (배열을 복사하지 않음)"""
+        meta_path = os.path.join(directory, INDEX_META)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"색인 디렉토리를 찾을 수 없습니다: {directory}")
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        def mapped(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+
+        # csr_matrix 생성자는 dtype이 맞으면 배열을 복사하지 않으므로 mmap을 직접 참조
+        tfidf_matrix = sp.csr_matrix(
+            (mapped('data'), mapped('indices'), mapped('indptr')),
+            shape=tuple(meta['shape']),
+            copy=False
+        )
+        vectorizer = VocabularyVectorizer(
+            meta['vocabulary'], mapped('idf'), meta['ngram_range'], meta['stop_words']
+        )
+        index = cls(vectorizer, tfidf_matrix, mapped('paper_ids'), meta['version'], id_order=mapped('id_order'))
+
+        from lsa_index import LsaIndex, LSA_DIR
+        if os.path.isdir(os.path.join(directory, LSA_DIR)):
+            index.lsa = LsaIndex.load(os.path.join(directory, LSA_DIR))
+        from neighbors import NeighborTable, NEIGHBORS_DIR
+        if os.path.isdir(os.path.join(directory, NEIGHBORS_DIR)):
+            index.neighbors = NeighborTable.load(os.path.join(directory, NEIGHBORS_DIR))
+        return index
+
+
+class IncrementalIndex:
+    def __init__(self, n_features: int = 2 ** 18, compact_ratio: float = 0.1):
+        """
+        재학습 없이 논문을 추가할 수 있는 TF-IDF 색인
 
         Args:
-            title: 논문 제목
-            abstract: 논문 초록
-            keywords: 논문 키워드 (콤마로 구분된 문자열)
+            n_features: 해시 어휘 크기 (고정이라 논문이 늘어도 열이 바뀌지 않음)
+            compact_ratio: 마지막 compaction 이후 문서 수가 이 비율 이상 늘면 IDF를 다시 계산
+        """
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None  # 원시 단어 빈도 (IDF/정규화는 직접 적용)
+        )
+        self.compact_ratio = compact_ratio
+
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.idf = self._compute_idf()
+        self.compacted_docs = 0
+        # compaction마다 IDF와 모든 행 가중치가 바뀌므로 버전도 바꿈 (저장된 사용자 프로필 무효화)
+        self.version = f"incremental-{self.compacted_docs}"
+
+        # 원시 빈도 블록 (compaction 때 새 IDF로 다시 가중치를 주기 위해 보관)
+        self._raw_blocks: List[sp.csr_matrix] = []
+        # 요청이 읽는 상태: (가중치 적용/정규화된 블록들, 논문 ID) 를 한 번에 교체
+        self._view: Tuple[Tuple, List[int]] = ((), [])
+        self.row_of: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def paper_ids(self) -> List[int]:
+        return self._view[1]
+
+    def _compute_idf(self) -> np.ndarray:
+        # TfidfVectorizer(smooth_idf=True)와 같은 식
+        return np.log((1 + self.n_docs) / (1 + self.df)) + 1
+
+    def _weight(self, counts: sp.csr_matrix) -> sp.csr_matrix:
+        return normalize(counts @ sp.diags(self.idf), norm='l2', copy=False).tocsr()
+
+    def _hash(self, papers: List[Dict]) -> sp.csr_matrix:
+        return self.hasher.transform([
+            prepare_text(p.get('title', ''), p.get('abstract', ''), p.get('keywords', ''))
+            for p in papers
+        ]).tocsr()
+
+    def transform(self, papers: List[Dict]):
+        return self._weight(self._hash(papers))
+
+    def snapshot(self) -> Tuple[Tuple, List[int]]:
+        """(행렬 블록들, 논문 ID) - 블록을 순서대로 이으면 paper_ids와 행이 맞음"""
+        return self._view
+
+    def add(self, papers: List[Dict]) -> int:
+        """
+        새 논문을 색인에 추가 (이미 있는 ID는 건너뜀)
 
         Returns:
-            결합된 텍스트
+            추가한 논문 수
         """
-        # 제목과 키워드에 가중치 부여 (3번 반복)
-        weighted_title = " ".join([title] * 3)
-        weighted_keywords = " ".join([keywords] * 2) if keywords else ""
+        with self._lock:
+            papers = [p for p in papers if p['id'] not in self.row_of]
+            if not papers:
+                return 0
+
+            counts = self._hash(papers)
+            # 문서 빈도 갱신 (단어가 나온 문서 수)
+            self.df += np.bincount(counts.indices, minlength=self.df.shape[0])
+            self.n_docs += counts.shape[0]
+            self._raw_blocks.append(counts)
+
+            # 새 행은 마지막 compaction 때의 IDF로 가중치 부여
+            blocks, paper_ids = self._view
+            new_ids = [p['id'] for p in papers]
+            for offset, paper_id in enumerate(new_ids):
+                self.row_of[paper_id] = len(paper_ids) + offset
+            self._view = (blocks + (self._weight(counts),), paper_ids + new_ids)
+
+        if self.n_docs > self.compacted_docs * (1 + self.compact_ratio):
+            self.compact()
+        return len(papers)
+
+    def compact(self) -> None:
+        """현재 문서 빈도로 IDF를 다시 계산하고 블록을 하나로 합침"""
+        with self._lock:
+            if not self._raw_blocks:
+                return
+            raw = sp.vstack(self._raw_blocks, format='csr')
+            self._raw_blocks = [raw]
+            self.idf = self._compute_idf()
+            self.compacted_docs = self.n_docs
+            self._view = ((self._weight(raw),), self._view[1])
+            self.version = f"incremental-{self.compacted_docs}"
+
+
+def mean_profile(vectors: sp.csr_matrix) -> sp.csr_matrix:
+    """L2 정규화된 행 벡터들의 평균 (희소 유지) 을 다시 L2 정규화한 1 x F 프로필"""
+    n_rows = vectors.shape[0]
+    weights = sp.csr_matrix(np.full((1, n_rows), 1.0 / n_rows))
+    return normalize(weights @ vectors, norm='l2')
+
+
+def score_blocks(blocks: Tuple, profiles: sp.csr_matrix) -> np.ndarray:
+    """
+    색인 행(L2 정규화 완료)과 프로필들의 코사인 유사도
+
+    Returns:
+        (프로필 수, 논문 수) 점수 배열
+    """
+    # 색인 행렬은 희소 그대로 두고 프로필만 열 벡터로 펼쳐 곱함 (희소 x 희소 곱보다 훨씬 빠름)
+    dense_profiles = profiles.T.toarray()
+    return np.hstack([np.asarray(block @ dense_profiles).T for block in blocks])
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개의 위치를 내림차순으로 반환 (전체 정렬 없이 argpartition)"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """행마다 점수 상위 k개의 열 위치를 내림차순으로 반환"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def lookup_rows(row_of, paper_ids: np.ndarray) -> np.ndarray:
+    """색인 종류와 관계없이 논문 ID 배열 → 행 번호 배열 (없으면 -1)"""
+    if isinstance(row_of, RowLookup):
+        return row_of.find_many(paper_ids)
+    return np.array([row_of.get(int(pid), -1) for pid in paper_ids], dtype=np.int64)
+
+
+def index_path(directory: str, version: str, fmt: str = "mmap") -> str:
+    """fmt: "mmap"(배열 디렉토리) 또는 "joblib"(피클 파일)"""
+    suffix = ".joblib" if fmt == "joblib" else ""
+    return os.path.join(directory, f"tfidf-{version}{suffix}")
+
+
+def load_index(directory: str, version: str) -> RecommenderIndex:
+    """저장 형식을 보고 해당 버전 색인 불러오기 (mmap 디렉토리 우선)"""
+    path = index_path(directory, version, "mmap")
+    if os.path.isdir(path):
+        return RecommenderIndex.load_mapped(path)
+    return RecommenderIndex.load(index_path(directory, version, "joblib"))
+
+
+def current_index_version(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, INDEX_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def new_index_version() -> str:
+    """시간순으로 정렬되면서 동시에 만든 빌드끼리 겹치지 않는 색인 버전 (UTC 시각 + 무작위 접미사)"""
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{secrets.token_hex(4)}"
+
+
+def publish_index(index: RecommenderIndex, directory: str, keep: int = 3, fmt: str = "mmap") -> str:
+    """
+    색인을 새 버전으로 저장하고 CURRENT가 가리키게 함 (임시 파일/디렉토리 → rename 으로 원자적 교체)
+    가장 최근 keep개 버전만 남김
+
+    Args:
+        fmt: "mmap"(배열 디렉토리) 또는 "joblib"(피클 파일)
+
+    Returns:
+        저장한 경로
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = index_path(directory, index.version, fmt)
+
+    if fmt == "joblib":
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        os.close(fd)
+    else:
+        tmp_path = tempfile.mkdtemp(dir=directory)
+    try:
+        if fmt == "joblib":
+            index.save(tmp_path)
+        else:
+            index.save_mapped(tmp_path)
+        # 이미 있는 버전 디렉토리로는 rename할 수 없음 (OSError) - 버전은 빌드마다 새로 만들어야 함
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    fd, tmp_pointer = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "w") as f:
+        f.write(index.version)
+    os.replace(tmp_pointer, os.path.join(directory, INDEX_POINTER))
+
+    # 불러오는 중인 워커가 있을 수 있으므로 직전 버전들은 남겨 둠
+    # (mmap으로 열려 있는 파일은 지워도 열어 둔 워커는 계속 읽을 수 있음)
+    versions = sorted(
+        glob.glob(os.path.join(directory, "tfidf-*")),
+        key=lambda p: os.path.basename(p).replace(".joblib", "")
+    )
+    for old_path in versions[:-keep]:
+        if os.path.isdir(old_path):
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            os.remove(old_path)
+
+    return path
 
-        combined = f"{weighted_title} {abstract} {weighted_keywords}"
-        return combined.strip()
 
-    def fit(self, papers: List[Dict]) -> None:
+class SurveyRecommender:
+    def __init__(self, engine: str = "tfidf", nprobe: int = 0, cf_weight: float = 0.0):
         """
-        논문 데이터로 TF-IDF 모델 학습
+        TF-IDF 기반 추천 시스템 초기화
+
+        Args:
+            engine: "tfidf"(희소 코사인), "lsa"(색인에 LSA 임베딩이 있을 때 밀집 벡터 검색),
+                "neighbors"(색인에 이웃 테이블이 있을 때 완료한 논문들의 이웃 목록 병합)
+            nprobe: LSA 엔진에서 검사할 IVF 리스트 수, 0이면 정확 검색
+            cf_weight: 협업 필터링 점수 비율 (최종 = (1 - w)·TF-IDF + w·CF, tfidf 엔진에만 적용)
+        """
+        # 사전 구축 색인 또는 증분 색인 (교체는 참조 대입 한 번으로만 함)
+        self.index = None
+        self.engine = engine
+        self.nprobe = nprobe
+        # 선택: 협업 필터링 모델 (collaborative.CooccurrenceModel, 교체는 참조 대입으로만 함)
+        self.collaborative = None
+        self.cf_weight = cf_weight
+
+    def reload_index(self, directory: str) -> bool:
+        """
+        색인 디렉토리의 현재 버전이 바뀌었으면 불러와서 교체 (블로킹, 스레드에서 호출)
+
+        Returns:
+            교체했으면 True
+        """
+        version = current_index_version(directory)
+        if version is None or isinstance(self.index, IncrementalIndex):
+            return False
+        if self.index is not None and self.index.version == version:
+            return False
+
+        index = load_index(directory, version)
+        # 불러오기가 끝난 뒤 참조만 교체 (처리 중인 요청은 이전 색인을 계속 사용)
+        self.index = index
+        return True
+
+    def prepare_text(self, title: str, abstract: str, keywords: str = "") -> str:
+        """논문의 제목, 초록, 키워드를 결합하여 하나의 텍스트로 만듦 (prepare_text 참고)"""
+        return prepare_text(title, abstract, keywords)
+
+    def fit(self, papers: List[Dict]) -> RecommenderIndex:
+        """
+        논문 데이터로 TF-IDF 모델 학습 후 현재 색인으로 사용
 
         Args:
             papers: 논문 정보 딕셔너리 리스트
                     각 딕셔너리는 'id', 'title', 'abstract', 'keywords' 키를 포함
         """
-        if not papers:
-            raise ValueError("논문 데이터가 비어있습니다")
+        self.index = RecommenderIndex.build(papers)
+        return self.index
 
-        # 논문 ID 저장
-        self.paper_ids = [p['id'] for p in papers]
+    def _score(
+        self,
+        index,
+        user_read_papers: List[Dict],
+        top_n: int,
+        user_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """읽은 논문만 변환해 색인 전체와 비교"""
+        # 사용자가 읽은 논문들의 평균 벡터 (희소 행렬 그대로 계산)
+        user_profile = mean_profile(index.transform(user_read_papers))
+        return self._score_profile(index, user_profile, [p['id'] for p in user_read_papers], top_n, user_id)
+
+    def _collaborative_scores(self, index, users: List, n_papers: int) -> Optional[sp.csr_matrix]:
+        """사용자들의 협업 필터링 점수를 색인 행 순서로 (사용자 수 x 논문 수), 모델이 없으면 None"""
+        model = self.collaborative
+        if model is None or self.cf_weight <= 0:
+            return None
+
+        scores, item_ids = model.score_users(users)
+        item_rows = lookup_rows(index.row_of, item_ids)
+        user_rows = np.repeat(np.arange(scores.shape[0]), np.diff(scores.indptr))
+        paper_rows = item_rows[scores.indices]
+        valid = (paper_rows >= 0) & (paper_rows < n_papers)
+        return sp.csr_matrix(
+            (scores.data[valid], (user_rows[valid], paper_rows[valid])),
+            shape=(len(users), n_papers)
+        )
 
-        # 텍스트 준비
-        texts = [
-            self.prepare_text(
-                p.get('title', ''),
-                p.get('abstract', ''),
-                p.get('keywords', '')
-            )
-            for p in papers
-        ]
+    def _score_profile(
+        self,
+        index,
+        user_profile: sp.csr_matrix,
+        read_ids: List[int],
+        top_n: int,
+        user_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """프로필 벡터를 색인 전체와 비교 (user_id가 있으면 협업 필터링 점수와 섞음)"""
+        if self.engine == "lsa" and getattr(index, 'lsa', None) is not None:
+            return self._score_lsa(index, user_profile, read_ids, top_n)
+
+        # 모든 논문과의 유사도 계산 (요청 중 색인이 바뀌어도 같은 스냅샷 사용)
+        blocks, paper_ids = index.snapshot()
+        similarities = score_blocks(blocks, user_profile)[0]
+
+        collaborative = None
+        if user_id is not None:
+            collaborative = self._collaborative_scores(index, [user_id], similarities.shape[0])
+        if collaborative is not None:
+            similarities = (1 - self.cf_weight) * similarities + self.cf_weight * collaborative.toarray()[0]
+
+        # 이미 읽은 논문 제외
+        read_rows = [index.row_of[pid] for pid in read_ids if pid in index.row_of]
+        read_rows = [row for row in read_rows if row < similarities.shape[0]]
+        similarities[read_rows] = -np.inf
+
+        # 상위 N개 반환 (유사도 내림차순)
+        rows = top_k(similarities, top_n)
+        rows = rows[np.isfinite(similarities[rows])]
+        return [(int(paper_ids[row]), float(similarities[row])) for row in rows]
+
+    def _score_lsa(
+        self,
+        index,
+        user_profile: sp.csr_matrix,
+        read_ids: List[int],
+        top_n: int
+    ) -> List[Tuple[int, float]]:
+        """프로필을 LSA 공간으로 사영해 임베딩 색인에서 검색 (nprobe > 0이면 IVF 근사 검색)"""
+        read_rows = np.array([index.row_of[pid] for pid in read_ids if pid in index.row_of], dtype=np.int64)
+        rows, scores = index.lsa.search(index.lsa.embed(user_profile), top_n, [read_rows], nprobe=self.nprobe)
+        valid = np.isfinite(scores[0])
+        return [(int(index.paper_ids[row]), float(score)) for row, score in zip(rows[0][valid], scores[0][valid])]
+
+    def recommend_indexed(
+        self,
+        user_read_papers: List[Dict],
+        top_n: int = 10,
+        user_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        사전 구축 색인의 전체 논문 중에서 추천 (요청마다 학습하지 않음)
+
+        Args:
+            user_read_papers: 사용자가 읽은 논문 리스트
+            top_n: 추천할 논문 개수
+            user_id: 협업 필터링 점수를 섞을 사용자 (없으면 TF-IDF 점수만)
 
-        # TF-IDF 벡터화
-        self.tfidf_matrix = self.vectorizer.fit_transform(texts)
+        Returns:
+            (논문 ID, 유사도 점수) 튜플 리스트, 유사도 내림차순 정렬
+        """
+        # 요청 처리 중 색인이 교체되어도 같은 버전을 끝까지 사용
+        index = self.index
+        if index is None or len(index.paper_ids) == 0:
+            raise RuntimeError("추천 색인이 아직 로드되지 않았습니다")
+        if not user_read_papers:
+            return []
+
+        return self._score(index, user_read_papers, top_n, user_id)
+
+    def recommend_profile(
+        self,
+        index,
+        user_profile: sp.csr_matrix,
+        read_ids: List[int],
+        top_n: int = 10,
+        user_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        저장된 사용자 프로필 벡터로 색인 전체에서 추천 (읽은 논문을 다시 변환하지 않음)
+
+        Args:
+            index: 프로필을 만든 것과 같은 버전의 색인
+            user_profile: L2 정규화된 프로필 벡터, 1 x F
+            read_ids: 추천에서 제외할 읽은 논문 ID
+            top_n: 추천할 논문 개수
+            user_id: 협업 필터링 점수를 섞을 사용자 (없으면 TF-IDF 점수만)
+
+        Returns:
+            (논문 ID, 유사도 점수) 튜플 리스트, 유사도 내림차순 정렬
+        """
+        if user_profile.nnz == 0 or len(index.paper_ids) == 0:
+            return []
+        return self._score_profile(index, user_profile, read_ids, top_n, user_id)
+
+    def recommend_neighbors(self, index, read_ids: List[int], top_n: int = 10) -> List[Tuple[int, float]]:
+        """
+        완료한 논문들의 미리 계산된 이웃 목록을 합쳐 추천 (색인 전체 점수 계산 없음)
+
+        Args:
+            index: 이웃 테이블이 있는 색인
+            read_ids: 완료한 논문 ID
+            top_n: 추천할 논문 개수
+
+        Returns:
+            (논문 ID, 평균 유사도 점수) 튜플 리스트, 점수 내림차순 정렬
+        """
+        read_rows = [index.row_of[pid] for pid in read_ids if pid in index.row_of]
+        rows, scores = index.neighbors.merge(read_rows, top_n)
+        return [(int(index.paper_ids[row]), float(score)) for row, score in zip(rows, scores)]
+
+    def similar(self, paper_id: int, top_n: int = 10) -> List[Tuple[int, float]]:
+        """
+        한 논문과 비슷한 논문 (이웃 테이블이 있으면 O(k) 조회, 없으면 색인 전체와 비교)
+
+        Args:
+            paper_id: 기준 논문 ID
+            top_n: 반환할 논문 개수
+
+        Returns:
+            (논문 ID, 유사도 점수) 튜플 리스트, 유사도 내림차순 정렬 (색인에 없는 논문이면 빈 리스트)
+        """
+        index = self.index
+        if index is None or paper_id not in index.row_of:
+            return []
+        row = index.row_of[paper_id]
+
+        neighbors = getattr(index, 'neighbors', None)
+        if neighbors is not None and row < neighbors.rows.shape[0] and top_n <= neighbors.k:
+            rows, scores = neighbors.neighbors_of(row, top_n)
+            return [(int(index.paper_ids[r]), float(score)) for r, score in zip(rows, scores)]
+
+        # 이웃 테이블이 없거나 더 많이 요청하면 해당 논문 벡터로 직접 계산
+        blocks, _ = index.snapshot()
+        for block in blocks:
+            if row < block.shape[0]:
+                return self._score_profile(index, block[row], [paper_id], top_n)
+            row -= block.shape[0]
+        return []
 
     def recommend(
         self,
@@ -94,40 +768,89 @@ class SurveyRecommender:
         if not all_papers:
             return []
 
-        # 전체 논문으로 모델 학습
-        self.fit(all_papers)
-
-        # 사용자가 읽은 논문들의 평균 벡터 계산
-        user_texts = [
-            self.prepare_text(
-                p.get('title', ''),
-                p.get('abstract', ''),
-                p.get('keywords', '')
-            )
-            for p in user_read_papers
-        ]
-
-        user_vectors = self.vectorizer.transform(user_texts)
-        user_profile = np.mean(user_vectors.toarray(), axis=0).reshape(1, -1)
-
-        # 모든 논문과의 유사도 계산
-        similarities = cosine_similarity(user_profile, self.tfidf_matrix)[0]
-
-        # 논문 ID와 유사도를 함께 저장
-        paper_similarities = list(zip(self.paper_ids, similarities))
+        # 후보 논문으로 요청 전용 색인 생성 (공유 색인은 건드리지 않음)
+        index = RecommenderIndex.build(all_papers)
+        return self._score(index, user_read_papers, top_n)
 
-        # 이미 읽은 논문 제외
-        read_paper_ids = {p['id'] for p in user_read_papers}
-        paper_similarities = [
-            (pid, sim) for pid, sim in paper_similarities
-            if pid not in read_paper_ids
-        ]
+    def recommend_many(
+        self,
+        user_profiles: Dict[Any, List[int]],
+        top_n: int = 10,
+        chunk_size: Optional[int] = None,
+        max_chunk_cells: int = 2 ** 24
+    ) -> Dict[Any, List[Tuple[int, float]]]:
+        """
+        여러 사용자를 한 번에 추천 (사용자 프로필을 하나의 희소 행렬로 쌓아 청크 단위로 곱함)
+        읽은 논문은 이미 색인에 있으므로 텍스트를 다시 변환하지 않고 색인 행의 평균을 프로필로 사용
 
-        # 유사도 내림차순 정렬
-        paper_similarities.sort(key=lambda x: x[1], reverse=True)
+        Args:
+            user_profiles: 사용자 → 읽은 논문 ID 리스트 (협업 필터링 모델이 있으면 키를 사용자 ID로 사용)
+            top_n: 사용자별 추천 개수
+            chunk_size: 한 번에 곱할 사용자 수 (기본: 점수/프로필 배열이 max_chunk_cells 이하가 되도록)
+            max_chunk_cells: 자동 청크 크기 계산 시 청크당 최대 배열 원소 수
 
-        # 상위 N개 반환
-        return paper_similarities[:top_n]
+        Returns:
+            사용자 → (논문 ID, 유사도 점수) 리스트 (읽은 논문 제외, 유사도 내림차순)
+        """
+        index = self.index
+        if index is None:
+            raise RuntimeError("추천 색인이 아직 로드되지 않았습니다")
+
+        blocks, paper_ids = index.snapshot()
+        n_papers = sum(block.shape[0] for block in blocks)
+        users = list(user_profiles)
+        results: Dict[Any, List[Tuple[int, float]]] = {user: [] for user in users}
+        if not users or n_papers == 0:
+            return results
+
+        # 사용자 x 논문 읽음 행렬 (행마다 1/읽은 수 → 곱하면 평균 프로필)
+        user_rows, paper_rows = [], []
+        for i, user in enumerate(users):
+            rows = {index.row_of[pid] for pid in user_profiles[user] if pid in index.row_of}
+            rows = [row for row in rows if row < n_papers]
+            user_rows.extend([i] * len(rows))
+            paper_rows.extend(rows)
+        user_rows = np.asarray(user_rows, dtype=np.int64)
+        paper_rows = np.asarray(paper_rows, dtype=np.int64)
+        read_counts = np.bincount(user_rows, minlength=len(users))
+        weights = 1.0 / np.maximum(read_counts[user_rows], 1)
+        read_matrix = sp.csr_matrix((weights, (user_rows, paper_rows)), shape=(len(users), n_papers))
+
+        profile_parts, offset = [], 0
+        for block in blocks:
+            profile_parts.append(read_matrix[:, offset:offset + block.shape[0]] @ block)
+            offset += block.shape[0]
+        profiles = normalize(sum(profile_parts[1:], profile_parts[0]).tocsr(), norm='l2')
+
+        if chunk_size is None:
+            chunk_size = max(1, max_chunk_cells // (n_papers + profiles.shape[1]))
+
+        # 사용자 키를 사용자 ID로 보고 협업 필터링 점수를 한 번에 계산
+        collaborative = self._collaborative_scores(index, users, n_papers)
+
+        paper_id_array = np.asarray(paper_ids)
+        for start in range(0, len(users), chunk_size):
+            end = min(start + chunk_size, len(users))
+            scores = score_blocks(blocks, profiles[start:end])
+            if collaborative is not None:
+                scores = (1 - self.cf_weight) * scores + self.cf_weight * collaborative[start:end].toarray()
+
+            # 읽은 논문 제외 (청크 안의 (사용자, 논문) 위치를 한 번에 마스킹)
+            in_chunk = (user_rows >= start) & (user_rows < end)
+            scores[user_rows[in_chunk] - start, paper_rows[in_chunk]] = -np.inf
+
+            top_rows = top_k_rows(scores, top_n)
+            top_scores = np.take_along_axis(scores, top_rows, axis=1)
+            for i in range(end - start):
+                if read_counts[start + i] == 0:
+                    continue
+                valid = np.isfinite(top_scores[i])
+                results[users[start + i]] = list(zip(
+                    paper_id_array[top_rows[i][valid]].tolist(),
+                    top_scores[i][valid].tolist()
+                ))
+
+        return results
 
     def recommend_by_interest(
         self,
@@ -149,51 +872,41 @@ class SurveyRecommender:
         if not interest_fields or not all_papers:
             return []
 
-        # 전체 논문으로 모델 학습
-        self.fit(all_papers)
+        # 후보 논문으로 요청 전용 색인 생성
+        index = RecommenderIndex.build(all_papers)
 
         # 관심 분야를 하나의 텍스트로 결합
         interest_text = " ".join(interest_fields)
 
-        # 관심 분야 벡터화
-        interest_vector = self.vectorizer.transform([interest_text])
+        # 관심 분야 벡터화 (TfidfVectorizer 출력은 이미 L2 정규화됨)
+        interest_vector = index.vectorizer.transform([interest_text])
 
         # 모든 논문과의 유사도 계산
-        similarities = cosine_similarity(interest_vector, self.tfidf_matrix)[0]
-
-        # 논문 ID와 유사도 결합
-        paper_similarities = list(zip(self.paper_ids, similarities))
-
-        # 유사도 내림차순 정렬
-        paper_similarities.sort(key=lambda x: x[1], reverse=True)
+        blocks, paper_ids = index.snapshot()
+        similarities = score_blocks(blocks, interest_vector)[0]
 
-        return paper_similarities[:top_n]
+        # 유사도 상위 N개
+        return [(int(paper_ids[row]), float(similarities[row])) for row in top_k(similarities, top_n)]
 
     def save_model(self, filepath: str) -> None:
         """
-        학습된 모델을 파일로 저장
+        현재 색인을 파일로 저장
 
         Args:
             filepath: 저장할 파일 경로
         """
-        model_data = {
-            'vectorizer': self.vectorizer,
-            'tfidf_matrix': self.tfidf_matrix,
-            'paper_ids': self.paper_ids
-        }
-        joblib.dump(model_data, filepath)
+        if self.index is None:
+            raise RuntimeError("저장할 색인이 없습니다")
+        self.index.save(filepath)
 
     def load_model(self, filepath: str) -> None:
         """
-        저장된 모델 로드
+        저장된 색인을 불러와 교체
 
         Args:
-            filepath: 모델 파일 경로
+            filepath: 모델 파일 경로 (joblib) 또는 mmap 색인 디렉토리
         """
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"모델 파일을 찾을 수 없습니다: {filepath}")
-
-        model_data = joblib.load(filepath)
-        self.vectorizer = model_data['vectorizer']
-        self.tfidf_matrix = model_data['tfidf_matrix']
-        self.paper_ids = model_data['paper_ids']
+        if os.path.isdir(filepath):
+            self.index = RecommenderIndex.load_mapped(filepath)
+        else:
+            self.index = RecommenderIndex.load(filepath)
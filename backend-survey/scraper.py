@@ -1,56 +1,82 @@
-import arxiv
-import time
+import os
+from datetime import datetime
 from typing import List, Dict
 
+from arxiv_client import AsyncArxivClient, AsyncRateLimiter, ARXIV_API_URL
+from search_cache import PartialResults, normalize_query
+from arxiv_transport import transport_from_env
+
 class ArxivScraper:
-    def __init__(self):
-        # ArXiv API rate limit: 3초당 1요청 권장
-        self.client = arxiv.Client(
+    def __init__(self, rate_limiter=None, cache=None, transport=None):
+        """
+        Args:
+            rate_limiter: 페이지 요청마다 acquire(priority)를 호출할 limiter
+                          (여러 워커가 한도를 공유하려면 rate_limiter.RedisTokenBucket 사용)
+            cache: 검색 결과 캐시 (search_cache.SearchResultCache), 없으면 매번 ArXiv 조회
+            transport: ArXiv 요청에 사용할 httpx 트랜스포트 (fixture 재생 등)
+                       없으면 ARXIV_TRANSPORT_MODE에 따라 기록/재생 트랜스포트 사용
+        """
+        self.cache = cache
+        # ArXiv API rate limit: 3초당 1요청 권장 (모든 검색이 하나의 limiter를 공유)
+        self.client = AsyncArxivClient(
+            base_url=os.getenv("ARXIV_API_URL", ARXIV_API_URL),
             page_size=100,
-            delay_seconds=3.0,  # 요청 간 3초 대기
-            num_retries=3  # 실패 시 3번 재시도
+            rate_limiter=rate_limiter or AsyncRateLimiter(min_interval=3.0),  # 요청 간 3초 간격
+            num_retries=3,  # 실패 시 3번 재시도
+            transport=transport or transport_from_env()
         )
-        self.last_request_time = 0
-
-    def search_surveys(self, query: str, max_results: int = 500) -> List[Dict]:
-        """ArXiv에서 survey 논문 검색 (연관성 순) - 제목에 검색어가 포함된 논문만 반환"""
-        # Rate limit 체크 및 대기
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 3.0:
-            time.sleep(3.0 - time_since_last)
 
-        self.last_request_time = time.time()
+    async def start(self) -> None:
+        await self.client.start()
 
-        # 제목에 검색어(정확한 문구) AND (comprehensive OR survey OR "a review") 포함
-        search = arxiv.Search(
-            query=f'ti:"{query}" AND (ti:comprehensive OR ti:survey OR ti:"a review")',
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
-        )
+    async def close(self) -> None:
+        await self.client.close()
 
-        # ArXiv에서 논문 정보 수집
+    async def _collect(
+        self, query: str, max_results: int, sort_by: str, label: str, priority: str = "interactive"
+    ) -> List[Dict]:
+        """
+        검색 결과를 모두 모아 반환
+        일부 페이지가 실패하면 받은 결과까지를 PartialResults로 반환 (캐시가 완전한 결과로 저장하지 않도록)
+        """
         results = []
         try:
-            for paper in self.client.results(search):
-                arxiv_id = paper.entry_id.split("/")[-1]
-                results.append({
-                    "arxiv_id": arxiv_id,
-                    "title": paper.title,
-                    "abstract": paper.summary,
-                    "authors": ", ".join([author.name for author in paper.authors]),
-                    "published_date": paper.published.date(),
-                    "pdf_url": paper.pdf_url,
-                    "categories": ", ".join(paper.categories),
-                })
+            async for record in self.client.results(query, max_results, sort_by=sort_by, priority=priority):
+                results.append(record)
         except Exception as e:
-            print(f"Error searching ArXiv: {e}")
+            print(f"Error {label}: {e}")
             if not results:
                 raise
+            return PartialResults(results)
 
         return results
+
+    async def _search(
+        self, namespace: str, query: str, max_results: int, sort_by: str, label: str, priority: str
+    ) -> List[Dict]:
+        """캐시를 거쳐 검색 (캐시가 없으면 바로 ArXiv 조회)"""
+        async def fetch(fetch_priority: str) -> List[Dict]:
+            return await self._collect(query, max_results, sort_by, label, fetch_priority)
+
+        if self.cache is None:
+            return await fetch(priority)
+        return await self.cache.get_or_fetch(namespace, query, max_results, fetch, priority)
+
+    async def search_surveys(self, query: str, max_results: int = 500, priority: str = "interactive") -> List[Dict]:
+        """ArXiv에서 survey 논문 검색 (연관성 순) - 제목에 검색어가 포함된 논문만 반환"""
+        # 제목에 검색어(정확한 문구) AND (comprehensive OR survey OR "a review") 포함
+        return await self._search(
+            "surveys",
+            f'ti:"{normalize_query(query)}" AND (ti:comprehensive OR ti:survey OR ti:"a review")',
+            max_results,
+            "relevance",
+            "searching ArXiv",
+            priority
+        )
     
-    def search_by_category(self, categories: List[str], max_results: int = 10) -> List[Dict]:
+    async def search_by_category(
+        self, categories: List[str], max_results: int = 10, priority: str = "interactive"
+    ) -> List[Dict]:
         """카테고리별 검색"""
         category_map = {
             # Core ML/DL
@@ -164,54 +190,38 @@ class ArxivScraper:
             "AI": "cs.AI"
         }
 
-        cat_queries = [category_map.get(cat, "cs.AI") for cat in categories]
+        cat_queries = sorted(set(category_map.get(cat, "cs.AI") for cat in categories))
         query = " OR ".join([f"cat:{cat}" for cat in cat_queries])
 
-        search = arxiv.Search(
-            query=f"({query}) AND (survey OR review)",
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate
+        return await self._search(
+            "category",
+            f"({query}) AND (survey OR review)",
+            max_results,
+            "submittedDate",
+            "searching ArXiv by category",
+            priority
         )
 
-        results = []
-        for paper in self.client.results(search):
-            results.append({
-                "arxiv_id": paper.entry_id.split("/")[-1],
-                "title": paper.title,
-                "abstract": paper.summary,
-                "authors": ", ".join([author.name for author in paper.authors]),
-                "published_date": paper.published.date(),
-                "pdf_url": paper.pdf_url,
-                "categories": ", ".join(paper.categories),
-            })
-
-        return results
-
-    def search_ai_ml_surveys(self, keywords: List[str], max_results: int = 1000) -> List[Dict]:
+    async def search_ai_ml_surveys(
+        self, keywords: List[str], max_results: int = 1000, priority: str = "interactive"
+    ) -> List[Dict]:
         """
         AI/ML 분야 survey 논문 전문 검색
 
         Args:
             keywords: 검색 키워드 리스트
             max_results: 최대 결과 수
+            priority: rate limiter 우선순위 (interactive / background)
 
         Returns:
             논문 정보 딕셔너리 리스트
         """
-        # Rate limit 체크 및 대기
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 3.0:
-            time.sleep(3.0 - time_since_last)
-
-        self.last_request_time = time.time()
-
         # AI/ML 관련 카테고리
         ai_categories = ["cs.AI", "cs.LG", "cs.CV", "cs.CL", "cs.NE", "stat.ML"]
         category_query = " OR ".join([f"cat:{cat}" for cat in ai_categories])
 
         # 키워드 쿼리 생성
-        keyword_query = " AND ".join(keywords) if keywords else ""
+        keyword_query = " AND ".join(sorted(set(normalize_query(k) for k in keywords))) if keywords else ""
 
         # 최종 쿼리: (AI/ML 카테고리) AND (키워드) AND (survey/review)
         if keyword_query:
@@ -219,34 +229,13 @@ class ArxivScraper:
         else:
             final_query = f"({category_query}) AND (survey OR review)"
 
-        search = arxiv.Search(
-            query=final_query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
+        return await self._search(
+            "ai_ml", final_query, max_results, "relevance", "searching AI/ML surveys", priority
         )
 
-        # ArXiv에서 논문 정보 수집
-        results = []
-        try:
-            for paper in self.client.results(search):
-                arxiv_id = paper.entry_id.split("/")[-1]
-                results.append({
-                    "arxiv_id": arxiv_id,
-                    "title": paper.title,
-                    "abstract": paper.summary,
-                    "authors": ", ".join([author.name for author in paper.authors]),
-                    "published_date": paper.published.date(),
-                    "pdf_url": paper.pdf_url,
-                    "categories": ", ".join(paper.categories),
-                })
-        except Exception as e:
-            print(f"Error searching AI/ML surveys: {e}")
-            if not results:
-                raise
-
-        return results
-
-    def search_ml_surveys_for_recommendation(self, max_results: int = 500) -> List[Dict]:
+    async def search_ml_surveys_for_recommendation(
+        self, max_results: int = 500, priority: str = "interactive"
+    ) -> List[Dict]:
         """
         추천 시스템용 ML/DL Survey 논문 검색
         초록에 'deep learning' 또는 'machine learning' 포함
@@ -254,46 +243,72 @@ class ArxivScraper:
 
         Args:
             max_results: 최대 결과 수
+            priority: rate limiter 우선순위 (interactive / background)
 
         Returns:
             논문 정보 딕셔너리 리스트
         """
-        # Rate limit 체크 및 대기
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 3.0:
-            time.sleep(3.0 - time_since_last)
-
-        self.last_request_time = time.time()
-
         # 초록에 deep learning OR machine learning
         # AND 제목에 survey OR comprehensive OR "a review"
-        search = arxiv.Search(
-            query='(abs:"deep learning" OR abs:"machine learning") AND (ti:survey OR ti:comprehensive OR ti:"a review")',
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
+        return await self._search(
+            "recommendation",
+            '(abs:"deep learning" OR abs:"machine learning") AND (ti:survey OR ti:comprehensive OR ti:"a review")',
+            max_results,
+            "relevance",
+            "searching ML surveys for recommendation",
+            priority
         )
 
-        # ArXiv에서 논문 정보 수집
-        results = []
-        try:
-            for paper in self.client.results(search):
-                arxiv_id = paper.entry_id.split("/")[-1]
-                results.append({
-                    "arxiv_id": arxiv_id,
-                    "title": paper.title,
-                    "abstract": paper.summary,
-                    "authors": ", ".join([author.name for author in paper.authors]),
-                    "published_date": paper.published.date(),
-                    "pdf_url": paper.pdf_url,
-                    "categories": ", ".join(paper.categories),
-                })
-        except Exception as e:
-            print(f"Error searching ML surveys for recommendation: {e}")
-            if not results:
-                raise
+    @staticmethod
+    def _submitted_between_query(query: str, start: datetime, end: datetime) -> str:
+        return f"({query}) AND submittedDate:[{start:%Y%m%d%H%M} TO {end:%Y%m%d%H%M}]"
+
+    async def count_submitted_between(
+        self, query: str, start: datetime, end: datetime, priority: str = "background"
+    ) -> int:
+        """제출일 구간의 전체 결과 수 (결과 1개짜리 페이지 하나만 요청)"""
+        _, total_results = await self.client.fetch_page(
+            self._submitted_between_query(query, start, end),
+            0,
+            1,
+            sort_by="submittedDate",
+            sort_order="ascending",
+            priority=priority
+        )
+        return total_results
+
+    async def search_submitted_between(
+        self,
+        query: str,
+        start: datetime,
+        end: datetime,
+        max_results: int = 1000,
+        priority: str = "background"
+    ) -> List[Dict]:
+        """
+        제출일(submittedDate) 구간 검색 (수집 작업용, 캐시 사용 안 함)
+        일부 페이지가 실패하면 예외를 그대로 올려 구간 전체를 다시 수집하도록 함
 
-        return results
+        Args:
+            query: 검색 쿼리
+            start: 구간 시작 (포함)
+            end: 구간 끝 (포함)
+            max_results: 최대 결과 수
+            priority: rate limiter 우선순위
+
+        Returns:
+            제출일 오름차순 논문 정보 딕셔너리 리스트
+        """
+        return [
+            record
+            async for record in self.client.results(
+                self._submitted_between_query(query, start, end),
+                max_results,
+                sort_by="submittedDate",
+                sort_order="ascending",
+                priority=priority
+            )
+        ]
 
     def estimate_reading_time(self, abstract: str) -> Dict[str, int]:
         """
@@ -0,0 +1,219 @@
+"""
+ArXiv 검색 결과 캐시
+정규화한 검색어와 max_results를 키로 결과 레코드 리스트를 Redis에 압축 저장한다.
+신선 기간(fresh_ttl)이 지난 항목도 보관 기간(stale_ttl) 동안은 그대로 응답하고,
+분산 락으로 하나의 백그라운드 갱신만 실행한다 (stale-while-revalidate).
+일부 페이지만 받은 결과(PartialResults)는 이미 신선 기간이 지난 것으로 저장해 다음 조회 때 다시 갱신한다.
+"""
+import asyncio
+import hashlib
+import json
+import secrets
+import struct
+import time
+import zlib
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+# 레코드를 키 이름 없이 고정 순서의 리스트로 저장
+RECORD_FIELDS = ["arxiv_id", "title", "abstract", "authors", "published_date", "pdf_url", "categories"]
+HEADER = struct.Struct("!d")  # 조회 시각 (epoch seconds)
+
+# 락 값이 내 토큰일 때만 삭제 (만료 후 다른 워커가 잡은 락을 지우지 않도록)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class PartialResults(list):
+    """일부 페이지 요청이 실패해 앞쪽 결과만 담긴 검색 결과"""
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/공백 차이를 무시한 검색어"""
+    return " ".join(query.lower().split())
+
+
+def encode_records(records: List[Dict], fetched_at: float) -> bytes:
+    rows = []
+    for record in records:
+        row = [record.get(field) for field in RECORD_FIELDS]
+        published = record.get("published_date")
+        row[4] = published.isoformat() if published else None
+        rows.append(row)
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
+    return HEADER.pack(fetched_at) + zlib.compress(payload)
+
+
+def decode_records(raw: bytes):
+    (fetched_at,) = HEADER.unpack_from(raw)
+    rows = json.loads(zlib.decompress(raw[HEADER.size:]))
+    records = []
+    for row in rows:
+        record = dict(zip(RECORD_FIELDS, row))
+        if record["published_date"]:
+            record["published_date"] = date.fromisoformat(record["published_date"])
+        records.append(record)
+    return fetched_at, records
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str = "arxiv:search",
+        fresh_ttl: int = 60 * 60,
+        stale_ttl: int = 60 * 60 * 24,
+        lock_ttl: int = 300
+    ):
+        """
+        Args:
+            redis_url: Redis 주소
+            prefix: 캐시 키 접두사
+            fresh_ttl: 이 시간(초) 안의 결과는 그대로 반환
+            stale_ttl: fresh_ttl 이후에도 이 시간(초)까지는 반환하면서 백그라운드 갱신
+            lock_ttl: 갱신 락 유지 시간 (초)
+        """
+        self.redis = aioredis.from_url(redis_url)
+        self.prefix = prefix
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def make_key(self, namespace: str, query: str, max_results: int) -> str:
+        digest = hashlib.sha1(f"{normalize_query(query)}|{max_results}".encode()).hexdigest()
+        return f"{self.prefix}:{namespace}:{digest}"
+
+    async def _store(self, key: str, records: List[Dict]) -> None:
+        fetched_at = time.time()
+        if isinstance(records, PartialResults):
+            # 잘린 결과는 바로 stale로 취급되도록 저장 (다음 조회가 응답은 하면서 갱신 시작)
+            fetched_at -= self.fresh_ttl
+        try:
+            await self.redis.set(key, encode_records(records, fetched_at), ex=self.fresh_ttl + self.stale_ttl)
+        except RedisError as e:
+            self.errors += 1
+            print(f"Search cache write failed: {e}")
+
+    async def _fetch_and_store(
+        self, key: str, fetch: Callable[[str], Awaitable[List[Dict]]], priority: str, keep_partial: bool = True
+    ) -> List[Dict]:
+        """
+        조회 후 저장
+
+        Args:
+            keep_partial: 일부만 받은 결과도 (stale로) 저장할지 여부
+                          (갱신 중에는 기존의 완전한 결과를 잘린 결과로 덮어쓰지 않도록 False)
+        """
+        records = await fetch(priority)
+        if keep_partial or not isinstance(records, PartialResults):
+            await self._store(key, records)
+        return records
+
+    async def _refresh(self, key: str, fetch: Callable[[str], Awaitable[List[Dict]]]) -> None:
+        lock_key = f"{key}:refresh"
+        token = secrets.token_hex(16).encode()
+        try:
+            # 여러 워커 중 하나만 갱신 (락을 잡지 못했으면 해제도 하지 않음)
+            if not await self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl):
+                return
+        except RedisError as e:
+            self.errors += 1
+            print(f"Search cache refresh lock failed: {e}")
+            return
+
+        try:
+            self.refreshes += 1
+            records = await self._fetch_and_store(key, fetch, "background", keep_partial=False)
+            if isinstance(records, PartialResults):
+                print(f"Search cache refresh got partial results ({len(records)}), keeping cached entry")
+        except Exception as e:
+            self.errors += 1
+            print(f"Search cache refresh failed: {e}")
+        finally:
+            try:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except RedisError:
+                pass
+
+    async def get_or_fetch(
+        self,
+        namespace: str,
+        query: str,
+        max_results: int,
+        fetch: Callable[[str], Awaitable[List[Dict]]],
+        priority: str = "interactive"
+    ) -> List[Dict]:
+        """
+        캐시된 결과 반환, 없으면 fetch(priority)로 조회 후 저장
+
+        Args:
+            namespace: 검색 종류 (같은 검색어라도 검색 방식이 다르면 다른 키)
+            query: 검색어 (정규화하여 키 생성)
+            max_results: 최대 결과 수
+            fetch: 우선순위를 받아 ArXiv를 조회하는 코루틴 함수 (일부만 받았으면 PartialResults 반환)
+            priority: 캐시 미스 시 조회 우선순위
+        """
+        key = self.make_key(namespace, query, max_results)
+
+        raw: Optional[bytes] = None
+        try:
+            raw = await self.redis.get(key)
+        except RedisError as e:
+            self.errors += 1
+            print(f"Search cache read failed: {e}")
+
+        if raw is not None:
+            fetched_at, records = decode_records(raw)
+            if time.time() - fetched_at < self.fresh_ttl:
+                self.hits += 1
+                return records
+
+            self.stale_hits += 1
+            # 이 프로세스에서 같은 키를 이미 갱신 중이면 새 갱신(과 락 시도)을 만들지 않음
+            if key not in self._inflight and key not in self._refresh_tasks:
+                task = asyncio.create_task(self._refresh(key, fetch))
+                self._refresh_tasks[key] = task
+                task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+            return records
+
+        self.misses += 1
+
+        # 같은 프로세스에서 동시에 들어온 같은 검색은 한 번만 조회
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, fetch, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def close(self) -> None:
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        await self.redis.close()
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "background_refreshes": self.refreshes,
+            "errors": self.errors,
+            "fresh_ttl_seconds": self.fresh_ttl,
+            "stale_ttl_seconds": self.stale_ttl
+        }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서비스 모듈은 backend-survey 디렉토리에 평평하게 있으므로 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+import asyncio
+import glob
+import gzip
+import os
+
+import httpx
+
+from arxiv_transport import RecordReplayTransport
+
+ATOM = b'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+URL = "http://export.arxiv.org/api/query?search_query=all:survey&start=0&max_results=10"
+
+
+def gzip_upstream(request: httpx.Request) -> httpx.Response:
+    body = gzip.compress(ATOM)
+    return httpx.Response(
+        200,
+        content=body,
+        headers={
+            "Content-Type": "application/atom+xml; charset=utf-8",
+            "Content-Encoding": "gzip",
+            "Content-Length": str(len(body))
+        }
+    )
+
+
+def test_record_mode_with_gzip_upstream(tmp_path):
+    async def run():
+        transport = RecordReplayTransport("record", str(tmp_path), inner=httpx.MockTransport(gzip_upstream))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get(URL)
+        return response, transport
+
+    response, transport = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.content == ATOM
+    assert "content-encoding" not in response.headers
+    assert transport.recorded == 1
+    assert len(glob.glob(os.path.join(str(tmp_path), "*", "*.xml.gz"))) == 1
+
+
+def test_replay_returns_recorded_body(tmp_path):
+    async def run():
+        recorder = RecordReplayTransport("record", str(tmp_path), inner=httpx.MockTransport(gzip_upstream))
+        async with httpx.AsyncClient(transport=recorder) as client:
+            await client.get(URL)
+
+        replayer = RecordReplayTransport("replay", str(tmp_path))
+        async with httpx.AsyncClient(transport=replayer) as client:
+            return await client.get(URL)
+
+    assert asyncio.run(run()).content == ATOM
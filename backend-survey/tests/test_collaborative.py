@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+
+from collaborative import CooccurrenceModel
+
+
+def random_interactions(rng, count, users=30, items=80):
+    return [
+        (rng.randrange(users), rng.randrange(items), rng.choice([1.0, 2.0, 3.0]))
+        for _ in range(count)
+    ]
+
+
+def dense_by_item(model, matrix=None):
+    """논문 ID 기준으로 정렬한 동시 출현 행렬 (열 순서가 다른 두 모델을 비교하기 위해)"""
+    matrix = (model.matrix() if matrix is None else matrix).toarray()
+    order = np.argsort(model.item_ids)
+    return np.array(model.item_ids)[order], matrix[np.ix_(order, order)]
+
+
+def assert_same_cooccurrence(incremental, rebuilt):
+    ids, matrix = dense_by_item(incremental)
+    rebuilt_ids, rebuilt_matrix = dense_by_item(rebuilt)
+    # 모든 가중치가 빠진 논문은 증분 모델에만 (빈 열로) 남음
+    present = np.isin(ids, rebuilt_ids)
+    assert not matrix[~present].any() and not matrix[:, ~present].any()
+    np.testing.assert_allclose(matrix[np.ix_(present, present)], rebuilt_matrix, atol=1e-9)
+
+
+def apply_updates(model, state, updates, fold_every=None):
+    for i, (user_id, survey_id, weight) in enumerate(updates):
+        model.set_weight(user_id, survey_id, weight)
+        state[(user_id, survey_id)] = weight
+        if fold_every and i % fold_every == 0:
+            model.fold()
+
+
+def rebuild(state):
+    return CooccurrenceModel.build((user_id, survey_id, w) for (user_id, survey_id), w in state.items())
+
+
+def test_set_weight_and_fold_match_build():
+    rng = random.Random(1)
+    initial = random_interactions(rng, 300)
+    model = CooccurrenceModel.build(initial)
+    state = {(user_id, survey_id): w for user_id, survey_id, w in initial}
+
+    # 새 사용자/새 논문, 가중치 변경과 삭제(0)를 섞어서 적용
+    updates = [
+        (rng.randrange(40), rng.randrange(100), rng.choice([0.0, 1.0, 2.0, 3.0]))
+        for _ in range(400)
+    ]
+    apply_updates(model, state, updates, fold_every=37)
+    assert_same_cooccurrence(model, rebuild(state))
+
+    model.fold()
+    assert model.stats()["pending_updates"] == 0
+    assert_same_cooccurrence(model, rebuild(state))
+
+
+def test_removing_every_weight_empties_matrix():
+    rng = random.Random(2)
+    initial = random_interactions(rng, 100)
+    model = CooccurrenceModel.build(initial)
+    for user_id, survey_id, _ in initial:
+        model.set_weight(user_id, survey_id, 0.0)
+
+    assert not model.matrix().toarray().any()
+    model.fold()
+    assert model.stats()["cooccurrence_nnz"] == 0
+
+
+def test_score_users_with_pending_updates_matches_rebuild():
+    rng = random.Random(3)
+    initial = random_interactions(rng, 300)
+    model = CooccurrenceModel.build(initial)
+    state = {(user_id, survey_id): w for user_id, survey_id, w in initial}
+    apply_updates(model, state, random_interactions(rng, 200, users=35, items=90))
+    assert model.stats()["pending_updates"] > 0
+
+    users = list(range(35))
+    scores, item_ids = model.score_users(users)
+    base_before = model._base
+    rebuilt_scores, rebuilt_ids = rebuild(state).score_users(users)
+
+    # 점수 계산은 대기 중인 변화량을 기준 행렬에 합치지 않음
+    assert model._base is base_before
+    assert model.stats()["pending_updates"] > 0
+
+    def by_item(matrix, ids):
+        dense = dict(zip(ids.tolist(), matrix.toarray().T))
+        return {survey_id: column for survey_id, column in dense.items() if column.any()}
+
+    expected = by_item(rebuilt_scores, rebuilt_ids)
+    actual = by_item(scores, item_ids)
+    assert actual.keys() == expected.keys()
+    for survey_id, column in expected.items():
+        np.testing.assert_allclose(actual[survey_id], column, atol=1e-9)
+
+    model.fold()
+    folded_scores, folded_ids = model.score_users(users)
+    np.testing.assert_array_equal(folded_ids, item_ids)
+    np.testing.assert_allclose(folded_scores.toarray(), scores.toarray(), atol=1e-9)
@@ -0,0 +1,102 @@
+import types
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+import profiles
+from profiles import UserProfileStore
+
+fakeredis = pytest.importorskip("fakeredis")
+
+DAY = 86400.0
+VERSION = "test-version"
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1_700_000_000.0)
+    monkeypatch.setattr(profiles, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+def make_store(half_life_days: float) -> UserProfileStore:
+    store = UserProfileStore("redis://localhost:6379/0", half_life_days=half_life_days)
+    store.redis = fakeredis.FakeRedis()
+    return store
+
+
+def paper_vectors(count: int, n_features: int = 50, seed: int = 0) -> sp.csr_matrix:
+    matrix = sp.random(count, n_features, density=0.2, random_state=seed, format="csr")
+    return normalize(matrix, norm="l2")
+
+
+def assert_same_profile(actual, expected):
+    np.testing.assert_allclose(actual.vector_sum.toarray(), expected.vector_sum.toarray(), atol=1e-5)
+    assert actual.weight == pytest.approx(expected.weight, abs=1e-6)
+    assert actual.papers == expected.papers
+
+
+@pytest.mark.parametrize("half_life_days", [0.0, 30.0])
+def test_add_then_remove_restores_profile(clock, half_life_days):
+    store = make_store(half_life_days)
+    vectors = paper_vectors(4)
+    completed_at = [clock.now - 40 * DAY, clock.now - 10 * DAY, clock.now - DAY]
+    store.build(1, vectors[:3], completed_at, VERSION)
+
+    clock.now += 5 * DAY
+    assert store.update(1, vectors[3], VERSION, clock.now)
+    clock.now += 2 * DAY
+    assert store.update(1, vectors[3], VERSION, clock.now - 2 * DAY, sign=-1)
+
+    # 빼고 나면 처음 세 논문만으로 지금 시각에 계산한 프로필과 같아야 함
+    assert_same_profile(store.get(1), store.compute(vectors[:3], completed_at, VERSION))
+
+
+def test_decayed_updates_match_compute(clock):
+    store = make_store(half_life_days=14.0)
+    vectors = paper_vectors(6, seed=1)
+    completed_at = []
+
+    start = clock.now
+    store.build(1, vectors[:2], [start - 20 * DAY, start - 3 * DAY], VERSION)
+    completed_at.extend([start - 20 * DAY, start - 3 * DAY])
+
+    for row in range(2, 6):
+        clock.now += (row + 1) * DAY
+        # 완료 시각이 갱신 시각보다 이전인 경우도 포함
+        done = clock.now - row * 3600
+        assert store.update(1, vectors[row], VERSION, done)
+        completed_at.append(done)
+
+    clock.now += 7 * DAY
+    expected = store.compute(vectors, completed_at, VERSION)
+    profile = store.get(1)
+    # 저장된 합을 지금 시각까지 감쇠시키면 전체를 다시 계산한 것과 같음
+    carried = store.decay(clock.now - profile.updated_at)
+    np.testing.assert_allclose(
+        profile.vector_sum.toarray() * carried, expected.vector_sum.toarray(), atol=1e-5
+    )
+    assert profile.weight * carried == pytest.approx(expected.weight, rel=1e-6)
+    assert profile.papers == expected.papers
+
+    # 정규화한 프로필 방향은 감쇠 시점과 무관
+    np.testing.assert_allclose(profile.vector().toarray(), expected.vector().toarray(), atol=1e-5)
+
+
+def test_update_with_other_index_version_drops_profile(clock):
+    store = make_store(half_life_days=0.0)
+    vectors = paper_vectors(2)
+    store.build(1, vectors[:1], [clock.now], VERSION)
+
+    assert not store.update(1, vectors[1], "other-version", clock.now)
+    assert store.get(1) is None
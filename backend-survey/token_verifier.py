@@ -0,0 +1,177 @@
+"""
+토큰 검증 모듈
+Auth 서비스와 동일한 방식(HS256 JWT)으로 토큰을 로컬에서 검증하고,
+공유 Redis의 세션 키로 로그인 상태를 확인한다.
+검증 결과는 프로세스 내 TTL 캐시에 보관하며, 로그아웃 시 Auth 서비스가 발행하는
+pub/sub 메시지를 받아 캐시에서 즉시 제거한다.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import redis.asyncio as aioredis
+from jose import JWTError, jwt
+
+
+def session_id(token: str) -> str:
+    """토큰 → 세션 ID (backend-auth sessions.session_id와 동일)"""
+    digest = hashlib.sha256(token.encode()).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        redis_url: str,
+        secret_key: str,
+        algorithm: str = "HS256",
+        cache_ttl: float = 30.0,
+        max_entries: int = 10000,
+        revoke_channel: str = "session:revoked"
+    ):
+        """
+        Args:
+            redis_url: 세션이 저장된 Redis 주소 (Auth 서비스와 공유)
+            secret_key: JWT 서명 키 (Auth 서비스의 SECRET_KEY와 동일해야 함)
+            algorithm: JWT 알고리즘
+            cache_ttl: 검증 결과 캐시 유지 시간 (초)
+            max_entries: 캐시 최대 항목 수 (초과 시 오래된 항목부터 제거)
+            revoke_channel: 로그아웃 알림을 받을 pub/sub 채널
+        """
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.revoke_channel = revoke_channel
+
+        # sid -> (만료 시각(monotonic), 사용자 정보)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._listener_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def _decode(self, token: str) -> Optional[Dict]:
+        """JWT 서명 및 만료 검증 (backend-auth utils.decode_access_token과 동일한 방식)"""
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+
+        if payload.get("sub") is None:
+            return None
+        return payload
+
+    def _store(self, sid: str, user_data: Dict, expires_at: float) -> None:
+        self._cache[sid] = (expires_at, user_data)
+        self._cache.move_to_end(sid)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def verify(self, token: str) -> Optional[Dict]:
+        """
+        토큰 검증
+
+        Args:
+            token: Bearer 토큰
+
+        Returns:
+            유효하면 {"valid", "user_id", "username"} 딕셔너리, 아니면 None
+
+        Raises:
+            redis.exceptions.RedisError: 캐시 미스 상태에서 Redis에 접근할 수 없을 때
+        """
+        now = time.monotonic()
+        sid = session_id(token)
+        entry = self._cache.get(sid)
+        if entry is not None:
+            if entry[0] > now:
+                self._cache.move_to_end(sid)
+                self.hits += 1
+                return entry[1]
+            self._cache.pop(sid, None)
+
+        self.misses += 1
+
+        payload = self._decode(token)
+        if payload is None:
+            return None
+
+        # Redis에서 세션 확인 (로그아웃된 토큰 거부)
+        session = await self.redis.hgetall(f"sess:{sid}")
+        if session:
+            user_id, username = int(session["u"]), session["n"]
+        else:
+            # 이전 형식 세션 (session:{토큰 전체} → JSON)
+            legacy = await self.redis.get(f"session:{token}")
+            if not legacy:
+                return None
+            legacy = json.loads(legacy)
+            user_id, username = legacy["user_id"], legacy["username"]
+
+        if username != payload["sub"]:
+            return None
+
+        user_data = {
+            "valid": True,
+            "user_id": user_id,
+            "username": username
+        }
+
+        # 토큰 만료 시각을 넘겨서 캐시하지 않음
+        ttl = min(self.cache_ttl, payload.get("exp", 0) - time.time())
+        if ttl > 0:
+            self._store(sid, user_data, now + ttl)
+
+        return user_data
+
+    def revoke(self, sid: str) -> None:
+        """캐시에서 세션 제거 (Auth 서비스가 발행한 sid 기준)"""
+        self._cache.pop(sid, None)
+
+    async def _listen(self) -> None:
+        """로그아웃 알림 구독 (연결이 끊기면 캐시를 비우고 재구독)"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.revoke_channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.revoke(message["data"])
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                print(f"Session revoke listener error: {e}")
+                # 끊긴 동안 놓친 로그아웃이 있을 수 있으므로 캐시 전체 무효화
+                self._cache.clear()
+                await pubsub.close()
+                await asyncio.sleep(1.0)
+
+    async def start(self) -> None:
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        await self.redis.close()
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.cache_ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }